@@ -0,0 +1,97 @@
+"""
+Benchmark comparing the default response serialization with the fast serialization mode.
+
+The default path validates the returned objects against `list[AlbumRead]` (as FastAPI does for `response_model`)
+before encoding them with `json.dumps`. The fast path serializes the query results straight to JSON bytes
+with :func:`bowie_api_rest.serialization.dump_albums`.
+
+The catalog of the default database is replicated to reach the requested number of albums.
+"""
+
+import argparse
+import json
+import time
+
+from pydantic import TypeAdapter
+
+from bowie_api_rest.config import DEFAULT_DB_PATH
+from bowie_api_rest.database import FileDatabaseConfig
+from bowie_api_rest.schemas import AlbumRead
+from bowie_api_rest.serialization import dump_albums
+from bowie_api_rest.snapshot import AlbumRecord, CatalogSnapshot
+
+
+ALBUMS_ADAPTER = TypeAdapter(list[AlbumRead])
+
+
+def load_albums(album_count: int) -> list[AlbumRecord]:
+    """
+    Load the default catalog and replicate it up to the requested number of albums.
+
+    :param int album_count: Number of albums to return.
+    :return: List of albums with their tracks.
+    :rtype: list[AlbumRecord]
+    """
+    albums = CatalogSnapshot.load(FileDatabaseConfig.from_db_file(DEFAULT_DB_PATH).engine).albums
+    return [albums[i % len(albums)] for i in range(album_count)]
+
+
+def default_path(albums: list[AlbumRecord]) -> bytes:
+    """
+    Serialize albums the way FastAPI does for a `response_model=list[AlbumRead]` route.
+
+    :param list[AlbumRecord] albums: Albums to serialize.
+    :return: JSON bytes.
+    :rtype: bytes
+    """
+    validated = ALBUMS_ADAPTER.validate_python(albums, from_attributes=True)
+    content = ALBUMS_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fast_path(albums: list[AlbumRecord]) -> bytes:
+    """
+    Serialize albums with the fast serialization mode.
+
+    :param list[AlbumRecord] albums: Albums to serialize.
+    :return: JSON bytes.
+    :rtype: bytes
+    """
+    return dump_albums(albums)
+
+
+def measure(function, albums: list[AlbumRecord], repeat: int) -> float:
+    """
+    Return the best duration of a serialization function over several runs.
+
+    :param function: Serialization function to measure.
+    :param list[AlbumRecord] albums: Albums to serialize.
+    :param int repeat: Number of runs.
+    :return: Best duration in seconds.
+    :rtype: float
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(albums)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--albums", type=int, nargs="+", default=[30, 1_000, 10_000], help="Catalog sizes to test")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'albums':>8} {'default (ms)':>14} {'fast (ms)':>11} {'speedup':>8}")
+    for album_count in args.albums:
+        albums = load_albums(album_count)
+        assert json.loads(default_path(albums)) == json.loads(fast_path(albums))
+
+        default_duration = measure(default_path, albums, args.repeat)
+        fast_duration = measure(fast_path, albums, args.repeat)
+        print(
+            f"{album_count:>8} {default_duration * 1000:>14.2f} {fast_duration * 1000:>11.2f}"
+            f" {default_duration / fast_duration:>7.1f}x"
+        )
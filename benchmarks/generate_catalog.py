@@ -0,0 +1,102 @@
+"""
+Generate a synthetic discography database of any size for benchmarks.
+
+The albums and tracks of the default database are used as templates and replicated with numbered titles,
+so the generated catalog keeps realistic titles, track counts and search selectivity while scaling
+from the real ~30 albums up to millions of tracks.
+"""
+
+import argparse
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+import time
+
+from sqlalchemy import create_engine, insert
+
+from bowie_api_rest.config import DEFAULT_DB_PATH
+from bowie_api_rest.database import FileDatabaseConfig
+from bowie_api_rest.migrations import stamp_schema_version
+from bowie_api_rest.models import Album, Base, Track
+from bowie_api_rest.search_index import create_search_index
+from bowie_api_rest.snapshot import AlbumRecord, CatalogSnapshot
+
+
+def iter_synthetic_albums(
+    templates: tuple[AlbumRecord, ...], album_count: int, tracks_per_album: int | None = None
+) -> Iterator[tuple[dict, list[dict]]]:
+    """
+    Yield the rows of the synthetic albums and of their tracks.
+
+    The first copy of the catalog keeps the original titles, the following copies get a numbered suffix.
+
+    :param tuple[AlbumRecord, ...] templates: Real albums used as templates.
+    :param int album_count: Number of albums to generate.
+    :param Optional[int] tracks_per_album: Number of tracks of every album, the template track count when omitted.
+    :return: Iterator over album rows and the rows of their tracks.
+    :rtype: Iterator[tuple[dict, list[dict]]]
+    """
+    track_id = 0
+    for album_id in range(1, album_count + 1):
+        copy, index = divmod(album_id - 1, len(templates))
+        template = templates[index]
+        suffix = f" #{copy}" if copy else ""
+        album = {"id": album_id, "title": f"{template.title}{suffix}", "year": template.year}
+
+        count = len(template.tracks) if tracks_per_album is None else tracks_per_album
+        tracks = []
+        for position in range(count):
+            track = template.tracks[position % len(template.tracks)]
+            track_id += 1
+            tracks.append(
+                {"id": track_id, "title": f"{track.title}{suffix}", "duration": track.duration, "album_id": album_id}
+            )
+        yield album, tracks
+
+
+def generate_catalog(
+    db_file: Path, album_count: int, tracks_per_album: int | None = None, batch_size: int = 10_000
+) -> int:
+    """
+    Create (or overwrite) a SQLite database holding a synthetic catalog of the requested size.
+
+    Rows are inserted in batches through Core `executemany`, and the title search index is built once at the end.
+
+    :param Path db_file: Path to the SQLite database file to create.
+    :param int album_count: Number of albums to generate.
+    :param Optional[int] tracks_per_album: Number of tracks of every album, the template track count when omitted.
+    :param int batch_size: Number of albums inserted per batch.
+    :return: Number of generated tracks.
+    :rtype: int
+    """
+    templates = CatalogSnapshot.load(FileDatabaseConfig.from_db_file(DEFAULT_DB_PATH).engine).albums
+
+    if db_file.exists():
+        db_file.unlink()
+    engine = create_engine(f"sqlite:///{db_file.as_posix()}", future=True)
+    Base.metadata.create_all(engine)
+
+    track_count = 0
+    albums = iter_synthetic_albums(templates, album_count, tracks_per_album)
+    with engine.begin() as connection:
+        while batch := list(islice(albums, batch_size)):
+            connection.execute(insert(Album), [album for album, _ in batch])
+            tracks = [track for _, album_tracks in batch for track in album_tracks]
+            connection.execute(insert(Track), tracks)
+            track_count += len(tracks)
+        create_search_index(connection)
+        stamp_schema_version(connection)
+    engine.dispose()
+    return track_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("db_file", type=Path, help="SQLite database file to create (overwritten if it exists)")
+    parser.add_argument("--albums", type=int, default=100_000, help="Number of albums to generate")
+    parser.add_argument("--tracks-per-album", type=int, default=None, help="Tracks per album, as the template if unset")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    track_count = generate_catalog(args.db_file, args.albums, args.tracks_per_album)
+    print(f"Generated {args.albums} albums and {track_count} tracks in {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,270 @@
+"""
+Load test measuring the throughput and latency percentiles of the API endpoints.
+
+Every endpoint is hit at several concurrency levels, either in-process through the ASGI transport of httpx
+(no network, measures the application itself) or over HTTP against a local server started for the run:
+uvicorn, or the production server of `bowie_api_rest.server` with workers forked from a preloaded application.
+The results are written as JSON, together with the commit and settings of the run, so that runs can be compared
+across commits with `--compare` to catch regressions.
+"""
+
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bowie_api_rest.config import DEFAULT_DB_PATH
+
+
+DEFAULT_ENDPOINTS: dict[str, str] = {
+    "health": "/health",
+    "list_albums": "/albums/?limit=100",
+    "albums_by_title": "/albums/by-title/?album_title=heroes&limit=100",
+    "tracks_albums": "/tracks/fame/albums?limit=100",
+}
+"""Endpoints measured by default, pages are bounded so that large synthetic catalogs stay comparable."""
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Return a percentile of sorted values, with the nearest-rank method.
+
+    :param list[float] sorted_values: Values sorted in increasing order.
+    :param float fraction: Percentile between 0 and 1.
+    :return: Value at the requested percentile.
+    :rtype: float
+    """
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, request_count: int) -> dict:
+    """
+    Send requests to one endpoint from `concurrency` concurrent workers and summarize their latencies.
+
+    :param httpx.AsyncClient client: Client bound to the application under test.
+    :param str path: Path and query string of the endpoint.
+    :param int concurrency: Number of requests in flight at any time.
+    :param int request_count: Total number of requests to send.
+    :return: Throughput, latency percentiles in milliseconds and status code counts.
+    :rtype: dict
+    """
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    remaining = request_count
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "statuses": statuses,
+    }
+
+
+def free_port() -> int:
+    """
+    Return a TCP port currently free on the loopback interface.
+
+    :return: Port number.
+    :rtype: int
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def in_process_client(env: dict[str, str]):
+    """
+    Yield a client calling the application in-process through the ASGI transport.
+
+    :param dict[str, str] env: Configuration environment variables, applied before the application is created.
+    :return: Async context manager yielding the client.
+    """
+    os.environ.update(env)
+    # Import after the environment is set, the configuration is read at import time
+    from bowie_api_rest.main import create_app
+
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        yield client
+
+
+@asynccontextmanager
+async def server_client(env: dict[str, str], workers: int = 1, server: str = "uvicorn"):
+    """
+    Start a local server and yield a client sending real HTTP requests to it.
+
+    :param dict[str, str] env: Configuration environment variables of the server process.
+    :param int workers: Number of worker processes.
+    :param str server: `uvicorn`, or `prefork` for the production server of :mod:`bowie_api_rest.server`.
+    :return: Async context manager yielding the client.
+    """
+    port = free_port()
+    if server == "prefork":
+        command = [sys.executable, "-m", "bowie_api_rest.server", "--check-interval", "0"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "bowie_api_rest.main:app"]
+    command += ["--port", str(port), "--log-level", "warning"]
+    server_process = subprocess.Popen([*command, "--workers", str(workers)], env={**os.environ, **env})
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            # Wait until the server accepts connections, large catalogs take a while to load
+            for _ in range(3000):
+                try:
+                    await client.get("/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError(f"{server} server did not start")
+            yield client
+    finally:
+        server_process.terminate()
+        server_process.wait()
+
+
+def git_commit() -> str | None:
+    """
+    Return the commit of the working tree, if available.
+
+    :return: Commit hash, or None outside of a git checkout.
+    :rtype: Optional[str]
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(args: argparse.Namespace, endpoints: dict[str, str]) -> dict:
+    """
+    Measure every endpoint at every concurrency level.
+
+    :param argparse.Namespace args: Command line arguments.
+    :param dict[str, str] endpoints: Endpoint names and paths.
+    :return: Run metadata and results, ready to be written as JSON.
+    :rtype: dict
+    """
+    env = {"DB_PATH": str(args.db.resolve()), "SERVING_MODE": args.serving_mode}
+    env["RESPONSE_CACHE_SIZE"] = "1024" if args.response_cache else "0"
+    env["FAST_SERIALIZATION"] = "true" if args.fast_serialization else "false"
+
+    if args.target == "in-process":
+        client_factory = in_process_client(env)
+    else:
+        client_factory = server_client(env, args.workers, args.target)
+    results: dict[str, list[dict]] = {}
+    async with client_factory as client:
+        for name, path in endpoints.items():
+            # Warm up connections, caches and lazily built indexes before measuring
+            await run_level(client, path, 1, args.warmup)
+            results[name] = []
+            for concurrency in args.concurrency:
+                level = await run_level(client, path, concurrency, args.requests)
+                results[name].append(level)
+                print(
+                    f"{name:<16} c={concurrency:<4} {level['throughput_rps']:>9.1f} req/s"
+                    f"  p50={level['p50_ms']:.2f}ms p95={level['p95_ms']:.2f}ms p99={level['p99_ms']:.2f}ms"
+                )
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {**env, "target": args.target, "workers": args.workers, "requests": args.requests},
+        "endpoints": endpoints,
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    List the measurements whose p95 latency grew or throughput dropped by more than a threshold.
+
+    :param dict baseline: Results of a previous run.
+    :param dict current: Results of the current run.
+    :param float threshold: Tolerated relative change, e.g. `0.1` for 10 %.
+    :return: Descriptions of the regressions, empty if none.
+    :rtype: list[str]
+    """
+    regressions = []
+    for name, levels in current["results"].items():
+        baseline_levels = {level["concurrency"]: level for level in baseline["results"].get(name, [])}
+        for level in levels:
+            before = baseline_levels.get(level["concurrency"])
+            if before is None:
+                continue
+            if level["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{name} c={level['concurrency']}: p95 {before['p95_ms']:.2f}ms -> {level['p95_ms']:.2f}ms"
+                )
+            if level["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{name} c={level['concurrency']}: throughput "
+                    f"{before['throughput_rps']:.1f} -> {level['throughput_rps']:.1f} req/s"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="SQLite database file to serve")
+    parser.add_argument(
+        "--target", choices=["in-process", "uvicorn", "prefork"], default="in-process", help="How to reach the API"
+    )
+    parser.add_argument("--serving-mode", default="database", help="SERVING_MODE of the application")
+    parser.add_argument("--workers", type=int, default=1, help="Number of server workers")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring each endpoint")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--fast-serialization", action="store_true", help="Enable the fast serialization mode")
+    parser.add_argument("--endpoint", action="append", metavar="NAME=PATH", help="Endpoint to measure (repeatable)")
+    parser.add_argument("--output", type=Path, help="JSON file receiving the results")
+    parser.add_argument("--compare", type=Path, help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Tolerated relative regression")
+    args = parser.parse_args()
+
+    endpoints = dict(e.split("=", 1) for e in args.endpoint) if args.endpoint else DEFAULT_ENDPOINTS
+    report = asyncio.run(run_benchmark(args, endpoints))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.compare is not None:
+        regressions = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        sys.exit(1 if regressions else 0)
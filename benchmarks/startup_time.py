@@ -0,0 +1,105 @@
+"""
+Measure the cold start of the application: import, creation, startup and first requests.
+
+Every run starts a fresh Python process which imports `bowie_api_rest.main`, creates the application with
+`create_app`, runs its startup (lifespan) and sends the first request to each endpoint, then the same request again.
+The time to ready is the sum of the import, creation and startup times, after which a server accepts connections.
+Medians over several runs are reported, the first run also paying for cold operating system caches.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+
+DEFAULT_PATHS: tuple[str, ...] = (
+    "/health",
+    "/albums/?limit=100",
+    "/tracks/fame/albums?limit=100",
+    "/autocomplete/tracks?q=st",
+)
+"""Endpoints whose first request is measured by default."""
+
+
+def measure_child(db: Path, serving_mode: str, paths: list[str]) -> dict:
+    """
+    Measure the phases of a cold start in the current process, which must not have imported the application yet.
+
+    :param Path db: SQLite database file to serve.
+    :param str serving_mode: SERVING_MODE of the application.
+    :param list[str] paths: Endpoints to request.
+    :return: Duration of every phase, in seconds.
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    from bowie_api_rest import main
+
+    imported = time.perf_counter()
+    app = main.create_app(db, serving_mode=serving_mode)
+    created = time.perf_counter()
+
+    # Imported outside of the measured phases, the test client pulls modules a server does not need
+    from fastapi.testclient import TestClient
+
+    timings: dict = {"import": imported - start, "create_app": created - imported}
+    client = TestClient(app)
+    before_startup = time.perf_counter()
+    with client:
+        timings["startup"] = time.perf_counter() - before_startup
+        for path in paths:
+            for phase in ("first", "second"):
+                before_request = time.perf_counter()
+                client.get(path)
+                timings[f"{phase} {path}"] = time.perf_counter() - before_request
+    timings["ready"] = timings["import"] + timings["create_app"] + timings["startup"]
+    return timings
+
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Measure the cold start in fresh processes and summarize the runs.
+
+    :param argparse.Namespace args: Command line arguments.
+    :return: Settings and median duration of every phase, in milliseconds.
+    :rtype: dict
+    """
+    command = [sys.executable, __file__, "--child", "--db", str(args.db), "--serving-mode", args.serving_mode]
+    command += [arg for path in args.path for arg in ("--path", path)]
+    runs = []
+    for _ in range(args.repeat):
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    medians = {phase: statistics.median(run[phase] for run in runs) * 1000 for phase in runs[0]}
+    return {"settings": {"db": str(args.db), "serving_mode": args.serving_mode, "repeat": args.repeat}, "ms": medians}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, help="SQLite database file to serve, the bundled one by default")
+    parser.add_argument("--serving-mode", default="database", help="SERVING_MODE of the application")
+    parser.add_argument("--path", action="append", help="Endpoint whose first request is measured (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of cold starts")
+    parser.add_argument("--output", type=Path, help="JSON file receiving the results")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.path = args.path or list(DEFAULT_PATHS)
+
+    if args.child:
+        print(json.dumps(measure_child(args.db, args.serving_mode, args.path)))
+        sys.exit()
+
+    if args.db is None:
+        from bowie_api_rest.config import DEFAULT_DB_PATH
+
+        args.db = DEFAULT_DB_PATH
+    report = run(args)
+    for phase, milliseconds in report["ms"].items():
+        print(f"{phase:<40}{milliseconds:>10.1f} ms")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
@@ -0,0 +1,138 @@
+"""
+Measure the memory of every process of a multi-worker server.
+
+The production server (`bowie_api_rest.server`, workers forked from a preloaded application) or uvicorn with
+`--workers` (every worker loading its own application) is started on a database, every endpoint is requested
+to warm the workers up, then the memory of the supervisor and of each worker is read from
+`/proc/<pid>/smaps_rollup` (Linux only): RSS counts shared pages in every process, PSS splits them between the
+processes sharing them, and USS (private pages) is the memory freed by stopping a worker, i.e. its own overhead.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bowie_api_rest.config import DEFAULT_DB_PATH
+
+
+WARMUP_PATHS: tuple[str, ...] = (
+    "/albums/?limit=100",
+    "/albums/by-title/?album_title=heroes&limit=100",
+    "/tracks/fame/albums?limit=100",
+    "/autocomplete/tracks?q=st",
+    "/search/albums?q=ziggy",
+)
+"""Paths requested on every worker before measuring, so that lazily built structures are counted."""
+
+
+def read_memory(pid: int) -> dict[str, int]:
+    """
+    Read the memory counters of a process.
+
+    :param int pid: Process identifier.
+    :return: RSS, PSS, USS and shared memory, in KiB.
+    :rtype: dict[str, int]
+    """
+    counters = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value, *_ = line.split()
+        counters[name.rstrip(":")] = int(value)
+    return {
+        "rss_kib": counters["Rss"],
+        "pss_kib": counters["Pss"],
+        "uss_kib": counters["Private_Clean"] + counters["Private_Dirty"],
+        "shared_kib": counters["Shared_Clean"] + counters["Shared_Dirty"],
+    }
+
+
+def child_pids(pid: int) -> list[int]:
+    """
+    Return the identifiers of the child processes of a process.
+
+    :param int pid: Process identifier.
+    :return: Identifiers of its children.
+    :rtype: list[int]
+    """
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [int(child) for child in children]
+
+
+def measure(args: argparse.Namespace) -> dict:
+    """
+    Start the server, warm its workers up and read the memory of its processes.
+
+    :param argparse.Namespace args: Command line arguments.
+    :return: Settings, memory of the supervisor and of every worker.
+    :rtype: dict
+    """
+    env = {**os.environ, "DB_PATH": str(args.db.resolve()), "SERVING_MODE": args.serving_mode}
+    if args.server == "prefork":
+        command = [sys.executable, "-m", "bowie_api_rest.server", "--check-interval", "0"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "bowie_api_rest.main:app"]
+    command += ["--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"]
+
+    server = subprocess.Popen(command, env=env)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+            for _ in range(args.startup_timeout * 10):
+                try:
+                    client.get("/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            else:
+                raise RuntimeError("server did not start")
+            # Every connection may reach any worker, requests are repeated so that all of them are warmed up
+            for _ in range(args.workers * 20):
+                for path in WARMUP_PATHS:
+                    httpx.get(f"http://127.0.0.1:{args.port}{path}", timeout=60)
+
+        workers = child_pids(server.pid)
+        if args.server == "uvicorn":
+            # uvicorn starts a multiprocessing helper process next to its workers
+            workers = [pid for pid in workers if child_pids(pid) == [] and "spawn_main" in _cmdline(pid)]
+        return {
+            "settings": {"server": args.server, "workers": args.workers, "serving_mode": args.serving_mode},
+            "supervisor": read_memory(server.pid),
+            "workers": [read_memory(pid) for pid in workers],
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _cmdline(pid: int) -> str:
+    """Return the command line of a process."""
+    return Path(f"/proc/{pid}/cmdline").read_text().replace("\0", " ")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="SQLite database file to serve")
+    parser.add_argument("--server", choices=["prefork", "uvicorn"], default="prefork", help="Server to measure")
+    parser.add_argument("--serving-mode", default="snapshot", help="SERVING_MODE of the application")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port of the server")
+    parser.add_argument("--startup-timeout", type=int, default=300, help="Seconds to wait for the server")
+    parser.add_argument("--output", type=Path, help="JSON file receiving the measurements")
+    args = parser.parse_args()
+
+    report = measure(args)
+    print(f"{'process':<12}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}")
+    rows = [("supervisor", report["supervisor"])] + [(f"worker {i}", m) for i, m in enumerate(report["workers"])]
+    for name, memory in rows:
+        print(f"{name:<12}{memory['rss_kib'] / 1024:>10.1f}{memory['pss_kib'] / 1024:>10.1f}", end="")
+        print(f"{memory['uss_kib'] / 1024:>10.1f}")
+    total_pss = sum(memory["pss_kib"] for _, memory in rows) / 1024
+    print(f"Total PSS: {total_pss:.1f} MiB")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
@@ -2,19 +2,66 @@
 Script to load David Bowie albums from JSON using Pydantic v2 BaseSettings and populate a SQLite database using SQLAlchemy ORM.
 
 The SQLite DB file is created in the same folder as the JSON file, and will be overwritten if it already exists.
+
+By default the database is built in bulk mode: the JSON file is parsed incrementally, one album at a time,
+and rows are inserted with Core `insert()` batches in a single transaction, so that memory stays flat
+whatever the size of the catalog. The `--orm` option keeps the former ORM path.
+
+The `--sync` and `--changeset` options update an existing database in place instead: albums are matched
+by natural key and only the differences are written, in one transaction, so a running API sees the new
+catalog atomically without being restarted.
+
+The `--columnar` option also writes the columnar catalog file served by the `columnar` serving mode next to the
+database, once it is built or synchronized.
 """
 
+import argparse
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from json import JSONDecodeError, JSONDecoder
 from pathlib import Path
-from typing import Self
+import re
+import time
+from typing import Any, Self, TextIO
 
 from pydantic import FilePath, validate_call
 from pydantic_settings import BaseSettings
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, Row, bindparam, create_engine, delete, event, insert, select, update
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateTable
 
+from bowie_api_rest.columnar import columnar_path, write_columnar_catalog
 from bowie_api_rest.config import DEFAULT_DB_PATH
-from bowie_api_rest.models import Album, Base, Track
+from bowie_api_rest.migrations import stamp_schema_version
+from bowie_api_rest.models import Album, Base, Track, duration_to_seconds
 from bowie_api_rest.schemas_base import AlbumBase
+from bowie_api_rest.search_index import create_search_index
+
+
+BUILD_PRAGMAS: dict[str, str] = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": "-262144",
+    "temp_store": "MEMORY",
+}
+"""
+SQLite pragmas applied while building the database.
+
+The database file is rebuilt from scratch, so crash safety is traded for speed: no rollback journal,
+no fsync, a 256 MiB page cache and in-memory temporary tables. None of them persist in the file.
+"""
+
+READ_CHUNK_SIZE: int = 64 * 1024
+"""Number of characters read from the JSON file at a time by :func:`iter_album_inputs`."""
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+AlbumKey = tuple[str, int]
+"""Natural key of an album: its title and release year (several albums share the same title)."""
+
+TrackKey = tuple[str, int]
+"""Natural key of a track within its album: its title and its occurrence number among tracks of that title."""
 
 
 class AlbumInput(AlbumBase):
@@ -64,6 +111,30 @@ class AlbumsConfig(BaseSettings):
         return cls.model_validate_json(path.read_bytes())
 
 
+class ChangesetConfig(BaseSettings):
+    """
+    Pydantic settings class to load a changeset from JSON.
+
+    :param List[AlbumInput] upsert: Albums to insert, or whose tracks replace the existing ones.
+    :param List[AlbumBase] delete: Albums to delete, identified by title and year.
+    """
+
+    upsert: list[AlbumInput] = []
+    delete: list[AlbumBase] = []
+
+    @classmethod
+    @validate_call
+    def from_json(cls, path: FilePath) -> Self:
+        """
+        Load and validate a changeset from JSON file.
+
+        :param FilePath path: Path to JSON file.
+        :return: ChangesetConfig instance with validated data.
+        :rtype: Self
+        """
+        return cls.model_validate_json(path.read_bytes())
+
+
 def init_db(sqlite_path: Path) -> sessionmaker[Session]:
     """
     Initialize the SQLite database, overwrite if exists, create tables and return a session factory.
@@ -84,7 +155,7 @@ def init_db(sqlite_path: Path) -> sessionmaker[Session]:
 
 def seed_database(albums: list[AlbumInput], session_factory: sessionmaker[Session]) -> None:
     """
-    Insert albums and their tracks into the database.
+    Insert albums and their tracks into the database, then build the title search index and stamp the schema.
 
     :param List[AlbumInput] albums: List of AlbumInput instances.
     :param sessionmaker[Session] session_factory: SQLAlchemy session factory.
@@ -96,22 +167,329 @@ def seed_database(albums: list[AlbumInput], session_factory: sessionmaker[Sessio
             session.flush()  # Populate album.id for foreign keys
             tracks = album_input.to_tracks(album)
             session.add_all(tracks)
+        session.flush()
+        # Index all titles at once rather than through the triggers, inside the same transaction
+        create_search_index(session.connection())
+        stamp_schema_version(session.connection())
         session.commit()
     print("✅ Database seeded with album data.")
 
 
+def _read_array_start(file: TextIO, key: str, chunk_size: int) -> str:
+    """
+    Read a JSON file until the opening bracket of the `key` array.
+
+    :param TextIO file: JSON file opened in text mode.
+    :param str key: Name of the member holding the array.
+    :param int chunk_size: Number of characters read at a time.
+    :raises ValueError: If the file holds no `key` array.
+    :return: Content read after the opening bracket.
+    :rtype: str
+    """
+    buffer = ""
+    while chunk := file.read(chunk_size):
+        buffer += chunk
+        key_position = buffer.find(f'"{key}"')
+        if key_position >= 0 and (start := buffer.find("[", key_position)) >= 0:
+            return buffer[start + 1 :]
+    raise ValueError(f"No {key!r} array found in {file.name}")
+
+
+def iter_album_inputs(path: Path, key: str = "albums_data", chunk_size: int = READ_CHUNK_SIZE) -> Iterator[AlbumInput]:
+    """
+    Parse and validate the albums of a JSON file one at a time, without loading the whole file.
+
+    The file is read in chunks and each element of the `key` array is decoded with `JSONDecoder.raw_decode`
+    as soon as it is complete, so memory use is bounded by the size of one album.
+
+    :param Path path: Path to a JSON file holding an object whose `key` member is the array of albums.
+    :param str key: Name of the member holding the albums.
+    :param int chunk_size: Number of characters read at a time.
+    :raises ValueError: If the file does not hold a complete array of albums under `key`.
+    :return: Iterator over validated albums.
+    :rtype: Iterator[AlbumInput]
+    """
+    decoder = JSONDecoder()
+    with path.open(encoding="utf-8") as file:
+        buffer = _read_array_start(file, key, chunk_size)
+        position = 0
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if buffer.startswith("]", position):
+                return
+            try:
+                album, position = decoder.raw_decode(buffer, position)
+            except JSONDecodeError:
+                # The album is not complete yet, drop what was consumed and read more
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Invalid or truncated {key!r} array in {path}") from None
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield AlbumInput.model_validate(album)
+
+
+def set_build_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    Apply :data:`BUILD_PRAGMAS` to every new SQLite connection of the build engine.
+
+    :param Any dbapi_connection: Raw DB-API connection.
+    :param Any connection_record: Pool connection record, unused.
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in BUILD_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+def create_build_engine(sqlite_path: Path) -> Engine:
+    """
+    Create an engine for a new database file tuned for bulk loading, overwriting the file if present.
+
+    :param Path sqlite_path: Path to SQLite database file.
+    :return: SQLAlchemy engine whose connections use the build pragmas.
+    :rtype: Engine
+    """
+    if sqlite_path.exists():
+        sqlite_path.unlink()
+
+    engine = create_engine(f"sqlite:///{sqlite_path.as_posix()}", echo=False, future=True)
+    event.listen(engine, "connect", set_build_pragmas)
+    return engine
+
+
+def bulk_seed_database(albums: Iterable[AlbumInput], engine: Engine, batch_size: int = 1000) -> tuple[int, int]:
+    """
+    Insert albums and their tracks with Core `insert()` batches in a single transaction.
+
+    Tables are created without their indexes, which are built once the rows are loaded,
+    together with the title search index.
+
+    :param Iterable[AlbumInput] albums: Albums to insert, consumed lazily.
+    :param Engine engine: Engine bound to an empty database, see :func:`create_build_engine`.
+    :param int batch_size: Number of albums inserted per batch.
+    :return: Number of inserted albums and tracks.
+    :rtype: tuple[int, int]
+    """
+    album_count = track_count = 0
+    albums = iter(albums)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            connection.execute(CreateTable(table))
+
+        # Identifiers are assigned here so that tracks can reference their album without reading it back
+        while batch := list(islice(albums, batch_size)):
+            album_rows, track_rows = [], []
+            for album_input in batch:
+                album_count += 1
+                album_rows.append({"id": album_count, "title": album_input.title, "year": album_input.year})
+                for title, duration in album_input.tracks:
+                    track_count += 1
+                    track_rows.append(
+                        {"id": track_count, "title": title, "duration": duration, "album_id": album_count}
+                    )
+            connection.execute(insert(Album), album_rows)
+            if track_rows:
+                connection.execute(insert(Track), track_rows)
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection)
+        create_search_index(connection)
+        stamp_schema_version(connection)
+    return album_count, track_count
+
+
+def _track_keys(titles: Iterable[str]) -> list[TrackKey]:
+    """
+    Build the natural keys of an album's tracks, numbering repeated titles so that their keys stay distinct.
+
+    :param Iterable[str] titles: Track titles, in album order.
+    :return: Natural keys of the tracks, in the same order.
+    :rtype: list[TrackKey]
+    """
+    occurrences: Counter[str] = Counter()
+    keys = []
+    for title in titles:
+        keys.append((title, occurrences[title]))
+        occurrences[title] += 1
+    return keys
+
+
+def _load_all_tracks(connection: Connection) -> Callable[[int], list[Row]]:
+    """
+    Read every track once and return a lookup of the tracks of an album.
+
+    :param Connection connection: SQLAlchemy connection to the database being synchronized.
+    :return: Function returning the (id, title, duration) rows of an album, ordered by identifier.
+    :rtype: Callable[[int], list[Row]]
+    """
+    tracks: defaultdict[int, list[Row]] = defaultdict(list)
+    for row in connection.execute(select(Track.album_id, Track.id, Track.title, Track.duration).order_by(Track.id)):
+        tracks[row.album_id].append(row)
+    return lambda album_id: tracks.get(album_id, [])
+
+
+def _query_album_tracks(connection: Connection) -> Callable[[int], list[Row]]:
+    """
+    Return a lookup querying the tracks of one album at a time.
+
+    :param Connection connection: SQLAlchemy connection to the database being synchronized.
+    :return: Function returning the (id, title, duration) rows of an album, ordered by identifier.
+    :rtype: Callable[[int], list[Row]]
+    """
+    stmt = (
+        select(Track.id, Track.title, Track.duration).where(Track.album_id == bindparam("album_id")).order_by(Track.id)
+    )
+    return lambda album_id: connection.execute(stmt, {"album_id": album_id}).all()
+
+
+def _diff_tracks(album_id: int, wanted: list[list[str]], existing: list[Row], changes: dict[str, list[dict]]) -> None:
+    """
+    Compare the tracks of an album with the wanted ones and record the required changes.
+
+    :param int album_id: Identifier of the album.
+    :param List[List[str]] wanted: Wanted tracks as [title, duration].
+    :param List[Row] existing: Existing (id, title, duration) rows of the album.
+    :param dict[str, List[dict]] changes: Rows to insert, update and delete, completed in place.
+    """
+    current = dict(zip(_track_keys(row.title for row in existing), existing, strict=True))
+    for key, (title, duration) in zip(_track_keys(title for title, _ in wanted), wanted, strict=True):
+        row = current.pop(key, None)
+        if row is None:
+            changes["track_insert"].append({"title": title, "duration": duration, "album_id": album_id})
+        elif row.duration != duration:
+            changes["track_update"].append(
+                {"track_id": row.id, "new_duration": duration, "new_seconds": duration_to_seconds(duration)}
+            )
+    changes["track_delete"].extend({"track_id": row.id} for row in current.values())
+
+
+def sync_database(
+    engine: Engine, albums: Iterable[AlbumInput], deleted: Iterable[AlbumBase] = (), full: bool = True
+) -> dict[str, int]:
+    """
+    Apply the differences between the given albums and the database, in a single transaction.
+
+    Albums are matched by title and year, tracks by title within their album. Only new rows are inserted,
+    changed durations updated and missing rows deleted: unchanged rows keep their identifiers,
+    and nothing is written when there is no difference. The title search index follows through its triggers.
+
+    :param Engine engine: Engine bound to an existing discography database.
+    :param Iterable[AlbumInput] albums: Albums of the new catalog (full sync) or albums to upsert (changeset).
+    :param Iterable[AlbumBase] deleted: Albums to delete, identified by title and year.
+    :param bool full: Whether `albums` is the whole catalog, database albums missing from it are then deleted.
+    :return: Number of inserted, updated and deleted albums and tracks.
+    :rtype: dict[str, int]
+    """
+    changes: dict[str, list[dict]] = defaultdict(list)
+    with engine.begin() as connection:
+        album_ids: dict[AlbumKey, int] = {
+            (title, year): album_id
+            for album_id, title, year in connection.execute(select(Album.id, Album.title, Album.year))
+        }
+        # A full sync compares every album, reading all tracks at once is cheaper than one query per album
+        album_tracks = _load_all_tracks(connection) if full else _query_album_tracks(connection)
+
+        seen: set[AlbumKey] = set()
+        for album_input in albums:
+            key = (album_input.title, album_input.year)
+            seen.add(key)
+            album_id = album_ids.get(key)
+            if album_id is None:
+                album_id = connection.execute(
+                    insert(Album).values(title=album_input.title, year=album_input.year)
+                ).inserted_primary_key[0]
+                changes["album_insert"].append({"album_id": album_id})
+            _diff_tracks(album_id, album_input.tracks, album_tracks(album_id) if key in album_ids else [], changes)
+
+        removed = set(album_ids) - seen if full else set()
+        removed.update((album.title, album.year) for album in deleted if (album.title, album.year) in album_ids)
+        for key in sorted(removed):
+            changes["album_delete"].append({"album_id": album_ids[key]})
+            changes["track_delete"].extend({"track_id": row.id} for row in album_tracks(album_ids[key]))
+
+        if changes["track_insert"]:
+            connection.execute(insert(Track), changes["track_insert"])
+        if changes["track_update"]:
+            connection.execute(
+                update(Track)
+                .where(Track.id == bindparam("track_id"))
+                .values(duration=bindparam("new_duration"), duration_seconds=bindparam("new_seconds")),
+                changes["track_update"],
+            )
+        if changes["track_delete"]:
+            connection.execute(delete(Track).where(Track.id == bindparam("track_id")), changes["track_delete"])
+        if changes["album_delete"]:
+            connection.execute(delete(Album).where(Album.id == bindparam("album_id")), changes["album_delete"])
+
+    return {
+        "albums_inserted": len(changes["album_insert"]),
+        "albums_deleted": len(changes["album_delete"]),
+        "tracks_inserted": len(changes["track_insert"]),
+        "tracks_updated": len(changes["track_update"]),
+        "tracks_deleted": len(changes["track_delete"]),
+    }
+
+
 if __name__ == "__main__":
-    json_path = Path(__file__).resolve().parent.parent / "src" / "bowie_api_rest" / "db" / "bowie_discography.json"
-    db_path = DEFAULT_DB_PATH
+    default_json_path = (
+        Path(__file__).resolve().parent.parent / "src" / "bowie_api_rest" / "db" / "bowie_discography.json"
+    )
+
+    parser = argparse.ArgumentParser(description="Build the SQLite discography database from a JSON file.")
+    parser.add_argument("--json", type=Path, default=default_json_path, help="JSON file holding the albums")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="SQLite database file to (over)write")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Number of albums inserted per batch")
+    parser.add_argument("--orm", action="store_true", help="Load the whole file and insert through the ORM")
+    parser.add_argument("--sync", action="store_true", help="Update the existing database to match the JSON file")
+    parser.add_argument("--changeset", type=Path, help="Apply a changeset JSON file to the existing database")
+    parser.add_argument("--columnar", action="store_true", help="Also write the columnar catalog file of the database")
+    args = parser.parse_args()
+    json_path, db_path = args.json, args.db
+
+    if args.sync or args.changeset is not None:
+        print(f"🔄 Synchronizing SQLite database at {db_path}")
+        engine = create_engine(f"sqlite:///{db_path.as_posix()}", future=True)
+        start = time.perf_counter()
+        if args.changeset is not None:
+            changeset = ChangesetConfig.from_json(args.changeset)
+            counts = sync_database(engine, changeset.upsert, changeset.delete, full=False)
+        else:
+            counts = sync_database(engine, iter_album_inputs(json_path))
+        summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in counts.items())
+        print(f"✅ Database synchronized in {(time.perf_counter() - start) * 1000:.1f} ms: {summary}.")
+    elif args.orm:
+        print(f"📂 Loading album data from {json_path}")
+        print(f"💾 Creating (or overwriting) SQLite database at {db_path}")
 
-    print(f"📂 Loading album data from {json_path}")
-    print(f"💾 Creating (or overwriting) SQLite database at {db_path}")
+        # Load albums data from JSON using Pydantic v2
+        config = AlbumsConfig.from_json(json_path)
 
-    # Load albums data from JSON using Pydantic v2
-    config = AlbumsConfig.from_json(json_path)
+        # Initialize DB and get session factory
+        SessionLocal = init_db(db_path)
 
-    # Initialize DB and get session factory
-    SessionLocal = init_db(db_path)
+        # Seed the database
+        seed_database(config.albums_data, SessionLocal)
+    else:
+        print(f"📂 Loading album data from {json_path}")
+        print(f"💾 Creating (or overwriting) SQLite database at {db_path}")
+        start = time.perf_counter()
+        album_count, track_count = bulk_seed_database(
+            iter_album_inputs(json_path), create_build_engine(db_path), args.batch_size
+        )
+        print(
+            f"✅ Database seeded with {album_count} albums and {track_count} tracks in {time.perf_counter() - start:.2f} s."
+        )
 
-    # Seed the database
-    seed_database(config.albums_data, SessionLocal)
+    if args.columnar:
+        columnar_file = columnar_path(db_path)
+        print(f"🧱 Writing columnar catalog at {columnar_file}")
+        start = time.perf_counter()
+        album_count, track_count = write_columnar_catalog(
+            create_engine(f"sqlite:///{db_path.as_posix()}", future=True), columnar_file
+        )
+        print(
+            f"✅ Columnar catalog written with {album_count} albums and {track_count} tracks "
+            f"in {time.perf_counter() - start:.2f} s."
+        )
@@ -0,0 +1,321 @@
+"""
+Asynchronous API routes for album and track endpoints.
+
+This module mirrors the routes of :mod:`bowie_api_rest.routes` with `async` handlers backed by a SQLAlchemy
+`AsyncSession`, so that waiting for SQLite does not hold a threadpool worker.
+It is used instead of the synchronous routes when the application runs in the `async` serving mode.
+"""
+
+from collections.abc import AsyncGenerator, Callable
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from bowie_api_rest.autocomplete import get_title_completions
+from bowie_api_rest.config import MAX_PAGE_SIZE
+from bowie_api_rest.crud import (
+    batch_get_albums_by_title_async,
+    batch_get_albums_with_matching_tracks_async,
+    get_album_runtimes_async,
+    get_albums_by_ids_async,
+    get_albums_by_title_async,
+    get_albums_with_matching_tracks_async,
+    get_albums_with_tracks_async,
+    get_all_albums_async,
+    get_tracks_by_duration_async,
+    stream_all_albums_async,
+)
+from bowie_api_rest.metrics import TimedRoute
+from bowie_api_rest.models import Album
+from bowie_api_rest.routes import (
+    CURSOR_DESCRIPTION,
+    DEFAULT_FUZZY_RESULTS,
+    DEFAULT_LONGEST_TRACKS,
+    EXPORT_RESPONSES,
+    LIMIT_DESCRIPTION,
+    NEXT_CURSOR_HEADER,
+    batch_lookup_response,
+    fetch_limit,
+    match_query,
+    rank_albums,
+    render_albums,
+    split_page,
+    track_album_scores,
+)
+from bowie_api_rest.schemas import (
+    AlbumRead,
+    AlbumRuntimeRead,
+    BatchLookupRequest,
+    BatchLookupResponse,
+    ScoredAlbumRead,
+    TrackDurationRead,
+)
+from bowie_api_rest.search_index import TitleMatch
+from bowie_api_rest.serialization import NDJSON_MEDIA_TYPE, aiter_ndjson
+from bowie_api_rest.snapshot import AlbumRecord
+
+
+# Initialize the API router for handling album and track endpoints, timing the phases of every request
+router = APIRouter(route_class=TimedRoute)
+
+# Placeholder for the async session dependency to be set dynamically
+_get_async_session_dependency: Callable[..., AsyncGenerator[AsyncSession, None]] | None = None
+
+
+def set_get_async_session_dependency(dep: Callable[..., AsyncGenerator[AsyncSession, None]]) -> None:
+    """
+    Set the session dependency callable to provide a SQLAlchemy async session.
+
+    :param Callable[..., AsyncGenerator[AsyncSession, None]] dep: Callable that returns an async session generator.
+    """
+    global _get_async_session_dependency
+    _get_async_session_dependency = dep
+
+
+async def _get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to provide a SQLAlchemy async session for FastAPI routes.
+
+    :raises RuntimeError: If the async session dependency has not been set.
+    :return: SQLAlchemy async session generator.
+    :rtype: AsyncGenerator[AsyncSession, None]
+    """
+    if _get_async_session_dependency is None:
+        raise RuntimeError("Async session dependency has not been set")
+    async for session in _get_async_session_dependency():
+        yield session
+
+
+# Create a FastAPI dependency singleton to avoid calling Depends() in function defaults
+async_session_dependency = Depends(_get_async_session)
+
+
+@router.get("/tracks/{track_title}/albums", response_model=list[AlbumRead])
+async def search_albums_containing_track(
+    track_title: str,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    match: TitleMatch = match_query,
+    session: AsyncSession = async_session_dependency,
+) -> list[AlbumRead]:
+    """
+    Retrieve all albums containing at least one track whose title partially matches the given string (case-insensitive).
+
+    Only the matching tracks are included in each album's track list.
+
+    :param str track_title: Partial track title to search for (case-insensitive).
+    :param Response response: Response receiving the pagination header.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param TitleMatch match: Whether track titles contain, start with or equal `track_title`.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :raises HTTPException: When no albums with matching tracks are found.
+    :return: List of albums with filtered matching tracks.
+    :rtype: list[AlbumRead]
+    """
+    albums: list[AlbumRecord] = await get_albums_with_matching_tracks_async(
+        session, track_title, fetch_limit(limit), cursor, match
+    )
+
+    if not albums:
+        raise HTTPException(status_code=404, detail="No albums found for this track")
+
+    page, next_cursor = split_page(albums, limit)
+    return render_albums(page, response=response, next_cursor=next_cursor)
+
+
+@router.get("/albums/", response_model=list[AlbumRead])
+async def list_albums(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    session: AsyncSession = async_session_dependency,
+) -> list[AlbumRead]:
+    """
+    List all albums with their tracks.
+
+    :param Response response: Response receiving the pagination header.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: List of all albums with tracks.
+    :rtype: list[AlbumRead]
+    """
+    page, next_cursor = split_page(await get_all_albums_async(session, fetch_limit(limit), cursor), limit)
+    return render_albums(page, response=response, next_cursor=next_cursor)
+
+
+@router.get("/albums/by-title/", response_model=list[AlbumRead])
+async def search_albums_by_title(
+    response: Response,
+    album_title: str = Query(..., description="Title of the album to search (case-insensitive)"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    match: TitleMatch = match_query,
+    session: AsyncSession = async_session_dependency,
+) -> list[AlbumRead]:
+    """
+    Get albums by partial album title and return all matching albums with their tracks.
+
+    :param Response response: Response receiving the pagination header.
+    :param str album_title: Partial title of the album to search.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param TitleMatch match: Whether album titles contain, start with or equal `album_title`.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :raises HTTPException: If no album is found with the given title.
+    :return: List of albums with tracks that match the partial title.
+    :rtype: list[AlbumRead]
+    """
+    albums: list[Album] = await get_albums_by_title_async(session, album_title, fetch_limit(limit), cursor, match)
+
+    if not albums:
+        raise HTTPException(status_code=404, detail="Album not found")
+
+    page, next_cursor = split_page(albums, limit)
+    return render_albums(page, response=response, next_cursor=next_cursor)
+
+
+@router.get("/search/albums", response_model=list[ScoredAlbumRead])
+async def fuzzy_search_albums(
+    q: str = Query(..., min_length=1, description="Album title or part of it, typos are tolerated"),
+    limit: int = Query(DEFAULT_FUZZY_RESULTS, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of albums"),
+    session: AsyncSession = async_session_dependency,
+) -> list[ScoredAlbumRead]:
+    """
+    Search albums whose title contains the searched text with a few typos, best matches first.
+
+    :param str q: Album title or part of it, ignoring case and accents.
+    :param int limit: Maximum number of albums.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: Albums with all their tracks and their score, empty when nothing is close enough.
+    :rtype: list[ScoredAlbumRead]
+    """
+    # Index lookups, and index builds after a database change, are CPU-bound and kept off the event loop
+    scores = dict(await run_in_threadpool(lambda: get_title_completions().search_albums(q, limit)))
+    return rank_albums(await get_albums_by_ids_async(session, list(scores)), scores)
+
+
+@router.get("/search/tracks", response_model=list[ScoredAlbumRead])
+async def fuzzy_search_tracks(
+    q: str = Query(..., min_length=1, description="Track title or part of it, typos are tolerated"),
+    limit: int = Query(DEFAULT_FUZZY_RESULTS, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of tracks"),
+    session: AsyncSession = async_session_dependency,
+) -> list[ScoredAlbumRead]:
+    """
+    Search tracks whose title contains the searched text with a few typos, grouped by album, best matches first.
+
+    :param str q: Track title or part of it, ignoring case and accents.
+    :param int limit: Maximum number of tracks.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: Albums with their matching tracks, scored by their best track, empty when nothing is close enough.
+    :rtype: list[ScoredAlbumRead]
+    """
+    track_scores = dict(await run_in_threadpool(lambda: get_title_completions().search_tracks(q, limit)))
+    albums = await get_albums_with_tracks_async(session, list(track_scores))
+    return rank_albums(albums, track_album_scores(albums, track_scores))
+
+
+@router.get("/tracks/by-duration/", response_model=list[TrackDurationRead])
+async def search_tracks_by_duration(
+    min_seconds: int | None = Query(None, ge=0, description="Minimum track duration in seconds, inclusive"),
+    max_seconds: int | None = Query(None, ge=0, description="Maximum track duration in seconds, inclusive"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort by increasing or decreasing duration"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of tracks"),
+    session: AsyncSession = async_session_dependency,
+) -> list[TrackDurationRead]:
+    """
+    Get the tracks whose duration is within a range, sorted by duration.
+
+    :param Optional[int] min_seconds: Minimum track duration in seconds, inclusive.
+    :param Optional[int] max_seconds: Maximum track duration in seconds, inclusive.
+    :param Literal["asc", "desc"] order: Sort by increasing or decreasing duration.
+    :param Optional[int] limit: Maximum number of tracks, all matching tracks when omitted.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :raises HTTPException: If no track is found in the duration range.
+    :return: List of tracks with their numeric duration.
+    :rtype: list[TrackDurationRead]
+    """
+    tracks = await get_tracks_by_duration_async(session, min_seconds, max_seconds, order == "desc", limit)
+
+    if not tracks:
+        raise HTTPException(status_code=404, detail="No tracks found in this duration range")
+
+    return tracks
+
+
+@router.get("/tracks/longest/", response_model=list[TrackDurationRead])
+async def list_longest_tracks(
+    limit: int = Query(DEFAULT_LONGEST_TRACKS, ge=1, le=MAX_PAGE_SIZE, description="Number of tracks"),
+    session: AsyncSession = async_session_dependency,
+) -> list[TrackDurationRead]:
+    """
+    Get the longest tracks of the catalog.
+
+    :param int limit: Number of tracks to return.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: List of tracks sorted by decreasing duration.
+    :rtype: list[TrackDurationRead]
+    """
+    return await get_tracks_by_duration_async(session, descending=True, limit=limit)
+
+
+@router.get("/albums/runtime/", response_model=list[AlbumRuntimeRead])
+async def list_album_runtimes(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    session: AsyncSession = async_session_dependency,
+) -> list[AlbumRuntimeRead]:
+    """
+    List the number of tracks and the total runtime of every album.
+
+    :param Response response: Response receiving the pagination header.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: List of album runtimes ordered by album identifier.
+    :rtype: list[AlbumRuntimeRead]
+    """
+    page, next_cursor = split_page(await get_album_runtimes_async(session, fetch_limit(limit), cursor), limit)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return page
+
+
+@router.post("/batch/lookup", response_model=BatchLookupResponse)
+async def batch_lookup(
+    lookup: BatchLookupRequest, session: AsyncSession = async_session_dependency
+) -> BatchLookupResponse:
+    """
+    Look up several track and album titles at once, each answered like its single title endpoint.
+
+    :param BatchLookupRequest lookup: Searched titles and search options.
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: Albums with their matching tracks by track title, and albums with all their tracks by album title.
+    :rtype: BatchLookupResponse
+    """
+    track_titles = list(dict.fromkeys(lookup.track_titles))
+    album_titles = list(dict.fromkeys(lookup.album_titles))
+    return batch_lookup_response(
+        track_titles,
+        await batch_get_albums_with_matching_tracks_async(session, track_titles, lookup.limit, lookup.match),
+        album_titles,
+        await batch_get_albums_by_title_async(session, album_titles, lookup.limit, lookup.match),
+    )
+
+
+@router.get("/export/albums", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+async def export_albums(session: AsyncSession = async_session_dependency) -> StreamingResponse:
+    """
+    Stream the full catalog as newline-delimited JSON, one album with all its tracks per line.
+
+    :param AsyncSession session: SQLAlchemy async session (injected dependency).
+    :return: Streaming response of albums ordered by identifier.
+    :rtype: StreamingResponse
+    """
+    return StreamingResponse(aiter_ndjson(stream_all_albums_async(session)), media_type=NDJSON_MEDIA_TYPE)
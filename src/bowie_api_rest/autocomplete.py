@@ -0,0 +1,264 @@
+"""
+API routes completing album and track titles as they are typed.
+
+This module serves the autocomplete requests sent on every keystroke from in-memory prefix indexes of the titles,
+without any database query. The indexes are built at startup and rebuilt when the database file changes.
+They are shared by the sync and async applications, and built from the mapped file in the `columnar` serving mode.
+The same store provides the fuzzy title indexes used by the typo-tolerant searches of the catalog routes.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Self
+
+from fastapi import APIRouter, Query
+from sqlalchemy import Engine, select
+
+from bowie_api_rest.database import get_db_version
+from bowie_api_rest.metrics import TimedRoute
+from bowie_api_rest.models import Album, Track
+from bowie_api_rest.schemas import CompletionRead
+from bowie_api_rest.search_index import TRIGRAM_SIZE, FuzzyIndex, PrefixIndex, fold_title
+
+
+if TYPE_CHECKING:
+    from bowie_api_rest.columnar import ColumnarCatalog, ColumnarStore
+
+
+DEFAULT_COMPLETIONS: int = 10
+"""Number of completions returned when no `limit` is given."""
+
+MAX_COMPLETIONS: int = 100
+"""Maximum value of the `limit` parameter of the autocomplete routes."""
+
+# Initialize the API router for handling autocomplete endpoints
+router = APIRouter(prefix="/autocomplete", tags=["autocomplete"], route_class=TimedRoute)
+
+
+def _fuzzy_ids(prefix_index: PrefixIndex, fuzzy_index: FuzzyIndex, query: str, limit: int) -> list[tuple[int, float]]:
+    """
+    Search titles with typos and return the identifiers having the best matching titles.
+
+    Queries shorter than a trigram are answered by the prefix index, without going through the whole catalog.
+
+    :param PrefixIndex prefix_index: Prefix index holding the identifiers of every folded title.
+    :param FuzzyIndex fuzzy_index: Fuzzy index over the folded titles of `prefix_index`.
+    :param str query: Searched text.
+    :param int limit: Maximum number of identifiers.
+    :return: Identifiers and scores, best matches first.
+    :rtype: list[tuple[int, float]]
+    """
+    folded = fold_title(query)
+    if not folded:
+        return []
+    # Every title has at least one identifier, so `limit` titles are enough
+    if len(folded) < TRIGRAM_SIZE:
+        # Too short for the trigram index and to tolerate typos, titles starting with the query are exact matches
+        matches = [
+            (identifier, 1.0) for _, identifiers in prefix_index.complete(folded, limit) for identifier in identifiers
+        ]
+    else:
+        matches = [
+            (identifier, score)
+            for position, score in fuzzy_index.search(folded, limit)
+            for identifier in prefix_index.ids_at(position)
+        ]
+    return matches[:limit]
+
+
+@dataclass(frozen=True)
+class TitleCompletions:
+    """
+    Prefix and fuzzy indexes of the album and track titles of one version of the database.
+
+    The fuzzy indexes are built on first use, from the folded titles of the prefix indexes.
+
+    :param PrefixIndex albums: Prefix index of the album titles.
+    :param PrefixIndex tracks: Prefix index of the track titles.
+    :param int version: Version of the database file the indexes were built from.
+    """
+
+    albums: PrefixIndex
+    tracks: PrefixIndex
+    version: int
+
+    @classmethod
+    def load(cls, engine: Engine, version: int = 0) -> Self:
+        """
+        Build the prefix indexes from the titles of the database, only identifiers and titles are read.
+
+        :param Engine engine: SQLAlchemy engine bound to the discography database.
+        :param int version: Version of the database file being loaded.
+        :return: Prefix indexes of the titles.
+        :rtype: Self
+        """
+        with engine.connect() as connection:
+            albums = PrefixIndex(connection.execute(select(Album.id, Album.title)).all())
+            tracks = PrefixIndex(connection.execute(select(Track.id, Track.title)).all())
+        return cls(albums=albums, tracks=tracks, version=version)
+
+    @classmethod
+    def from_columnar(cls, catalog: "ColumnarCatalog") -> Self:
+        """
+        Build the prefix indexes from the titles of a columnar catalog, without opening the database.
+
+        :param ColumnarCatalog catalog: Mapped columnar catalog.
+        :return: Prefix indexes of the titles, with the version of the catalog file.
+        :rtype: Self
+        """
+        albums = PrefixIndex(catalog.iter_album_titles())
+        tracks = PrefixIndex(catalog.iter_track_titles())
+        return cls(albums=albums, tracks=tracks, version=catalog.version)
+
+    def warm_up(self) -> None:
+        """Build the fuzzy indexes built on first use now, e.g. before forking processes that share them."""
+        for name, attribute in vars(type(self)).items():
+            if isinstance(attribute, cached_property):
+                getattr(self, name)
+
+    @cached_property
+    def album_fuzzy_index(self) -> FuzzyIndex:
+        """Fuzzy index over album titles, positions are key positions in :attr:`albums`."""
+        return FuzzyIndex(self.albums.keys)
+
+    @cached_property
+    def track_fuzzy_index(self) -> FuzzyIndex:
+        """Fuzzy index over track titles, positions are key positions in :attr:`tracks`."""
+        return FuzzyIndex(self.tracks.keys)
+
+    def search_albums(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """
+        Search album titles containing the query, tolerating typos.
+
+        :param str query: Searched text.
+        :param int limit: Maximum number of albums.
+        :return: Album identifiers and scores, best matches first.
+        :rtype: list[tuple[int, float]]
+        """
+        return _fuzzy_ids(self.albums, self.album_fuzzy_index, query, limit)
+
+    def search_tracks(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """
+        Search track titles containing the query, tolerating typos.
+
+        :param str query: Searched text.
+        :param int limit: Maximum number of tracks.
+        :return: Track identifiers and scores, best matches first.
+        :rtype: list[tuple[int, float]]
+        """
+        return _fuzzy_ids(self.tracks, self.track_fuzzy_index, query, limit)
+
+
+class AutocompleteStore:
+    """
+    Hold the current title completions and rebuild them when the database file changes.
+
+    :param Optional[Engine] engine: SQLAlchemy engine bound to the discography database.
+    :param Path db_file: Path to the SQLite database file whose modification time is watched,
+        or to the columnar catalog file of `columnar_store`.
+    :param Optional[ColumnarStore] columnar_store: Store of the columnar catalog the titles are read from
+        instead of the database.
+    """
+
+    def __init__(self, engine: Engine | None, db_file: Path, columnar_store: "ColumnarStore | None" = None) -> None:
+        """Initialize the store, the indexes are built on first access."""
+        self.engine = engine
+        self.db_file = db_file
+        self.columnar_store = columnar_store
+        self._completions: TitleCompletions | None = None
+        self._lock = Lock()
+
+    def get(self) -> TitleCompletions:
+        """
+        Return the completions matching the current database file, rebuilding them if needed.
+
+        :return: Up-to-date title completions.
+        :rtype: TitleCompletions
+        """
+        version = get_db_version(self.db_file)
+        completions = self._completions
+        if completions is not None and completions.version == version:
+            return completions
+
+        # Only one thread rebuilds, the others wait and reuse its result
+        with self._lock:
+            if self._completions is None or self._completions.version != version:
+                if self.columnar_store is not None:
+                    self._completions = TitleCompletions.from_columnar(self.columnar_store.get())
+                else:
+                    self._completions = TitleCompletions.load(self.engine, version)
+            return self._completions
+
+
+# Placeholder for the autocomplete store to be set dynamically
+_autocomplete_store: AutocompleteStore | None = None
+
+
+def set_autocomplete_store(store: AutocompleteStore) -> None:
+    """
+    Set the store providing the title completions to the autocomplete routes.
+
+    :param AutocompleteStore store: Store of the application.
+    """
+    global _autocomplete_store
+    _autocomplete_store = store
+
+
+def get_title_completions() -> TitleCompletions:
+    """
+    Return the current title completions.
+
+    :raises RuntimeError: If the autocomplete store has not been set.
+    :return: Up-to-date title completions.
+    :rtype: TitleCompletions
+    """
+    if _autocomplete_store is None:
+        raise RuntimeError("Autocomplete store has not been set")
+    return _autocomplete_store.get()
+
+
+def _complete(index: PrefixIndex, prefix: str, limit: int) -> list[CompletionRead]:
+    """
+    Complete a prefix from an index.
+
+    :param PrefixIndex index: Prefix index of the titles.
+    :param str prefix: Beginning of the title.
+    :param int limit: Maximum number of completions.
+    :return: Completions in alphabetical order, empty when no title starts with the prefix.
+    :rtype: list[CompletionRead]
+    """
+    return [CompletionRead(title=title, ids=ids) for title, ids in index.complete(prefix, limit)]
+
+
+@router.get("/albums", response_model=list[CompletionRead])
+def complete_album_titles(
+    q: str = Query(..., min_length=1, description="Beginning of the album title, ignoring case and accents"),
+    limit: int = Query(DEFAULT_COMPLETIONS, ge=1, le=MAX_COMPLETIONS, description="Maximum number of completions"),
+) -> list[CompletionRead]:
+    """
+    Complete an album title, with the identifiers of the albums having each completed title.
+
+    :param str q: Beginning of the album title, ignoring case and accents.
+    :param int limit: Maximum number of completions.
+    :return: Completions in alphabetical order.
+    :rtype: list[CompletionRead]
+    """
+    return _complete(get_title_completions().albums, q, limit)
+
+
+@router.get("/tracks", response_model=list[CompletionRead])
+def complete_track_titles(
+    q: str = Query(..., min_length=1, description="Beginning of the track title, ignoring case and accents"),
+    limit: int = Query(DEFAULT_COMPLETIONS, ge=1, le=MAX_COMPLETIONS, description="Maximum number of completions"),
+) -> list[CompletionRead]:
+    """
+    Complete a track title, with the identifiers of the tracks having each completed title.
+
+    :param str q: Beginning of the track title, ignoring case and accents.
+    :param int limit: Maximum number of completions.
+    :return: Completions in alphabetical order.
+    :rtype: list[CompletionRead]
+    """
+    return _complete(get_title_completions().tracks, q, limit)
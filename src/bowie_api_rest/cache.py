@@ -0,0 +1,194 @@
+"""
+Response cache for the read-only catalog endpoints.
+
+This module stores the final serialized bodies of `GET` responses in a bounded LRU cache with an optional TTL,
+so that popular searches skip the SQL query, the ORM hydration and the Pydantic serialization altogether.
+The whole cache is invalidated as soon as the database file changes.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import itemgetter
+import time
+from urllib.parse import parse_qsl
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+CACHEABLE_STATUS_CODES: frozenset[int] = frozenset({200, 404})
+"""Status codes whose responses are cached, 404 results of searches are as stable as successful ones."""
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+"""Request path and query parameters sorted by name."""
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """
+    Serialized response stored in the cache.
+
+    :param int status: HTTP status code.
+    :param tuple[tuple[bytes, bytes], ...] headers: Raw response headers.
+    :param bytes body: Serialized response body.
+    :param float expires_at: Monotonic time after which the entry is stale, `inf` without TTL.
+    """
+
+    status: int
+    headers: tuple[tuple[bytes, bytes], ...]
+    body: bytes
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of serialized responses with an optional TTL.
+
+    :param int max_entries: Maximum number of cached responses, the least recently used one is evicted beyond.
+    :param Optional[float] ttl: Number of seconds a response stays valid, `None` to keep it until evicted.
+    :param Optional[Callable[[], int]] version: Callable returning the current catalog version,
+        the cache is cleared whenever the returned value changes.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, ttl: float | None = None, version: Callable[[], int] | None = None
+    ) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._version: int | None = version() if version is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self) -> None:
+        """Clear the cache if the catalog version changed since the last access."""
+        if self.version is None:
+            return
+        version = self.version()
+        if version != self._version:
+            self._version = version
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        """
+        Return the cached response for the given key, if any and still fresh.
+
+        :param CacheKey key: Normalized request key.
+        :return: Cached response, or None on a miss.
+        :rtype: Optional[CachedResponse]
+        """
+        self._check_version()
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: CacheKey, status: int, headers: tuple[tuple[bytes, bytes], ...], body: bytes) -> None:
+        """
+        Store a serialized response, evicting the least recently used entries beyond the size limit.
+
+        :param CacheKey key: Normalized request key.
+        :param int status: HTTP status code.
+        :param tuple[tuple[bytes, bytes], ...] headers: Raw response headers.
+        :param bytes body: Serialized response body.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        self._entries[key] = CachedResponse(status=status, headers=headers, body=body, expires_at=expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+
+    def as_dict(self) -> dict[str, int]:
+        """
+        Return the cache counters.
+
+        :return: Mapping of counter names to values.
+        :rtype: dict[str, int]
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+def make_cache_key(scope: Scope) -> CacheKey:
+    """
+    Build the cache key of a request from its path and query string.
+
+    The path and parameter values are kept as sent, as requests differing only by case may be answered differently,
+    for instance an unknown `match` value is rejected. Parameters are sorted by name so that their order does
+    not matter, repeated parameters keep their order.
+
+    :param Scope scope: ASGI scope of the request.
+    :return: Normalized request key.
+    :rtype: CacheKey
+    """
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    return scope["path"], tuple(sorted(query, key=itemgetter(0)))
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware answering `GET` requests on the catalog endpoints from a :class:`ResponseCache`.
+
+    :param ASGIApp app: Wrapped ASGI application.
+    :param ResponseCache cache: Cache storing the serialized responses.
+    :param tuple[str, ...] path_prefixes: Prefixes of the cacheable paths.
+    """
+
+    def __init__(
+        self, app: ASGIApp, cache: ResponseCache, path_prefixes: tuple[str, ...] = ("/albums", "/tracks", "/search")
+    ) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.cache = cache
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve the request from the cache, or forward it and cache the response."""
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        key = make_cache_key(scope)
+        entry = self.cache.get(key)
+        if entry is not None:
+            await send({"type": "http.response.start", "status": entry.status, "headers": entry.headers})
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        start: Message = {}
+        chunks: list[bytes] = []
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and start.get("status") in CACHEABLE_STATUS_CODES:
+                    self.cache.put(key, start["status"], tuple(start.get("headers", ())), b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
@@ -0,0 +1,772 @@
+"""
+Columnar catalog file, memory-mapped for read-only serving.
+
+The catalog is written once, next to the database file, as flat arrays of fixed-width values: one column per album
+and track attribute, the range of the tracks of every album, and the titles and durations interned in a single
+string table. Title searches go through a sorted table of the distinct lowercased titles and trigram posting lists
+stored in the same file.
+
+Serving processes map the file instead of loading it, so opening it only reads its header whatever the size of the
+catalog, and every process mapping it shares the same physical pages through the page cache of the operating system.
+Albums and tracks are only decoded into records when they are returned. The query methods of
+:class:`ColumnarCatalog` mirror those of :class:`~bowie_api_rest.snapshot.CatalogSnapshot`.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from itertools import chain
+import json
+import mmap
+import os
+from pathlib import Path
+import re
+import struct
+import sys
+from threading import Lock
+from typing import Self, overload
+
+from sqlalchemy import Engine
+
+from bowie_api_rest.database import get_db_version
+from bowie_api_rest.models import duration_to_seconds
+from bowie_api_rest.search_index import TitleMatch, lower_ascii
+from bowie_api_rest.snapshot import (
+    AlbumRecord,
+    AlbumRuntimeRecord,
+    TrackDurationRecord,
+    TrackRecord,
+    iter_album_records,
+)
+
+
+MAGIC: bytes = b"BOWIECOL"
+"""First bytes of every columnar catalog file."""
+
+FORMAT_VERSION: int = 2
+"""Version of the file layout, files written with another version have to be rebuilt."""
+
+COLUMNAR_SUFFIX: str = ".columnar"
+"""Suffix of the columnar catalog file written next to a database file."""
+
+_PREAMBLE = struct.Struct("<8sII")
+"""Magic bytes, format version and length of the JSON header that follows."""
+
+_ALIGNMENT: int = 8
+"""Alignment in bytes of the header end and of every section, so that arrays are read at aligned addresses."""
+
+_CODE_POINT_BITS: int = 21
+"""Number of bits of a Unicode code point, a trigram is packed into an unsigned 64-bit integer."""
+
+_TITLE_INDEX_SECTIONS: tuple[str, ...] = (
+    "key_start",
+    "key_data",
+    "key_position_start",
+    "key_position",
+    "trigram",
+    "trigram_key_start",
+    "trigram_key",
+)
+"""Sections of the title index of each kind, prefixed with `album_` or `track_`."""
+
+
+def columnar_path(db_file: Path) -> Path:
+    """
+    Return the path of the columnar catalog file written next to a database file.
+
+    :param Path db_file: Path to the SQLite database file.
+    :return: Path with the :data:`COLUMNAR_SUFFIX` suffix.
+    :rtype: Path
+    """
+    return Path(db_file).with_suffix(COLUMNAR_SUFFIX)
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the next multiple of :data:`_ALIGNMENT`."""
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _trigram_codes(text: str) -> set[int]:
+    """
+    Return the distinct trigrams of an already lowercased text, each packed into an integer.
+
+    :param str text: Lowercased text.
+    :return: Code points of every trigram packed into 63 bits, empty if the text is shorter than a trigram.
+    :rtype: set[int]
+    """
+    code_points = [ord(char) for char in text]
+    return {
+        (first << _CODE_POINT_BITS | second) << _CODE_POINT_BITS | third
+        for first, second, third in zip(code_points, code_points[1:], code_points[2:], strict=False)
+    }
+
+
+class _StringTableBuilder:
+    """Collect distinct strings into a table of UTF-8 strings stored back to back."""
+
+    def __init__(self) -> None:
+        """Start with an empty table."""
+        self.refs: dict[str, int] = {}
+        self.starts = array("Q", [0])
+        self.data = bytearray()
+
+    def add(self, text: str) -> int:
+        """
+        Add a string unless already present.
+
+        :param str text: String to intern.
+        :return: Position of the string in the table.
+        :rtype: int
+        """
+        ref = self.refs.get(text)
+        if ref is None:
+            ref = self.refs[text] = len(self.refs)
+            self.data += text.encode()
+            self.starts.append(len(self.data))
+        return ref
+
+
+def _title_index_sections(kind: str, titles: Iterable[str]) -> dict[str, array | bytes]:
+    """
+    Build the sections of the title index of albums or tracks.
+
+    The distinct titles, lowercased like by SQLite (ASCII letters only), are sorted and stored as a string table
+    (the keys), each with the sorted positions of the albums or tracks bearing it, and every trigram lists the keys
+    containing it.
+
+    :param str kind: `album` or `track`, prefixed to the section names.
+    :param Iterable[str] titles: Titles, in the order of the album or track positions.
+    :return: Sections of the index by name.
+    :rtype: dict[str, array | bytes]
+    """
+    positions_by_key: defaultdict[str, array] = defaultdict(lambda: array("I"))
+    for position, title in enumerate(titles):
+        positions_by_key[lower_ascii(title)].append(position)
+
+    keys = _StringTableBuilder()
+    key_position_start, key_position = array("I", [0]), array("I")
+    postings: defaultdict[int, array] = defaultdict(lambda: array("I"))
+    # Code point order is the byte order of the UTF-8 encoded keys, which is searched by bisection
+    for key in sorted(positions_by_key):
+        key_ref = keys.add(key)
+        key_position.extend(positions_by_key[key])
+        key_position_start.append(len(key_position))
+        for code in _trigram_codes(key):
+            postings[code].append(key_ref)
+
+    trigram = array("Q", sorted(postings))
+    trigram_key_start, trigram_key = array("I", [0]), array("I")
+    for code in trigram:
+        trigram_key.extend(postings[code])
+        trigram_key_start.append(len(trigram_key))
+
+    sections = (
+        keys.starts,
+        bytes(keys.data),
+        key_position_start,
+        key_position,
+        trigram,
+        trigram_key_start,
+        trigram_key,
+    )
+    return {f"{kind}_{name}": values for name, values in zip(_TITLE_INDEX_SECTIONS, sections, strict=True)}
+
+
+def _write_sections(path: Path, sections: dict[str, array | bytes], **counts: int) -> None:
+    """
+    Write sections after a header describing them, replacing the file atomically.
+
+    Processes still mapping the previous file keep reading it until they map the new one.
+
+    :param Path path: Columnar catalog file to write.
+    :param dict[str, array | bytes] sections: Arrays and byte strings to store, by name.
+    :param int counts: Numbers of albums and tracks, recorded in the header.
+    """
+    layout: dict[str, tuple[str, int, int]] = {}
+    offset = 0
+    for name, values in sections.items():
+        typecode = values.typecode if isinstance(values, array) else "B"
+        layout[name] = (typecode, offset, len(values))
+        offset = _aligned(offset + len(values) * array(typecode).itemsize)
+    header = json.dumps({"byteorder": sys.byteorder, **counts, "sections": layout}).encode()
+
+    temporary = path.with_name(f".{path.name}.tmp")
+    with temporary.open("wb") as file:
+        file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        file.write(header)
+        file.write(bytes(_aligned(file.tell()) - file.tell()))
+        data_start = file.tell()
+        for values in sections.values():
+            file.write(values)
+            file.write(bytes(_aligned(file.tell() - data_start) - (file.tell() - data_start)))
+    os.replace(temporary, path)
+
+
+def write_columnar_catalog(engine: Engine, path: Path) -> tuple[int, int]:
+    """
+    Write the whole catalog of a database into a columnar catalog file.
+
+    Albums are streamed from the database in identifier order and tracks follow the order of their albums,
+    as in the catalog snapshot.
+
+    :param Engine engine: SQLAlchemy engine bound to the discography database.
+    :param Path path: Columnar catalog file to create (or overwrite), see :func:`columnar_path`.
+    :return: Number of written albums and tracks.
+    :rtype: tuple[int, int]
+    """
+    strings = _StringTableBuilder()
+    album_id, album_year, album_title, album_track_start = array("I"), array("i"), array("I"), array("I", [0])
+    track_id, track_title, track_duration, track_seconds, track_album = (array("I") for _ in range(5))
+    album_titles: list[str] = []
+    track_titles: list[str] = []
+
+    with engine.connect() as connection:
+        for position, album in enumerate(iter_album_records(connection)):
+            album_id.append(album.id)
+            album_year.append(album.year)
+            album_title.append(strings.add(album.title))
+            album_titles.append(album.title)
+            for track in album.tracks:
+                track_id.append(track.id)
+                track_title.append(strings.add(track.title))
+                track_duration.append(strings.add(track.duration))
+                track_seconds.append(duration_to_seconds(track.duration))
+                track_album.append(position)
+                track_titles.append(track.title)
+            album_track_start.append(len(track_id))
+
+    track_positions = range(len(track_id))
+    sections: dict[str, array | bytes] = {
+        "album_id": album_id,
+        "album_year": album_year,
+        "album_title": album_title,
+        "album_track_start": album_track_start,
+        "track_id": track_id,
+        "track_title": track_title,
+        "track_duration": track_duration,
+        "track_seconds": track_seconds,
+        "track_album": track_album,
+        "track_duration_order": array("I", sorted(track_positions, key=lambda p: (track_seconds[p], track_id[p]))),
+        "track_id_order": array("I", sorted(track_positions, key=track_id.__getitem__)),
+        "string_start": strings.starts,
+        "string_data": bytes(strings.data),
+        **_title_index_sections("album", album_titles),
+        **_title_index_sections("track", track_titles),
+    }
+    _write_sections(path, sections, albums=len(album_id), tracks=len(track_id))
+    return len(album_id), len(track_id)
+
+
+class _StringTable:
+    """
+    Mapped table of UTF-8 strings stored back to back, the string at position `i` spanning `starts[i]:starts[i + 1]`.
+
+    Strings are compared as bytes, whose order is the code point order of the decoded strings.
+
+    :param memoryview starts: Start offset of every string in the data, followed by the end of the last one.
+    :param memoryview data: Concatenated UTF-8 encoded strings.
+    """
+
+    def __init__(self, starts: memoryview, data: memoryview) -> None:
+        """Wrap the sections of the table."""
+        self.starts = starts
+        self.data = data
+
+    def __len__(self) -> int:
+        """Return the number of strings."""
+        return len(self.starts) - 1
+
+    def __getitem__(self, position: int) -> bytes:
+        """Return the UTF-8 encoded string at a position."""
+        return self.data[self.starts[position] : self.starts[position + 1]].tobytes()
+
+    def text(self, position: int) -> str:
+        """Return the decoded string at a position."""
+        return self[position].decode()
+
+    def containing(self, part: bytes) -> list[int]:
+        """
+        Return the positions of the strings containing a byte string, by scanning the data once.
+
+        :param bytes part: UTF-8 encoded text to search for.
+        :return: Sorted positions of the matching strings.
+        :rtype: list[int]
+        """
+        if not part:
+            return list(range(len(self)))
+        found, pattern, start = [], re.compile(re.escape(part)), 0
+        while (match := pattern.search(self.data, start)) is not None:
+            position = bisect_right(self.starts, match.start()) - 1
+            end = self.starts[position + 1]
+            # A match spanning two strings is retried from its next byte
+            if match.end() <= end:
+                found.append(position)
+                start = end
+            else:
+                start = match.start() + 1
+        return found
+
+
+class _TitleIndex:
+    """
+    Mapped index answering case-insensitive `contains`, `prefix` and `exact` title searches.
+
+    Exact and prefix searches are binary searches in the sorted distinct lowercased titles (the keys). Substring
+    searches only verify the keys listed under the rarest trigram of the query, and queries shorter than a trigram
+    scan the keys. The positions of the albums or tracks of every matching key are then merged.
+
+    :param memoryview key_start: Start offset of every key, see :class:`_StringTable`.
+    :param memoryview key_data: Concatenated UTF-8 encoded keys, in increasing order.
+    :param memoryview key_position_start: Start of the positions of every key in `key_position`.
+    :param memoryview key_position: Sorted positions of the albums or tracks of every key, key after key.
+    :param memoryview trigram: Sorted packed trigrams of the keys.
+    :param memoryview trigram_key_start: Start of the keys of every trigram in `trigram_key`.
+    :param memoryview trigram_key: Sorted keys containing every trigram, trigram after trigram.
+    """
+
+    def __init__(
+        self,
+        key_start: memoryview,
+        key_data: memoryview,
+        key_position_start: memoryview,
+        key_position: memoryview,
+        trigram: memoryview,
+        trigram_key_start: memoryview,
+        trigram_key: memoryview,
+    ) -> None:
+        """Wrap the sections of the index."""
+        self.keys = _StringTable(key_start, key_data)
+        self.key_position_start = key_position_start
+        self.key_position = key_position
+        self.trigram = trigram
+        self.trigram_key_start = trigram_key_start
+        self.trigram_key = trigram_key
+
+    def _trigram_keys(self, code: int) -> memoryview:
+        """Return the keys containing a packed trigram."""
+        index = bisect_left(self.trigram, code)
+        if index == len(self.trigram) or self.trigram[index] != code:
+            return self.trigram_key[:0]
+        return self.trigram_key[self.trigram_key_start[index] : self.trigram_key_start[index + 1]]
+
+    def _matching_keys(self, needle: str, match: TitleMatch) -> Iterable[int]:
+        """Return the positions of the keys containing, starting with or equal to a lowercased text."""
+        encoded = needle.encode()
+        if match == "exact":
+            index = bisect_left(self.keys, encoded)
+            return [index] if index < len(self.keys) and self.keys[index] == encoded else []
+        if match == "prefix":
+            # No UTF-8 encoded text contains the 0xff byte, so it bounds every key starting with the prefix
+            return range(bisect_left(self.keys, encoded), bisect_left(self.keys, encoded + b"\xff"))
+
+        codes = _trigram_codes(needle)
+        if not codes:
+            return self.keys.containing(encoded)
+        candidates = min((self._trigram_keys(code) for code in codes), key=len)
+        return [key for key in candidates if encoded in self.keys[key]]
+
+    def search(self, part: str, match: TitleMatch = "contains") -> list[int]:
+        """
+        Return the positions of the titles containing, starting with or equal to the given text (case-insensitive).
+
+        :param str part: Text to search for.
+        :param TitleMatch match: How the titles are compared with `part`.
+        :return: Sorted positions of the matching albums or tracks.
+        :rtype: list[int]
+        """
+        starts, positions = self.key_position_start, self.key_position
+        return sorted(
+            chain.from_iterable(
+                positions[starts[key] : starts[key + 1]] for key in self._matching_keys(lower_ascii(part), match)
+            )
+        )
+
+
+class _AlbumSequence(Sequence[AlbumRecord]):
+    """
+    Read-only sequence of the albums of a columnar catalog, decoded on access.
+
+    :param ColumnarCatalog catalog: Catalog holding the albums.
+    """
+
+    def __init__(self, catalog: "ColumnarCatalog") -> None:
+        """Wrap the catalog."""
+        self.catalog = catalog
+
+    def __len__(self) -> int:
+        """Return the number of albums."""
+        return len(self.catalog.album_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> AlbumRecord: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[AlbumRecord]: ...
+
+    def __getitem__(self, index: int | slice) -> AlbumRecord | list[AlbumRecord]:
+        """Return the album at a position, or the list of the albums of a slice."""
+        if isinstance(index, slice):
+            return [self.catalog.album(position) for position in range(len(self))[index]]
+        if not -len(self) <= index < len(self):
+            raise IndexError("album position out of range")
+        return self.catalog.album(index % len(self))
+
+
+class ColumnarCatalog:
+    """
+    Read-only catalog answering queries from a memory-mapped columnar catalog file.
+
+    The query methods mirror those of :class:`~bowie_api_rest.snapshot.CatalogSnapshot` and return the same records
+    in the same order. Every column is a :class:`memoryview` of the mapped file.
+
+    :param mmap.mmap buffer: Mapped columnar catalog file.
+    :param int version: Version of the file, changing whenever it is rewritten.
+    :raises ValueError: If the file is not a columnar catalog, or was written with another format or byte order.
+    """
+
+    def __init__(self, buffer: mmap.mmap, version: int = 0) -> None:
+        """Read the header and wrap every section, nothing else is read from the file."""
+        magic, format_version, header_length = _PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a columnar catalog file")
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f"Columnar catalog format {format_version} is not {FORMAT_VERSION}, rebuild the file")
+        header = json.loads(buffer[_PREAMBLE.size : _PREAMBLE.size + header_length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"Columnar catalog written on a {header['byteorder']}-endian machine, rebuild the file")
+
+        self.buffer = buffer
+        self.version = version
+        data = memoryview(buffer)[_aligned(_PREAMBLE.size + header_length) :]
+        sections = {
+            name: data[offset : offset + count * array(typecode).itemsize].cast(typecode)
+            for name, (typecode, offset, count) in header["sections"].items()
+        }
+        self.album_ids: memoryview = sections["album_id"]
+        self.album_years: memoryview = sections["album_year"]
+        self.album_titles: memoryview = sections["album_title"]
+        self.album_track_starts: memoryview = sections["album_track_start"]
+        self.track_ids: memoryview = sections["track_id"]
+        self.track_titles: memoryview = sections["track_title"]
+        self.track_durations: memoryview = sections["track_duration"]
+        self.track_seconds: memoryview = sections["track_seconds"]
+        self.track_album_positions: memoryview = sections["track_album"]
+        self.track_duration_order: memoryview = sections["track_duration_order"]
+        self.track_id_order: memoryview = sections["track_id_order"]
+        self.strings = _StringTable(sections["string_start"], sections["string_data"])
+        self.album_title_index, self.track_title_index = (
+            _TitleIndex(*(sections[f"{kind}_{name}"] for name in _TITLE_INDEX_SECTIONS)) for kind in ("album", "track")
+        )
+        self.albums: Sequence[AlbumRecord] = _AlbumSequence(self)
+
+    @classmethod
+    def open(cls, path: Path) -> Self:
+        """
+        Map a columnar catalog file.
+
+        :param Path path: Columnar catalog file, see :func:`write_columnar_catalog`.
+        :return: Catalog reading the mapped file.
+        :rtype: Self
+        """
+        version = get_db_version(path)
+        with path.open("rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, version)
+
+    def warm_up(self) -> None:
+        """Ask the operating system to read the file ahead, e.g. before forking processes that share its pages."""
+        if hasattr(mmap, "MADV_WILLNEED"):
+            self.buffer.madvise(mmap.MADV_WILLNEED)
+
+    def iter_album_titles(self) -> Iterator[tuple[int, str]]:
+        """
+        Decode the identifier and title of every album, e.g. to index the titles.
+
+        :return: Identifiers and titles, in identifier order.
+        :rtype: Iterator[tuple[int, str]]
+        """
+        return zip(self.album_ids, map(self.strings.text, self.album_titles), strict=True)
+
+    def iter_track_titles(self) -> Iterator[tuple[int, str]]:
+        """
+        Decode the identifier and title of every track, e.g. to index the titles.
+
+        :return: Identifiers and titles, in album order.
+        :rtype: Iterator[tuple[int, str]]
+        """
+        return zip(self.track_ids, map(self.strings.text, self.track_titles), strict=True)
+
+    def track(self, position: int) -> TrackRecord:
+        """
+        Decode the track at a position.
+
+        :param int position: Track position, tracks are ordered by album, then identifier.
+        :return: Track record.
+        :rtype: TrackRecord
+        """
+        return TrackRecord(
+            id=self.track_ids[position],
+            title=self.strings.text(self.track_titles[position]),
+            duration=self.strings.text(self.track_durations[position]),
+        )
+
+    def album(self, position: int, track_positions: Iterable[int] | None = None) -> AlbumRecord:
+        """
+        Decode the album at a position, with all its tracks or only some of them.
+
+        :param int position: Album position, albums are ordered by identifier.
+        :param Optional[Iterable[int]] track_positions: Positions of the tracks to include, all when omitted.
+        :return: Album record.
+        :rtype: AlbumRecord
+        """
+        if track_positions is None:
+            track_positions = range(self.album_track_starts[position], self.album_track_starts[position + 1])
+        return AlbumRecord(
+            id=self.album_ids[position],
+            title=self.strings.text(self.album_titles[position]),
+            year=self.album_years[position],
+            tracks=tuple(self.track(track_position) for track_position in track_positions),
+        )
+
+    def _start(self, after_id: int | None) -> int:
+        """Return the position of the first album whose identifier is greater than `after_id`."""
+        return 0 if after_id is None else bisect_right(self.album_ids, after_id)
+
+    def _page(self, positions: Sequence[int], limit: int | None, after_id: int | None) -> list[AlbumRecord]:
+        """
+        Return the albums at the given sorted positions, restricted to one keyset page.
+
+        :param Sequence[int] positions: Sorted album positions.
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :return: Albums of the page.
+        :rtype: list[AlbumRecord]
+        """
+        positions = positions[bisect_left(positions, self._start(after_id)) :]
+        return [self.album(position) for position in positions[:limit]]
+
+    def _albums_with_tracks(self, track_positions: Iterable[int]) -> list[AlbumRecord]:
+        """Return the albums of sorted track positions, with only those tracks."""
+        matching: dict[int, list[int]] = {}
+        for track_position in track_positions:
+            matching.setdefault(self.track_album_positions[track_position], []).append(track_position)
+        return [self.album(position, tracks) for position, tracks in matching.items()]
+
+    def list_albums(self, limit: int | None = None, after_id: int | None = None) -> list[AlbumRecord]:
+        """
+        List all albums with their tracks.
+
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :return: List of all albums.
+        :rtype: list[AlbumRecord]
+        """
+        start = self._start(after_id)
+        return self.albums[start : None if limit is None else start + limit]
+
+    def get_albums_by_title(
+        self,
+        album_title_part: str,
+        limit: int | None = None,
+        after_id: int | None = None,
+        match: TitleMatch = "contains",
+    ) -> list[AlbumRecord]:
+        """
+        Retrieve all albums that match a partial album title (case-insensitive).
+
+        :param str album_title_part: Partial album title to search for (case-insensitive).
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+        :return: List of albums matching the search criteria, with their tracks.
+        :rtype: list[AlbumRecord]
+        """
+        return self._page(self.album_title_index.search(album_title_part, match), limit, after_id)
+
+    def get_albums_containing_track(
+        self,
+        track_title_part: str,
+        limit: int | None = None,
+        after_id: int | None = None,
+        match: TitleMatch = "contains",
+    ) -> list[AlbumRecord]:
+        """
+        Retrieve all albums that contain at least one track whose title contains the given substring.
+
+        :param str track_title_part: Substring to search for in track titles (case-insensitive).
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+        :return: List of albums matching the search criteria, with all their tracks.
+        :rtype: list[AlbumRecord]
+        """
+        track_positions = self.track_title_index.search(track_title_part, match)
+        album_positions = sorted({self.track_album_positions[position] for position in track_positions})
+        return self._page(album_positions, limit, after_id)
+
+    def get_albums_with_matching_tracks(
+        self,
+        track_title_part: str,
+        limit: int | None = None,
+        after_id: int | None = None,
+        match: TitleMatch = "contains",
+    ) -> list[AlbumRecord]:
+        """
+        Retrieve the albums containing tracks whose title contains the given substring, with only those tracks.
+
+        :param str track_title_part: Substring to search for in track titles (case-insensitive).
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+        :return: List of albums matching the search criteria, with their matching tracks only.
+        :rtype: list[AlbumRecord]
+        """
+        start = self._start(after_id)
+        matching: dict[int, list[int]] = {}
+        # Track positions are sorted, so are the positions of their albums
+        for track_position in self.track_title_index.search(track_title_part, match):
+            album_position = self.track_album_positions[track_position]
+            if album_position < start:
+                continue
+            if album_position not in matching and limit is not None and len(matching) == limit:
+                break
+            matching.setdefault(album_position, []).append(track_position)
+        return [self.album(position, tracks) for position, tracks in matching.items()]
+
+    def get_albums_by_ids(self, album_ids: Iterable[int]) -> list[AlbumRecord]:
+        """
+        Retrieve albums with all their tracks from their identifiers.
+
+        :param Iterable[int] album_ids: Album identifiers, unknown identifiers are ignored.
+        :return: Albums ordered by identifier.
+        :rtype: list[AlbumRecord]
+        """
+        positions = ((bisect_left(self.album_ids, album_id), album_id) for album_id in set(album_ids))
+        return [
+            self.album(position)
+            for position, album_id in sorted(positions)
+            if position < len(self.album_ids) and self.album_ids[position] == album_id
+        ]
+
+    def get_albums_with_tracks(self, track_ids: Iterable[int]) -> list[AlbumRecord]:
+        """
+        Retrieve the albums of tracks, with only those tracks, from the track identifiers.
+
+        :param Iterable[int] track_ids: Track identifiers, unknown identifiers are ignored.
+        :return: Albums ordered by identifier, with their given tracks ordered by identifier.
+        :rtype: list[AlbumRecord]
+        """
+        order, identifiers = self.track_id_order, self.track_ids
+        track_positions = []
+        for track_id in set(track_ids):
+            index = bisect_left(order, track_id, key=identifiers.__getitem__)
+            if index < len(order) and identifiers[order[index]] == track_id:
+                track_positions.append(order[index])
+        return self._albums_with_tracks(sorted(track_positions))
+
+    def get_tracks_by_duration(
+        self,
+        min_seconds: int | None = None,
+        max_seconds: int | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> list[TrackDurationRecord]:
+        """
+        Retrieve the tracks whose duration is within a range, sorted by duration.
+
+        :param Optional[int] min_seconds: Minimum duration in seconds, inclusive.
+        :param Optional[int] max_seconds: Maximum duration in seconds, inclusive.
+        :param bool descending: Whether the longest tracks come first.
+        :param Optional[int] limit: Maximum number of tracks to return.
+        :return: Tracks sorted by duration, then identifier (both reversed when descending).
+        :rtype: list[TrackDurationRecord]
+        """
+        order, seconds = self.track_duration_order, self.track_seconds
+        start = 0 if min_seconds is None else bisect_left(order, min_seconds, key=seconds.__getitem__)
+        stop = len(order) if max_seconds is None else bisect_right(order, max_seconds, key=seconds.__getitem__)
+        positions = order[start:stop]
+        if descending:
+            positions = positions[::-1]
+
+        return [
+            TrackDurationRecord(
+                id=(track := self.track(position)).id,
+                title=track.title,
+                duration=track.duration,
+                duration_seconds=seconds[position],
+                album_id=self.album_ids[self.track_album_positions[position]],
+            )
+            for position in positions[:limit]
+        ]
+
+    def get_album_runtimes(self, limit: int | None = None, after_id: int | None = None) -> list[AlbumRuntimeRecord]:
+        """
+        Compute the number of tracks and the total runtime of albums, ordered by identifier.
+
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :return: Runtime of every album of the page.
+        :rtype: list[AlbumRuntimeRecord]
+        """
+        start = self._start(after_id)
+        stop = len(self.album_ids) if limit is None else min(start + limit, len(self.album_ids))
+        track_starts = self.album_track_starts
+        return [
+            AlbumRuntimeRecord(
+                id=self.album_ids[position],
+                title=self.strings.text(self.album_titles[position]),
+                year=self.album_years[position],
+                track_count=track_starts[position + 1] - track_starts[position],
+                runtime_seconds=sum(self.track_seconds[track_starts[position] : track_starts[position + 1]]),
+            )
+            for position in range(start, stop)
+        ]
+
+
+class ColumnarStore:
+    """
+    Hold the current columnar catalog and map the file again when it is rewritten.
+
+    :param Path path: Columnar catalog file whose modification time is watched.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the store, the file is mapped on first access."""
+        self.path = path
+        self._catalog: ColumnarCatalog | None = None
+        self._lock = Lock()
+
+    def get(self) -> ColumnarCatalog:
+        """
+        Return the catalog matching the current file, mapping it again if needed.
+
+        :return: Up-to-date columnar catalog.
+        :rtype: ColumnarCatalog
+        """
+        version = get_db_version(self.path)
+        catalog = self._catalog
+        if catalog is not None and catalog.version == version:
+            return catalog
+
+        with self._lock:
+            if self._catalog is None or self._catalog.version != version:
+                self._catalog = ColumnarCatalog.open(self.path)
+            return self._catalog
+
+
+def create_columnar_dependency(store: ColumnarStore) -> Callable[[], Generator[ColumnarCatalog, None, None]]:
+    """
+    Create a FastAPI-compatible dependency function that yields the current columnar catalog.
+
+    The catalog takes the place of the SQLAlchemy session in route handlers.
+
+    :param ColumnarStore store: Store holding the columnar catalog.
+    :return: Callable dependency function that yields a catalog.
+    :rtype: Callable[[], Generator[ColumnarCatalog, None, None]]
+    """
+
+    def get_catalog() -> Generator[ColumnarCatalog, None, None]:
+        yield store.get()
+
+    return get_catalog
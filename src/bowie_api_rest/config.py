@@ -6,6 +6,19 @@ Load environment variables and define constants for file paths and other configu
 
 import os
 from pathlib import Path
+from typing import Literal
+
+
+def _getenv_int(name: str) -> int | None:
+    """Return an integer environment variable, None when it is not set."""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _getenv_bool(name: str) -> bool | None:
+    """Return a boolean environment variable, None when it is not set."""
+    value = os.getenv(name)
+    return value.lower() in ("1", "true", "yes") if value else None
 
 
 # Configuration variables
@@ -15,3 +28,193 @@ This variable holds the default path to the SQLite database file used by the app
 It can be overridden by the `DB_PATH` environment variable loaded from the `.env` file.
 If not defined, the default path will be relative to the current file's directory.
 """
+
+ServingMode = Literal["database", "async", "snapshot", "columnar"]
+"""
+Supported ways of answering read requests: per-request SQL queries (sync or async), an in-memory snapshot
+or a memory-mapped columnar catalog file.
+"""
+
+SERVING_MODE: ServingMode = os.getenv("SERVING_MODE", "database")  # type: ignore[assignment]
+"""
+This variable selects how the API answers read requests.
+With `database` (the default), every request opens a SQLAlchemy session and queries the SQLite file.
+With `async`, requests are handled by `async` routes querying the SQLite file through an `AsyncSession`.
+With `snapshot`, the whole catalog is loaded in memory at startup and reloaded when the database file changes.
+With `columnar`, requests are answered from the columnar catalog file built next to the database file
+(`build_db.py --columnar`), memory-mapped at startup and mapped again when the file is rebuilt.
+It can be overridden by the `SERVING_MODE` environment variable.
+"""
+
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+"""
+This variable holds the number of SQLite connections kept open in the engine connection pool.
+It can be overridden by the `DB_POOL_SIZE` environment variable.
+"""
+
+DB_POOL_MAX_OVERFLOW: int = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+"""
+This variable holds the number of extra connections the pool may open when all pooled connections are in use.
+It can be overridden by the `DB_POOL_MAX_OVERFLOW` environment variable.
+"""
+
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+"""
+This variable enables testing connections for liveness each time they are checked out of the pool.
+It can be overridden by the `DB_POOL_PRE_PING` environment variable.
+"""
+
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+"""
+This variable holds the number of seconds after which a pooled connection is replaced, `-1` to never recycle.
+It can be overridden by the `DB_POOL_RECYCLE` environment variable.
+"""
+
+RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+"""
+This variable holds the maximum number of serialized responses kept in the response cache, `0` to disable it.
+It can be overridden by the `RESPONSE_CACHE_SIZE` environment variable.
+"""
+
+RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "0"))
+"""
+This variable holds the number of seconds a cached response stays valid, `0` to keep it until evicted.
+Cached responses are always dropped when the database file changes.
+It can be overridden by the `RESPONSE_CACHE_TTL` environment variable.
+"""
+
+HTTP_CACHE_MAX_AGE: int = int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+"""
+This variable holds the number of seconds clients and CDNs may reuse a catalog response without revalidating it
+(`Cache-Control: max-age`), `0` to make them revalidate it every time with its `ETag` or `Last-Modified` date.
+It can be overridden by the `HTTP_CACHE_MAX_AGE` environment variable.
+"""
+
+COMPRESSION_CODINGS: tuple[str, ...] = tuple(
+    coding.strip() for coding in os.getenv("COMPRESSION_CODINGS", "br,zstd,gzip").split(",") if coding.strip()
+)
+"""
+This variable holds the content codings offered for the catalog responses, in order of preference.
+`br` and `zstd` are only offered when the `compression` optional dependencies are installed, empty disables compression.
+It can be overridden by the `COMPRESSION_CODINGS` environment variable, as a comma-separated list.
+"""
+
+COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+"""
+This variable holds the size in bytes below which response bodies are sent uncompressed.
+It can be overridden by the `COMPRESSION_MINIMUM_SIZE` environment variable.
+"""
+
+SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+"""
+This variable holds the number of worker processes started by the production server `bowie_api_rest.server`,
+one per CPU core by default.
+It can be overridden by the `SERVER_WORKERS` environment variable.
+"""
+
+CATALOG_CHECK_INTERVAL: float = float(os.getenv("CATALOG_CHECK_INTERVAL", "5"))
+"""
+This variable holds the number of seconds between two checks of the database file by the production server,
+which restarts its workers on a newly loaded catalog when the file changed, `0` to only restart them on `SIGHUP`.
+It can be overridden by the `CATALOG_CHECK_INTERVAL` environment variable.
+"""
+
+FAST_SERIALIZATION: bool = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+"""
+This variable enables serializing album responses straight to JSON bytes, skipping the Pydantic
+validation FastAPI performs through `response_model`. The OpenAPI schema is unchanged.
+It can be overridden by the `FAST_SERIALIZATION` environment variable.
+"""
+
+METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+"""
+This variable enables the request instrumentation: `Server-Timing` response headers and the `/metrics` endpoint.
+It can be overridden by the `METRICS_ENABLED` environment variable.
+"""
+
+PROFILE_DIR: Path | None = Path(os.environ["PROFILE_DIR"]) if os.getenv("PROFILE_DIR") else None
+"""
+This variable holds the directory receiving the collapsed stacks of the profiled requests, profiling is disabled
+when it is not set. It can be set by the `PROFILE_DIR` environment variable.
+"""
+
+PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+"""
+This variable holds the fraction of the requests profiled when profiling is enabled, from `0` (only the requests
+sent with the `X-Profile` token) to `1`. It can be overridden by the `PROFILE_SAMPLE_RATE` environment variable.
+"""
+
+PROFILE_TOKEN: str | None = os.getenv("PROFILE_TOKEN") or None
+"""
+This variable holds the secret value of the `X-Profile` header of the requests asking to be profiled, requests
+can only ask for a profile when it is set. It can be set by the `PROFILE_TOKEN` environment variable.
+"""
+
+MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+"""
+This variable holds the maximum number of albums a client may request per page with the `limit` parameter.
+It can be overridden by the `MAX_PAGE_SIZE` environment variable.
+"""
+
+MAX_BATCH_QUERIES: int = int(os.getenv("MAX_BATCH_QUERIES", "500"))
+"""
+This variable holds the maximum number of album titles, and of track titles, a client may look up in one batch request.
+It can be overridden by the `MAX_BATCH_QUERIES` environment variable.
+"""
+
+SqliteProfile = Literal["default", "performance", "read-only"]
+"""Presets of SQLite connection settings for the serving engine, see `bowie_api_rest.database.SQLITE_PROFILES`."""
+
+SQLITE_PROFILE: SqliteProfile = os.getenv("SQLITE_PROFILE", "default")  # type: ignore[assignment]
+"""
+This variable selects the SQLite settings applied to every connection of the serving engine.
+With `default`, SQLite defaults are kept.
+With `performance`, the database uses WAL mode, memory-mapped I/O, a larger page cache and in-memory temporary storage.
+With `read-only`, the file is additionally opened read-only and immutable, for servers that never write
+and whose database file is only replaced while they are stopped.
+It can be overridden by the `SQLITE_PROFILE` environment variable, and each setting of the profile
+by the `SQLITE_*` variables below.
+"""
+
+SQLITE_JOURNAL_MODE: str | None = os.getenv("SQLITE_JOURNAL_MODE") or None
+"""
+This variable overrides the journal mode of the profile (`wal`, `delete`...).
+It can be set by the `SQLITE_JOURNAL_MODE` environment variable.
+"""
+
+SQLITE_MMAP_SIZE: int | None = _getenv_int("SQLITE_MMAP_SIZE")
+"""
+This variable overrides the number of bytes of the database file read through memory-mapped I/O, `0` to disable it.
+It can be set by the `SQLITE_MMAP_SIZE` environment variable.
+"""
+
+SQLITE_CACHE_SIZE: int | None = _getenv_int("SQLITE_CACHE_SIZE")
+"""
+This variable overrides the page cache size of every connection, in pages, or in KiB when negative.
+It can be set by the `SQLITE_CACHE_SIZE` environment variable.
+"""
+
+SQLITE_TEMP_STORE: str | None = os.getenv("SQLITE_TEMP_STORE") or None
+"""
+This variable overrides where temporary tables and indexes are stored (`default`, `file` or `memory`).
+It can be set by the `SQLITE_TEMP_STORE` environment variable.
+"""
+
+SQLITE_QUERY_ONLY: bool | None = _getenv_bool("SQLITE_QUERY_ONLY")
+"""
+This variable overrides whether the serving connections refuse any write.
+It can be set by the `SQLITE_QUERY_ONLY` environment variable.
+"""
+
+SQLITE_READ_ONLY: bool | None = _getenv_bool("SQLITE_READ_ONLY")
+"""
+This variable overrides whether the database file is opened read-only (`mode=ro` URI parameter).
+It can be set by the `SQLITE_READ_ONLY` environment variable.
+"""
+
+SQLITE_IMMUTABLE: bool | None = _getenv_bool("SQLITE_IMMUTABLE")
+"""
+This variable overrides whether the database file is opened as immutable (`immutable=1` URI parameter):
+SQLite then skips all locking and change detection, so the file must not be modified while the server runs.
+It can be set by the `SQLITE_IMMUTABLE` environment variable.
+"""
@@ -0,0 +1,323 @@
+"""
+Negotiated compression and compact binary encoding of the catalog responses.
+
+Responses are compressed with the best content coding accepted by the client (`br`, `zstd` or `gzip`), and JSON
+bodies are re-encoded as MessagePack for clients preferring `application/msgpack` in their `Accept` header.
+Brotli, Zstandard and MessagePack support is optional: codings and media types whose package is not installed
+are never selected. Encoded bodies of complete responses are kept in a cache separate from the plain responses,
+cleared whenever the database file changes, so each variant of a response is compressed once per catalog version.
+"""
+
+from collections.abc import Callable
+from typing import Protocol
+import zlib
+
+from pydantic_core import from_json
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from bowie_api_rest.cache import CACHEABLE_STATUS_CODES, CacheKey, ResponseCache, make_cache_key
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the installed extras
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the installed extras
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installed extras
+    zstandard = None
+
+
+JSON_MEDIA_TYPE: str = "application/json"
+"""Media type of the responses built by the routes."""
+
+MSGPACK_MEDIA_TYPE: str = "application/msgpack"
+"""Media type of the MessagePack responses."""
+
+MSGPACK_MEDIA_TYPES: frozenset[str] = frozenset(
+    {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+)
+"""Media types requesting MessagePack in an `Accept` header."""
+
+
+class Compressor(Protocol):
+    """Incremental compressor, as returned by `zlib.compressobj`."""
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk of data, returning the compressed bytes available so far."""
+
+    def flush(self) -> bytes:
+        """Finish the compressed stream, returning the remaining compressed bytes."""
+
+
+class _BrotliCompressor:
+    """Adapter giving the `brotli.Compressor` the interface of `zlib.compressobj`."""
+
+    def __init__(self, quality: int) -> None:
+        """Start a Brotli stream."""
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk of data."""
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """Finish the Brotli stream."""
+        return self._compressor.finish()
+
+
+def available_codings() -> dict[str, Callable[[], Compressor]]:
+    """
+    Return the factories of compressors of the content codings supported by the installed packages.
+
+    Levels favour speed, close to the defaults of the reference tools, as responses are compressed on demand.
+
+    :return: Mapping of content coding names to compressor factories, in order of preference.
+    :rtype: dict[str, Callable[[], Compressor]]
+    """
+    codings: dict[str, Callable[[], Compressor]] = {}
+    if brotli is not None:
+        codings["br"] = lambda: _BrotliCompressor(quality=5)
+    if zstandard is not None:
+        codings["zstd"] = lambda: zstandard.ZstdCompressor(level=3).compressobj()
+    codings["gzip"] = lambda: zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return codings
+
+
+def parse_qualities(header: str) -> dict[str, float]:
+    """
+    Parse an `Accept` or `Accept-Encoding` header into its values and quality factors.
+
+    :param str header: Header value, e.g. `gzip, br;q=0.8`.
+    :return: Mapping of lowercased values to their quality, 1 when not given.
+    :rtype: dict[str, float]
+    """
+    qualities: dict[str, float] = {}
+    for item in header.split(","):
+        value, *parameters = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for parameter in parameters:
+            name, _, number = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if value:
+            qualities[value.lower()] = quality
+    return qualities
+
+
+def negotiate_coding(accept_encoding: str, codings: tuple[str, ...]) -> str | None:
+    """
+    Choose the content coding of a response.
+
+    :param str accept_encoding: Value of the `Accept-Encoding` request header.
+    :param tuple[str, ...] codings: Supported codings, in order of preference.
+    :return: Accepted coding of highest quality, ties broken by preference, or None to send the body as is.
+    :rtype: Optional[str]
+    """
+    qualities = parse_qualities(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    ranked = [(qualities.get(coding, wildcard), -rank, coding) for rank, coding in enumerate(codings)]
+    quality, _, coding = max(ranked, default=(0.0, 0, None))
+    return coding if quality > 0 else None
+
+
+def negotiate_media_type(accept: str) -> str:
+    """
+    Choose the media type of a JSON response, MessagePack only when the client prefers it.
+
+    :param str accept: Value of the `Accept` request header.
+    :return: :data:`MSGPACK_MEDIA_TYPE` or :data:`JSON_MEDIA_TYPE`.
+    :rtype: str
+    """
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    qualities = parse_qualities(accept)
+    msgpack_quality = max((qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES), default=0.0)
+    json_quality = qualities.get(JSON_MEDIA_TYPE, qualities.get("application/*", qualities.get("*/*", 0.0)))
+    return MSGPACK_MEDIA_TYPE if msgpack_quality > 0 and msgpack_quality >= json_quality else JSON_MEDIA_TYPE
+
+
+def add_vary(headers: MutableHeaders, *names: str) -> None:
+    """
+    Add request header names to the `Vary` header of a response.
+
+    :param MutableHeaders headers: Response headers.
+    :param str names: Names of the request headers the response depends on.
+    """
+    vary = [value.strip() for value in headers.get("vary", "").split(",") if value.strip()]
+    vary.extend(name for name in names if name.lower() not in {value.lower() for value in vary})
+    headers["vary"] = ", ".join(vary)
+
+
+class ContentNegotiationMiddleware:
+    """
+    ASGI middleware compressing and re-encoding the `GET` responses of the catalog endpoints.
+
+    Complete responses are encoded at once and cached, streamed responses are compressed chunk by chunk.
+
+    :param ASGIApp app: Wrapped ASGI application.
+    :param tuple[str, ...] codings: Content codings to offer, in order of preference,
+        those whose package is not installed are ignored.
+    :param int minimum_size: Size in bytes below which bodies are not compressed.
+    :param Optional[ResponseCache] cache: Cache of the encoded responses, None to encode them on every request.
+    :param tuple[str, ...] path_prefixes: Prefixes of the paths whose responses are negotiated.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        codings: tuple[str, ...] = ("br", "zstd", "gzip"),
+        minimum_size: int = 1024,
+        cache: ResponseCache | None = None,
+        path_prefixes: tuple[str, ...] = ("/albums", "/tracks", "/search", "/autocomplete", "/export"),
+    ) -> None:
+        """Wrap the application."""
+        self.app = app
+        supported = available_codings()
+        self.compressors = {coding: supported[coding] for coding in codings if coding in supported}
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.path_prefixes = path_prefixes
+
+    def encode(self, body: bytes, media_type: str, coding: str | None) -> tuple[bytes, str | None]:
+        """
+        Encode a complete JSON body.
+
+        :param bytes body: JSON body.
+        :param str media_type: Negotiated media type.
+        :param Optional[str] coding: Negotiated content coding, None for no compression.
+        :return: Encoded body and its content coding, None when the body is too small to be compressed.
+        :rtype: tuple[bytes, Optional[str]]
+        """
+        if media_type == MSGPACK_MEDIA_TYPE:
+            body = msgpack.packb(from_json(body))
+        if coding is None or len(body) < self.minimum_size:
+            return body, None
+        compressor = self.compressors[coding]()
+        return compressor.compress(body) + compressor.flush(), coding
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send the cached encoded response, or forward the request and encode its response."""
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        media_type = negotiate_media_type(request_headers.get("accept", ""))
+        coding = negotiate_coding(request_headers.get("accept-encoding", ""), tuple(self.compressors))
+        if media_type == JSON_MEDIA_TYPE and coding is None:
+            await self.app(scope, receive, self._send_with_vary(send))
+            return
+
+        # The variant is part of the key, as other clients may get other encodings of the same response
+        path, parameters = make_cache_key(scope)
+        key: CacheKey = (path, (*parameters, ("accept", media_type), ("accept-encoding", coding or "identity")))
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is not None:
+            await send({"type": "http.response.start", "status": entry.status, "headers": entry.headers})
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        start: Message = {}
+        compressor: Compressor | None = None
+        streaming = False
+
+        async def send_encoded(message: Message) -> None:
+            nonlocal start, compressor, streaming
+            if message["type"] == "http.response.start":
+                # Headers depend on the body, they are sent with its first chunk
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not streaming and not more_body:
+                await self._send_complete(send, start, body, key, media_type, coding)
+                return
+
+            # Streamed response, compressed chunk by chunk unless it is already encoded
+            if not streaming:
+                streaming = True
+                start, compressor = self._start_stream(start, coding)
+                await send(start)
+            if compressor is not None:
+                body = compressor.compress(body) + (b"" if more_body else compressor.flush())
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_encoded)
+
+    async def _send_complete(
+        self, send: Send, start: Message, body: bytes, key: CacheKey, media_type: str, coding: str | None
+    ) -> None:
+        """
+        Encode, cache and send a complete response.
+
+        :param Send send: ASGI send callable.
+        :param Message start: Response start message of the application.
+        :param bytes body: Response body of the application.
+        :param CacheKey key: Cache key of the negotiated variant.
+        :param str media_type: Negotiated media type.
+        :param Optional[str] coding: Negotiated content coding, None for no compression.
+        """
+        status = start["status"]
+        headers = MutableHeaders(raw=list(start.get("headers", ())))
+        if status in CACHEABLE_STATUS_CODES and headers.get("content-type", "").startswith(JSON_MEDIA_TYPE):
+            body, body_coding = self.encode(body, media_type, coding)
+            headers["content-type"] = media_type if media_type != JSON_MEDIA_TYPE else headers["content-type"]
+            if body_coding is not None:
+                headers["content-encoding"] = body_coding
+            headers["content-length"] = str(len(body))
+        add_vary(headers, "Accept", "Accept-Encoding")
+        if self.cache is not None and status in CACHEABLE_STATUS_CODES:
+            self.cache.put(key, status, tuple(headers.raw), body)
+        await send({**start, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+    def _start_stream(self, start: Message, coding: str | None) -> tuple[Message, Compressor | None]:
+        """
+        Prepare the response start message and the compressor of a streamed response.
+
+        :param Message start: Response start message of the application.
+        :param Optional[str] coding: Negotiated content coding, None for no compression.
+        :return: Response start message to send, and the compressor of the chunks if they are to be compressed.
+        :rtype: tuple[Message, Optional[Compressor]]
+        """
+        headers = MutableHeaders(raw=list(start.get("headers", ())))
+        add_vary(headers, "Accept", "Accept-Encoding")
+        compressor = None
+        if coding is not None and "content-encoding" not in headers:
+            compressor = self.compressors[coding]()
+            headers["content-encoding"] = coding
+            del headers["content-length"]
+        return {**start, "headers": headers.raw}, compressor
+
+    def _send_with_vary(self, send: Send) -> Send:
+        """
+        Wrap a send callable so that the response tells caches it depends on the negotiated headers.
+
+        :param Send send: ASGI send callable.
+        :return: Wrapped send callable.
+        :rtype: Send
+        """
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", ())))
+                add_vary(headers, "Accept", "Accept-Encoding")
+                message = {**message, "headers": headers.raw}
+            await send(message)
+
+        return send_with_vary
@@ -1,52 +1,830 @@
 """Data access layer for querying album and track information."""
 
-from sqlalchemy import func, select
+from collections.abc import AsyncIterator, Collection, Iterable, Iterator, Sequence
+from itertools import groupby
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import CTE, Integer, Row, Select, String, Table, and_, column, func, select, values
 from sqlalchemy.orm import Session, selectinload
 
+from bowie_api_rest.columnar import ColumnarCatalog
 from bowie_api_rest.models import Album, Track
+from bowie_api_rest.search_index import TitleMatch, album_title_fts, track_title_fts
+from bowie_api_rest.snapshot import (
+    AlbumRecord,
+    AlbumRuntimeRecord,
+    CatalogSnapshot,
+    TrackDurationRecord,
+    aiter_album_records,
+    album_track_rows_stmt,
+    group_album_rows,
+    iter_album_records,
+)
+
+
+if TYPE_CHECKING:
+    # Only imported by the async serving mode, which requires the `async` optional dependencies
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+PREFIX_UPPER_BOUND: str = "\U0010ffff"
+"""Largest code point, appended to a prefix to bound the range of the titles starting with it."""
+
+InMemoryCatalog = CatalogSnapshot | ColumnarCatalog
+"""Catalogs answering the queries without SQL, through the same methods, in place of a SQLAlchemy session."""
+
+
+def _keyset_page(stmt: Select[tuple[Album]], limit: int | None, after_id: int | None) -> Select[tuple[Album]]:
+    """
+    Restrict a SELECT statement on albums ordered by identifier to one keyset page.
+
+    Seeking past `after_id` uses the primary key, so the cost of a page does not depend on its position.
+
+    :param Select[tuple[Album]] stmt: SELECT statement on albums, ordered by identifier.
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: SELECT statement of the page.
+    :rtype: Select[tuple[Album]]
+    """
+    if after_id is not None:
+        stmt = stmt.where(Album.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
 
 
-def get_albums_by_title(session: Session, album_title_part: str) -> list[Album]:
+def _matching_ids(model: type[Album] | type[Track], fts_table: Table, title_part: str, match: TitleMatch) -> Select:
     """
-    Retrieve all albums that match a partial album title (case-insensitive).
+    Build the SELECT statement of the identifiers of the albums or tracks whose title matches the searched text.
+
+    Substrings are found through the trigram index, exact titles and prefixes through the index on the lowercased
+    titles, so that no search scans the album or track table. SQLite `lower()` only folds ASCII letters.
+
+    :param type[Album] | type[Track] model: Searched model.
+    :param Table fts_table: Trigram index over the titles of the model.
+    :param str title_part: Text to search for (case-insensitive).
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: SELECT statement of identifiers.
+    :rtype: Select
+    """
+    if match == "contains":
+        return select(fts_table.c.rowid).where(fts_table.c.title.like(f"%{title_part}%"))
+
+    title = func.lower(model.title)
+    searched = func.lower(title_part, type_=String)
+    if match == "exact":
+        return select(model.id).where(title == searched)
+    return select(model.id).where(title >= searched, title < searched.concat(PREFIX_UPPER_BOUND))
+
+
+def _all_albums_stmt(limit: int | None = None, after_id: int | None = None) -> Select[tuple[Album]]:
+    """
+    Build the SELECT statement listing all albums with their tracks.
+
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: SELECT statement on albums.
+    :rtype: Select[tuple[Album]]
+    """
+    stmt = select(Album).order_by(Album.id).options(selectinload(Album.tracks))
+    return _keyset_page(stmt, limit, after_id)
+
+
+def _albums_by_title_stmt(
+    album_title_part: str, limit: int | None = None, after_id: int | None = None, match: TitleMatch = "contains"
+) -> Select[tuple[Album]]:
+    """
+    Build the SELECT statement finding albums whose title contains the given substring.
 
-    :param Session session: SQLAlchemy session to perform the query.
     :param str album_title_part: Partial album title to search for (case-insensitive).
-    :return: List of albums matching the search criteria, with their tracks.
-    :rtype: List[Album]
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: SELECT statement on albums.
+    :rtype: Select[tuple[Album]]
     """
-    # Build a SELECT statement to find albums with titles matching the substring
+    # Find the matching album identifiers through an index instead of scanning the album table
+    matching_ids = _matching_ids(Album, album_title_fts, album_title_part, match)
+
     stmt = (
         select(Album)
-        .where(func.lower(Album.title).like(f"%{album_title_part.lower()}%"))
+        .where(Album.id.in_(matching_ids))
+        .order_by(Album.id)
         .options(selectinload(Album.tracks))  # Eager load tracks
     )
+    return _keyset_page(stmt, limit, after_id)
+
+
+def _albums_containing_track_stmt(
+    track_title_part: str, limit: int | None = None, after_id: int | None = None, match: TitleMatch = "contains"
+) -> Select[tuple[Album]]:
+    """
+    Build the SELECT statement finding albums with at least one track whose title contains the given substring.
+
+    :param str track_title_part: Substring to search for in track titles (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: SELECT statement on albums.
+    :rtype: Select[tuple[Album]]
+    """
+    # Find the matching track identifiers through an index instead of scanning the track table
+    matching_ids = _matching_ids(Track, track_title_fts, track_title_part, match)
+
+    # The IN clause already ensures uniqueness of albums
+    stmt = (
+        select(Album)
+        .where(Album.id.in_(select(Track.album_id).where(Track.id.in_(matching_ids))))
+        .order_by(Album.id)
+        .options(selectinload(Album.tracks))  # Eager load tracks
+    )
+    return _keyset_page(stmt, limit, after_id)
+
+
+def _albums_with_matching_tracks_stmt(
+    track_title_part: str, limit: int | None = None, after_id: int | None = None, match: TitleMatch = "contains"
+) -> Select:
+    """
+    Build the SELECT statement returning one row per matching track, with the columns of its album.
+
+    The page of albums is selected in a subquery, so a single statement returns every row of the page.
+
+    :param str track_title_part: Substring to search for in track titles (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: SELECT statement on albums joined with their matching tracks, sorted by album and track.
+    :rtype: Select
+    """
+    # Find the matching track identifiers through an index instead of scanning the track table
+    matching_ids = _matching_ids(Track, track_title_fts, track_title_part, match)
+
+    stmt = (
+        select(Album.id, Album.title, Album.year, Track.id, Track.title, Track.duration)
+        .join(Track, Track.album_id == Album.id)
+        .where(Track.id.in_(matching_ids))
+        .order_by(Album.id, Track.id)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Album.id > after_id)
+    if limit is not None:
+        # Restrict the rows to the first `limit` albums having a matching track
+        page_ids = (
+            select(Track.album_id).where(Track.id.in_(matching_ids)).distinct().order_by(Track.album_id).limit(limit)
+        )
+        if after_id is not None:
+            page_ids = page_ids.where(Track.album_id > after_id)
+        stmt = stmt.where(Album.id.in_(page_ids))
+    return stmt
+
+
+def _albums_by_ids_stmt(album_ids: Collection[int]) -> Select:
+    """
+    Build the SELECT statement returning the rows of albums and all their tracks, from the album identifiers.
+
+    :param Collection[int] album_ids: Album identifiers.
+    :return: SELECT statement on albums joined with their tracks, sorted by album and track.
+    :rtype: Select
+    """
+    return album_track_rows_stmt().where(Album.id.in_(album_ids))
+
+
+def _albums_with_tracks_stmt(track_ids: Collection[int]) -> Select:
+    """
+    Build the SELECT statement returning one row per track, with the columns of its album, from the track identifiers.
+
+    :param Collection[int] track_ids: Track identifiers.
+    :return: SELECT statement on albums joined with the given tracks, sorted by album and track.
+    :rtype: Select
+    """
+    return (
+        select(Album.id, Album.title, Album.year, Track.id, Track.title, Track.duration)
+        .join(Track, Track.album_id == Album.id)
+        .where(Track.id.in_(track_ids))
+        .order_by(Album.id, Track.id)
+    )
+
+
+def _batch_queries_cte(title_parts: Sequence[str]) -> CTE:
+    """
+    Build the common table expression holding the searched texts of a batch, with their position.
+
+    :param Sequence[str] title_parts: Searched texts.
+    :return: `VALUES` common table expression with `position` and `text` columns.
+    :rtype: CTE
+    """
+    rows = values(column("position", Integer), column("text", String), name="batch_query")
+    return rows.data(list(enumerate(title_parts))).cte("batch_query")
+
+
+def _batch_matching_ids(model: type[Album] | type[Track], fts_table: Table, queries: CTE, match: TitleMatch) -> Select:
+    """
+    Build the SELECT statement of the identifiers matching every searched text of a batch, like :func:`_matching_ids`.
+
+    :param type[Album] | type[Track] model: Searched model.
+    :param Table fts_table: Trigram index over the titles of the model.
+    :param CTE queries: Searched texts, from :func:`_batch_queries_cte`.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: SELECT statement of the query positions and matching identifiers, NULL for texts matching nothing.
+    :rtype: Select
+    """
+    if match == "contains":
+        # The outer join keeps the searched texts as the outer loop, so that SQLite hands each pattern
+        # to the trigram index, while an inner join lets it scan the whole index once per searched text
+        pattern = "%" + queries.c.text + "%"
+        return (
+            select(queries.c.position, fts_table.c.rowid.label("id"))
+            .select_from(queries)
+            .outerjoin(fts_table, fts_table.c.title.like(pattern))
+        )
+
+    title = func.lower(model.title)
+    searched = func.lower(queries.c.text, type_=String)
+    if match == "exact":
+        condition = title == searched
+    else:
+        condition = and_(title >= searched, title < searched.concat(PREFIX_UPPER_BOUND))
+    return select(queries.c.position, model.id).select_from(queries).join(model, condition)
+
+
+def _batch_page(stmt: Select, limit: int | None) -> Select:
+    """
+    Sort the rows of a batch statement and keep the first `limit` albums of every searched text.
+
+    :param Select stmt: SELECT statement of the query position followed by album and track columns.
+    :param Optional[int] limit: Maximum number of albums per searched text, all of them when omitted.
+    :return: SELECT statement sorted by query position, album and track.
+    :rtype: Select
+    """
+    if limit is None:
+        return stmt.order_by(*stmt.selected_columns[:2], stmt.selected_columns[3])
+
+    # Number the albums of every searched text, rows of the same album share the same rank
+    position, album_id = stmt.selected_columns[:2]
+    album_rank = func.dense_rank().over(partition_by=position, order_by=album_id).label("album_rank")
+    ranked = stmt.add_columns(album_rank).subquery()
+    columns = list(ranked.c)[:-1]
+    return select(*columns).where(ranked.c.album_rank <= limit).order_by(columns[0], columns[1], columns[4])
+
+
+def _batch_albums_by_title_stmt(
+    album_title_parts: Sequence[str], limit: int | None = None, match: TitleMatch = "contains"
+) -> Select:
+    """
+    Build the single SELECT statement finding the albums matching each of several partial titles.
+
+    :param Sequence[str] album_title_parts: Partial album titles to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums per partial title.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: SELECT statement of the query position followed by the rows of :func:`album_track_rows_stmt`.
+    :rtype: Select
+    """
+    matches = _batch_matching_ids(Album, album_title_fts, _batch_queries_cte(album_title_parts), match).subquery()
+    stmt = (
+        select(matches.c.position, Album.id, Album.title, Album.year, Track.id, Track.title, Track.duration)
+        .join(Album, Album.id == matches.c.id)
+        .outerjoin(Track, Track.album_id == Album.id)
+    )
+    return _batch_page(stmt, limit)
+
+
+def _batch_albums_with_matching_tracks_stmt(
+    track_title_parts: Sequence[str], limit: int | None = None, match: TitleMatch = "contains"
+) -> Select:
+    """
+    Build the single SELECT statement finding the albums and tracks matching each of several partial track titles.
+
+    :param Sequence[str] track_title_parts: Partial track titles to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums per partial title.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: SELECT statement of the query position followed by album and matching track columns.
+    :rtype: Select
+    """
+    matches = _batch_matching_ids(Track, track_title_fts, _batch_queries_cte(track_title_parts), match).subquery()
+    stmt = (
+        select(matches.c.position, Album.id, Album.title, Album.year, Track.id, Track.title, Track.duration)
+        .join(Track, Track.id == matches.c.id)
+        .join(Album, Album.id == Track.album_id)
+    )
+    return _batch_page(stmt, limit)
+
+
+def _group_batch_rows(rows: Iterable[Row], count: int) -> list[list[AlbumRecord]]:
+    """
+    Group the rows of a batch statement into the albums found for every searched text.
+
+    :param Iterable[Row] rows: Rows of the query position followed by album and track columns, sorted by position.
+    :param int count: Number of searched texts.
+    :return: Albums found for every searched text, in the order of the texts.
+    :rtype: list[list[AlbumRecord]]
+    """
+    results: list[list[AlbumRecord]] = [[] for _ in range(count)]
+    for position, position_rows in groupby(rows, key=itemgetter(0)):
+        results[position] = list(group_album_rows(row[1:] for row in position_rows))
+    return results
+
+
+def _tracks_by_duration_stmt(
+    min_seconds: int | None = None,
+    max_seconds: int | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+) -> Select:
+    """
+    Build the SELECT statement finding the tracks whose duration is within a range, sorted by duration.
+
+    :param Optional[int] min_seconds: Minimum duration in seconds, inclusive.
+    :param Optional[int] max_seconds: Maximum duration in seconds, inclusive.
+    :param bool descending: Whether the longest tracks come first.
+    :param Optional[int] limit: Maximum number of tracks to return.
+    :return: SELECT statement on tracks, sorted by duration then identifier (both reversed when descending).
+    :rtype: Select
+    """
+    stmt = select(Track.id, Track.title, Track.duration, Track.duration_seconds, Track.album_id)
+    if min_seconds is not None:
+        stmt = stmt.where(Track.duration_seconds >= min_seconds)
+    if max_seconds is not None:
+        stmt = stmt.where(Track.duration_seconds <= max_seconds)
+    # The duration index serves both the range and the order
+    if descending:
+        stmt = stmt.order_by(Track.duration_seconds.desc(), Track.id.desc())
+    else:
+        stmt = stmt.order_by(Track.duration_seconds, Track.id)
+    return stmt.limit(limit)
+
+
+def _album_runtimes_stmt(limit: int | None = None, after_id: int | None = None) -> Select:
+    """
+    Build the SELECT statement computing the number of tracks and the total runtime of albums.
+
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: SELECT statement on albums with their aggregates, ordered by identifier.
+    :rtype: Select
+    """
+    stmt = (
+        select(
+            Album.id,
+            Album.title,
+            Album.year,
+            func.count(Track.id).label("track_count"),
+            func.coalesce(func.sum(Track.duration_seconds), 0).label("runtime_seconds"),
+        )
+        .outerjoin(Track, Track.album_id == Album.id)
+        .group_by(Album.id)
+        .order_by(Album.id)
+    )
+    return _keyset_page(stmt, limit, after_id)
+
+
+def get_all_albums(
+    session: Session | InMemoryCatalog, limit: int | None = None, after_id: int | None = None
+) -> list[Album] | list[AlbumRecord]:
+    """
+    Retrieve all albums with their tracks, ordered by identifier.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: List of all albums, with their tracks.
+    :rtype: list[Album] | list[AlbumRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.list_albums(limit, after_id)
+
+    albums: list[Album] = session.execute(_all_albums_stmt(limit, after_id)).scalars().all()
+    return albums
+
+
+def get_albums_by_title(
+    session: Session | InMemoryCatalog,
+    album_title_part: str,
+    limit: int | None = None,
+    after_id: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[Album] | list[AlbumRecord]:
+    """
+    Retrieve all albums that match a partial album title (case-insensitive), ordered by identifier.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param str album_title_part: Partial album title to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: List of albums matching the search criteria, with their tracks.
+    :rtype: list[Album] | list[AlbumRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.get_albums_by_title(album_title_part, limit, after_id, match)
 
     # Execute the query and get all albums matching the partial title
-    albums: list[Album] = session.execute(stmt).scalars().all()
+    albums: list[Album] = (
+        session.execute(_albums_by_title_stmt(album_title_part, limit, after_id, match)).scalars().all()
+    )
     return albums
 
 
-def get_albums_containing_track(session: Session, track_title_part: str) -> list[Album]:
+def get_albums_containing_track(
+    session: Session | InMemoryCatalog,
+    track_title_part: str,
+    limit: int | None = None,
+    after_id: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[Album] | list[AlbumRecord]:
     """
     Retrieve all albums that contain at least one track with a title containing the given substring, case-insensitive.
 
-    The tracks of each album are eagerly loaded.
+    The tracks of each album are eagerly loaded, albums are ordered by identifier.
 
-    :param Session session: SQLAlchemy session to perform the query.
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
     :param str track_title_part: Substring to search for in track titles (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
     :return: List of albums matching the search criteria, with their tracks.
-    :rtype: List[Album]
+    :rtype: list[Album] | list[AlbumRecord]
     """
-    # Build a SELECT statement to find albums where at least one track title matches the substring
-    stmt = (
-        select(Album)
-        .join(Album.tracks)
-        .where(func.lower(Track.title).like(f"%{track_title_part.lower()}%"))
-        .options(selectinload(Album.tracks))  # Eager load tracks
-        .distinct()  # Ensure uniqueness of albums
-    )
+    if isinstance(session, InMemoryCatalog):
+        return session.get_albums_containing_track(track_title_part, limit, after_id, match)
 
-    # Execute the query and extract unique album results
-    albums: list[Album] = session.execute(stmt).unique().scalars().all()
+    # Execute the query and extract album results
+    stmt = _albums_containing_track_stmt(track_title_part, limit, after_id, match)
+    albums: list[Album] = session.execute(stmt).scalars().all()
     return albums
+
+
+def get_albums_with_matching_tracks(
+    session: Session | InMemoryCatalog,
+    track_title_part: str,
+    limit: int | None = None,
+    after_id: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[AlbumRecord]:
+    """
+    Retrieve the albums containing tracks whose title contains the given substring, with only those tracks.
+
+    Unlike :func:`get_albums_containing_track`, the non-matching tracks are never loaded:
+    the matching (album, track) pairs are fetched in a single statement and grouped by album.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param str track_title_part: Substring to search for in track titles (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: List of albums ordered by identifier, with their matching tracks only.
+    :rtype: list[AlbumRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.get_albums_with_matching_tracks(track_title_part, limit, after_id, match)
+
+    rows = session.execute(_albums_with_matching_tracks_stmt(track_title_part, limit, after_id, match))
+    return list(group_album_rows(rows))
+
+
+def get_albums_by_ids(session: Session | InMemoryCatalog, album_ids: Collection[int]) -> list[AlbumRecord]:
+    """
+    Retrieve albums with all their tracks from their identifiers, unknown identifiers are ignored.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Collection[int] album_ids: Album identifiers.
+    :return: Albums ordered by identifier.
+    :rtype: list[AlbumRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.get_albums_by_ids(album_ids)
+
+    return list(group_album_rows(session.execute(_albums_by_ids_stmt(album_ids))))
+
+
+def get_albums_with_tracks(session: Session | InMemoryCatalog, track_ids: Collection[int]) -> list[AlbumRecord]:
+    """
+    Retrieve the albums of tracks, with only those tracks, from the track identifiers.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Collection[int] track_ids: Track identifiers, unknown identifiers are ignored.
+    :return: Albums ordered by identifier, with their given tracks only.
+    :rtype: list[AlbumRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.get_albums_with_tracks(track_ids)
+
+    return list(group_album_rows(session.execute(_albums_with_tracks_stmt(track_ids))))
+
+
+def batch_get_albums_by_title(
+    session: Session | InMemoryCatalog,
+    album_title_parts: Sequence[str],
+    limit: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[list[AlbumRecord]]:
+    """
+    Retrieve the albums matching each of several partial album titles, like :func:`get_albums_by_title`.
+
+    Every title is searched by a single statement joining the searched texts with the title indexes.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Sequence[str] album_title_parts: Partial album titles to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums per partial title.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: Albums ordered by identifier, with their tracks, for every partial title in the same order.
+    :rtype: list[list[AlbumRecord]]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return [session.get_albums_by_title(title_part, limit, None, match) for title_part in album_title_parts]
+    if not album_title_parts:
+        return []
+
+    rows = session.execute(_batch_albums_by_title_stmt(album_title_parts, limit, match))
+    return _group_batch_rows(rows, len(album_title_parts))
+
+
+def batch_get_albums_with_matching_tracks(
+    session: Session | InMemoryCatalog,
+    track_title_parts: Sequence[str],
+    limit: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[list[AlbumRecord]]:
+    """
+    Retrieve the albums with the tracks matching each of several partial track titles.
+
+    Results are those of :func:`get_albums_with_matching_tracks`, found by a single statement joining the searched
+    texts with the title indexes.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Sequence[str] track_title_parts: Partial track titles to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums per partial title.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: Albums ordered by identifier, with their matching tracks only, for every partial title in the same order.
+    :rtype: list[list[AlbumRecord]]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return [
+            session.get_albums_with_matching_tracks(title_part, limit, None, match) for title_part in track_title_parts
+        ]
+    if not track_title_parts:
+        return []
+
+    rows = session.execute(_batch_albums_with_matching_tracks_stmt(track_title_parts, limit, match))
+    return _group_batch_rows(rows, len(track_title_parts))
+
+
+def get_tracks_by_duration(
+    session: Session | InMemoryCatalog,
+    min_seconds: int | None = None,
+    max_seconds: int | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+) -> list[Row] | list[TrackDurationRecord]:
+    """
+    Retrieve the tracks whose duration is within a range, sorted by duration.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Optional[int] min_seconds: Minimum duration in seconds, inclusive.
+    :param Optional[int] max_seconds: Maximum duration in seconds, inclusive.
+    :param bool descending: Whether the longest tracks come first.
+    :param Optional[int] limit: Maximum number of tracks to return.
+    :return: Tracks with their numeric duration and album identifier.
+    :rtype: list[Row] | list[TrackDurationRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.get_tracks_by_duration(min_seconds, max_seconds, descending, limit)
+
+    return list(session.execute(_tracks_by_duration_stmt(min_seconds, max_seconds, descending, limit)))
+
+
+def get_album_runtimes(
+    session: Session | InMemoryCatalog, limit: int | None = None, after_id: int | None = None
+) -> list[Row] | list[AlbumRuntimeRecord]:
+    """
+    Compute the number of tracks and the total runtime of albums, ordered by identifier.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session to perform the query, or in-memory catalog.
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: Albums with their track count and runtime in seconds.
+    :rtype: list[Row] | list[AlbumRuntimeRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        return session.get_album_runtimes(limit, after_id)
+
+    return list(session.execute(_album_runtimes_stmt(limit, after_id)))
+
+
+def stream_all_albums(session: Session | InMemoryCatalog, batch_size: int = 1000) -> Iterator[AlbumRecord]:
+    """
+    Stream all albums with their tracks, ordered by identifier, without loading the whole catalog in memory.
+
+    The rows are read on a dedicated connection of the session engine, so the iterator can outlive the request
+    session, e.g. while a streaming response is being sent.
+
+    :param Session | InMemoryCatalog session: SQLAlchemy session whose engine is used, or in-memory catalog.
+    :param int batch_size: Number of rows fetched at a time.
+    :return: Iterator over album records.
+    :rtype: Iterator[AlbumRecord]
+    """
+    if isinstance(session, InMemoryCatalog):
+        yield from session.albums
+        return
+
+    with session.get_bind().connect() as connection:
+        yield from iter_album_records(connection, batch_size)
+
+
+async def stream_all_albums_async(session: "AsyncSession", batch_size: int = 1000) -> AsyncIterator[AlbumRecord]:
+    """
+    Stream all albums with their tracks, ordered by identifier, asynchronously.
+
+    The rows are read on a dedicated connection of the session engine, like :func:`stream_all_albums`.
+
+    :param AsyncSession session: SQLAlchemy async session whose engine is used.
+    :param int batch_size: Number of rows fetched at a time.
+    :return: Async iterator over album records.
+    :rtype: AsyncIterator[AlbumRecord]
+    """
+    engine: AsyncEngine = session.bind
+    async with engine.connect() as connection:
+        async for album in aiter_album_records(connection, batch_size):
+            yield album
+
+
+async def get_all_albums_async(
+    session: "AsyncSession", limit: int | None = None, after_id: int | None = None
+) -> list[Album]:
+    """
+    Retrieve all albums with their tracks, ordered by identifier, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: List of all albums, with their tracks.
+    :rtype: list[Album]
+    """
+    result = await session.execute(_all_albums_stmt(limit, after_id))
+    return list(result.scalars().all())
+
+
+async def get_albums_by_title_async(
+    session: "AsyncSession",
+    album_title_part: str,
+    limit: int | None = None,
+    after_id: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[Album]:
+    """
+    Retrieve all albums that match a partial album title (case-insensitive), asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param str album_title_part: Partial album title to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: List of albums matching the search criteria, with their tracks.
+    :rtype: list[Album]
+    """
+    result = await session.execute(_albums_by_title_stmt(album_title_part, limit, after_id, match))
+    return list(result.scalars().all())
+
+
+async def get_albums_containing_track_async(
+    session: "AsyncSession",
+    track_title_part: str,
+    limit: int | None = None,
+    after_id: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[Album]:
+    """
+    Retrieve all albums that contain at least one track whose title contains the given substring, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param str track_title_part: Substring to search for in track titles (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: List of albums matching the search criteria, with their tracks.
+    :rtype: list[Album]
+    """
+    result = await session.execute(_albums_containing_track_stmt(track_title_part, limit, after_id, match))
+    return list(result.scalars().all())
+
+
+async def get_albums_with_matching_tracks_async(
+    session: "AsyncSession",
+    track_title_part: str,
+    limit: int | None = None,
+    after_id: int | None = None,
+    match: TitleMatch = "contains",
+) -> list[AlbumRecord]:
+    """
+    Retrieve the albums containing tracks whose title contains the given substring, with only those tracks, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param str track_title_part: Substring to search for in track titles (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+    :return: List of albums ordered by identifier, with their matching tracks only.
+    :rtype: list[AlbumRecord]
+    """
+    rows = await session.execute(_albums_with_matching_tracks_stmt(track_title_part, limit, after_id, match))
+    return list(group_album_rows(rows))
+
+
+async def get_albums_by_ids_async(session: "AsyncSession", album_ids: Collection[int]) -> list[AlbumRecord]:
+    """
+    Retrieve albums with all their tracks from their identifiers, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Collection[int] album_ids: Album identifiers, unknown identifiers are ignored.
+    :return: Albums ordered by identifier.
+    :rtype: list[AlbumRecord]
+    """
+    return list(group_album_rows(await session.execute(_albums_by_ids_stmt(album_ids))))
+
+
+async def get_albums_with_tracks_async(session: "AsyncSession", track_ids: Collection[int]) -> list[AlbumRecord]:
+    """
+    Retrieve the albums of tracks, with only those tracks, from the track identifiers, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Collection[int] track_ids: Track identifiers, unknown identifiers are ignored.
+    :return: Albums ordered by identifier, with their given tracks only.
+    :rtype: list[AlbumRecord]
+    """
+    return list(group_album_rows(await session.execute(_albums_with_tracks_stmt(track_ids))))
+
+
+async def batch_get_albums_by_title_async(
+    session: "AsyncSession", album_title_parts: Sequence[str], limit: int | None = None, match: TitleMatch = "contains"
+) -> list[list[AlbumRecord]]:
+    """
+    Retrieve the albums matching each of several partial album titles, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Sequence[str] album_title_parts: Partial album titles to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums per partial title.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: Albums ordered by identifier, with their tracks, for every partial title in the same order.
+    :rtype: list[list[AlbumRecord]]
+    """
+    if not album_title_parts:
+        return []
+    rows = await session.execute(_batch_albums_by_title_stmt(album_title_parts, limit, match))
+    return _group_batch_rows(rows, len(album_title_parts))
+
+
+async def batch_get_albums_with_matching_tracks_async(
+    session: "AsyncSession", track_title_parts: Sequence[str], limit: int | None = None, match: TitleMatch = "contains"
+) -> list[list[AlbumRecord]]:
+    """
+    Retrieve the albums with the tracks matching each of several partial track titles, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Sequence[str] track_title_parts: Partial track titles to search for (case-insensitive).
+    :param Optional[int] limit: Maximum number of albums per partial title.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :return: Albums ordered by identifier, with their matching tracks only, for every partial title in the same order.
+    :rtype: list[list[AlbumRecord]]
+    """
+    if not track_title_parts:
+        return []
+    rows = await session.execute(_batch_albums_with_matching_tracks_stmt(track_title_parts, limit, match))
+    return _group_batch_rows(rows, len(track_title_parts))
+
+
+async def get_tracks_by_duration_async(
+    session: "AsyncSession",
+    min_seconds: int | None = None,
+    max_seconds: int | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+) -> list[Row]:
+    """
+    Retrieve the tracks whose duration is within a range, sorted by duration, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Optional[int] min_seconds: Minimum duration in seconds, inclusive.
+    :param Optional[int] max_seconds: Maximum duration in seconds, inclusive.
+    :param bool descending: Whether the longest tracks come first.
+    :param Optional[int] limit: Maximum number of tracks to return.
+    :return: Tracks with their numeric duration and album identifier.
+    :rtype: list[Row]
+    """
+    result = await session.execute(_tracks_by_duration_stmt(min_seconds, max_seconds, descending, limit))
+    return list(result)
+
+
+async def get_album_runtimes_async(
+    session: "AsyncSession", limit: int | None = None, after_id: int | None = None
+) -> list[Row]:
+    """
+    Compute the number of tracks and the total runtime of albums, ordered by identifier, asynchronously.
+
+    :param AsyncSession session: SQLAlchemy async session to perform the query.
+    :param Optional[int] limit: Maximum number of albums to return.
+    :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+    :return: Albums with their track count and runtime in seconds.
+    :rtype: list[Row]
+    """
+    result = await session.execute(_album_runtimes_stmt(limit, after_id))
+    return list(result)
@@ -1,13 +1,45 @@
 """Database connection and initialization using SQLAlchemy with dynamic configuration."""
 
-from collections.abc import Callable, Generator
-from typing import Self
+from collections.abc import AsyncGenerator, Callable, Generator
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Self
 
 from pydantic import BaseModel, FilePath
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
+from bowie_api_rest.config import (
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    SQLITE_CACHE_SIZE,
+    SQLITE_IMMUTABLE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_PROFILE,
+    SQLITE_QUERY_ONLY,
+    SQLITE_READ_ONLY,
+    SQLITE_TEMP_STORE,
+    SqliteProfile,
+)
+from bowie_api_rest.migrations import is_schema_current, migrate_db, stamp_schema_version
 from bowie_api_rest.models import Base
+from bowie_api_rest.search_index import ensure_search_index
+
+
+if TYPE_CHECKING:
+    # Only imported by the async serving mode, which requires the `async` optional dependencies
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+logger = logging.getLogger(__name__)
+
+REPORTED_PRAGMAS: tuple[str, ...] = ("journal_mode", "mmap_size", "cache_size", "temp_store", "query_only")
+"""Pragmas whose effective values are reported by :func:`read_sqlite_settings`."""
 
 
 class DatabaseConfig(BaseModel):
@@ -32,28 +64,274 @@ class DatabaseConfig(BaseModel):
         return self.engine
 
 
+class PoolConfig(BaseModel):
+    """
+    Connection pool settings of the SQLAlchemy engine.
+
+    :param int pool_size: Number of connections kept open in the pool.
+    :param int max_overflow: Number of extra connections allowed when all pooled connections are in use.
+    :param bool pool_pre_ping: Whether connections are tested for liveness on checkout.
+    :param int pool_recycle: Number of seconds after which a connection is replaced, `-1` to never recycle.
+    """
+
+    pool_size: int = DB_POOL_SIZE
+    max_overflow: int = DB_POOL_MAX_OVERFLOW
+    pool_pre_ping: bool = DB_POOL_PRE_PING
+    pool_recycle: int = DB_POOL_RECYCLE
+
+
+class SqliteConfig(BaseModel):
+    """
+    SQLite settings applied to every connection of the serving engine.
+
+    Unset pragmas keep the SQLite defaults.
+
+    :param Optional[str] journal_mode: Journal mode, e.g. `wal` so that readers never wait for a writer.
+    :param Optional[int] mmap_size: Number of bytes of the file read through memory-mapped I/O.
+    :param Optional[int] cache_size: Page cache size per connection, in pages, or in KiB when negative.
+    :param Optional[str] temp_store: Storage of temporary tables and indexes, `default`, `file` or `memory`.
+    :param bool query_only: Whether connections refuse any write.
+    :param bool read_only: Whether the file is opened read-only (`mode=ro`).
+    :param bool immutable: Whether the file is opened as immutable (`immutable=1`), without locking nor change detection.
+    """
+
+    journal_mode: str | None = None
+    mmap_size: int | None = None
+    cache_size: int | None = None
+    temp_store: str | None = None
+    query_only: bool = False
+    read_only: bool = False
+    immutable: bool = False
+
+    @classmethod
+    def from_profile(cls, profile: SqliteProfile = "default", **overrides: Any) -> Self:
+        """
+        Create the settings of a profile, replacing the given settings.
+
+        :param SqliteProfile profile: Name of the profile in :data:`SQLITE_PROFILES`.
+        :param Any overrides: Settings replacing those of the profile, ignored when None.
+        :raises ValueError: If the profile is unknown.
+        :return: SqliteConfig instance.
+        :rtype: Self
+        """
+        if profile not in SQLITE_PROFILES:
+            raise ValueError(f"Unknown SQLite profile: {profile!r}")
+        settings = SQLITE_PROFILES[profile].model_dump()
+        settings.update({name: value for name, value in overrides.items() if value is not None})
+        return cls(**settings)
+
+    @classmethod
+    def from_env(cls, profile: SqliteProfile = SQLITE_PROFILE) -> Self:
+        """
+        Create the settings of a profile, overridden by the `SQLITE_*` configuration variables.
+
+        :param SqliteProfile profile: Name of the profile. Defaults to SQLITE_PROFILE.
+        :return: SqliteConfig instance.
+        :rtype: Self
+        """
+        return cls.from_profile(
+            profile,
+            journal_mode=SQLITE_JOURNAL_MODE,
+            mmap_size=SQLITE_MMAP_SIZE,
+            cache_size=SQLITE_CACHE_SIZE,
+            temp_store=SQLITE_TEMP_STORE,
+            query_only=SQLITE_QUERY_ONLY,
+            read_only=SQLITE_READ_ONLY,
+            immutable=SQLITE_IMMUTABLE,
+        )
+
+    @property
+    def writable(self) -> bool:
+        """Whether the serving connections can write to the database."""
+        return not (self.query_only or self.read_only or self.immutable)
+
+    def url(self, db_file: Path, driver: str = "sqlite") -> str:
+        """
+        Build the database URL of a file, as a URI when it must be opened read-only or immutable.
+
+        :param Path db_file: Path to the SQLite database file.
+        :param str driver: SQLAlchemy dialect and driver, e.g. `sqlite+aiosqlite`.
+        :return: SQLAlchemy database URL.
+        :rtype: str
+        """
+        parameters = [
+            name for name, enabled in (("mode=ro", self.read_only), ("immutable=1", self.immutable)) if enabled
+        ]
+        if not parameters:
+            return f"{driver}:///{db_file}"
+        return f"{driver}:///file:{Path(db_file).resolve().as_posix()}?{'&'.join(parameters)}&uri=true"
+
+    def pragmas(self) -> dict[str, str | int]:
+        """
+        Return the pragmas to execute on every new connection.
+
+        :return: Mapping of pragma names to values.
+        :rtype: dict[str, str | int]
+        """
+        pragmas: dict[str, str | int | None] = {
+            # The journal mode is stored in the file, it cannot be changed through a read-only connection
+            "journal_mode": None if self.read_only or self.immutable else self.journal_mode,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "temp_store": self.temp_store,
+            "query_only": int(self.query_only) if self.query_only else None,
+        }
+        return {name: value for name, value in pragmas.items() if value is not None}
+
+    def apply(self, dbapi_connection: Any, connection_record: Any) -> None:
+        """
+        Execute the pragmas on a new DB-API connection, used as a `connect` event listener.
+
+        :param Any dbapi_connection: Raw DB-API connection.
+        :param Any connection_record: Pool connection record, unused.
+        """
+        cursor = dbapi_connection.cursor()
+        for name, value in self.pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+SQLITE_PROFILES: dict[str, SqliteConfig] = {
+    "default": SqliteConfig(),
+    "performance": SqliteConfig(journal_mode="wal", mmap_size=268_435_456, cache_size=-65_536, temp_store="memory"),
+    "read-only": SqliteConfig(
+        mmap_size=268_435_456, cache_size=-65_536, temp_store="memory", query_only=True, read_only=True, immutable=True
+    ),
+}
+"""SQLite settings of every profile: 256 MiB of memory-mapped I/O and a 64 MiB page cache per connection."""
+
+
 class FileDatabaseConfig(DatabaseConfig):
     """
     Database configuration for a file-based SQLite database.
 
     :param FilePath db_file: Path to the SQLite database file.
+    :param SqliteConfig sqlite_config: SQLite settings applied to every connection.
     """
 
     db_file: FilePath
+    sqlite_config: SqliteConfig = SqliteConfig()
 
     @classmethod
-    def from_db_file(cls, db_file: FilePath) -> Self:
+    def from_db_file(
+        cls, db_file: FilePath, pool_config: PoolConfig | None = None, sqlite_config: SqliteConfig | None = None
+    ) -> Self:
         """
         Create a FileDatabaseConfig instance from a SQLite database file path.
 
         :param FilePath db_file: Path to the SQLite database file.
+        :param Optional[PoolConfig] pool_config: Connection pool settings. Defaults to the values from the configuration.
+        :param Optional[SqliteConfig] sqlite_config: SQLite settings. Defaults to SQLite defaults.
         :return: FileDatabaseConfig instance.
         :rtype: Self
         :raises ValueError: If the db_file does not exist.
         """
-        # Create SQLAlchemy engine for SQLite
-        engine: Engine = create_engine(f"sqlite:///{db_file}", future=True)
-        return cls(engine=engine, db_file=db_file)
+        pool_config = pool_config or PoolConfig()
+        sqlite_config = sqlite_config or SqliteConfig()
+
+        # Create SQLAlchemy engine for SQLite with a bounded connection pool
+        engine: Engine = create_engine(
+            sqlite_config.url(db_file), future=True, poolclass=QueuePool, **pool_config.model_dump()
+        )
+        event.listen(engine, "connect", sqlite_config.apply)
+        return cls(engine=engine, db_file=db_file, sqlite_config=sqlite_config)
+
+    def create_async_engine(self, pool_config: PoolConfig | None = None) -> "AsyncEngine":
+        """
+        Create an asynchronous SQLAlchemy engine on the same SQLite database file, with the same SQLite settings.
+
+        Requires the `aiosqlite` driver, installed with the `async` optional dependencies.
+
+        :param Optional[PoolConfig] pool_config: Connection pool settings. Defaults to the values from the configuration.
+        :return: SQLAlchemy AsyncEngine instance.
+        :rtype: AsyncEngine
+        """
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        pool_config = pool_config or PoolConfig()
+        async_engine = create_async_engine(
+            self.sqlite_config.url(self.db_file, driver="sqlite+aiosqlite"),
+            poolclass=AsyncAdaptedQueuePool,
+            **pool_config.model_dump(),
+        )
+        event.listen(async_engine.sync_engine, "connect", self.sqlite_config.apply)
+        return async_engine
+
+    def init_schema(self) -> None:
+        """
+        Initialize the schema of the database file with :func:`init_db`, unless stamped as current.
+
+        Serving connections of read-only profiles cannot write, an outdated schema is then initialized through
+        a short-lived plain connection, while a current one is recognized without it.
+        """
+        if self.sqlite_config.writable:
+            init_db(self.engine)
+        elif not is_schema_current(self.engine):
+            init_engine = create_engine(f"sqlite:///{self.db_file}")
+            init_db(init_engine)
+            init_engine.dispose()
+
+
+def read_sqlite_settings(engine: Engine) -> dict[str, str | int]:
+    """
+    Read the effective values of the reported pragmas on a connection of the engine.
+
+    :param Engine engine: SQLAlchemy Engine instance.
+    :return: Mapping of pragma names to their values.
+    :rtype: dict[str, str | int]
+    """
+    with engine.connect() as connection:
+        return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in REPORTED_PRAGMAS}
+
+
+class PoolStats:
+    """
+    Count connection pool events of an engine, to confirm that connections are released after use.
+
+    :param Engine engine: SQLAlchemy Engine instance whose pool is observed.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        """Register the pool event listeners on the engine."""
+        self.engine = engine
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self._lock = Lock()
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, *_: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *_: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, *_: Any) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """
+        Return the event counters along with the current state of the pool.
+
+        :return: Mapping of counter names to values.
+        :rtype: dict[str, int]
+        """
+        pool = self.engine.pool
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": pool.checkedout(),
+                "pool_size": pool.size(),
+                "overflow": pool.overflow(),
+            }
 
 
 def get_session_factory(engine: Engine) -> sessionmaker:
@@ -67,13 +345,56 @@ def get_session_factory(engine: Engine) -> sessionmaker:
     return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
+def get_async_session_factory(engine: "AsyncEngine") -> "async_sessionmaker[AsyncSession]":
+    """
+    Create and configure a SQLAlchemy async session factory using the provided async engine.
+
+    :param AsyncEngine engine: SQLAlchemy AsyncEngine instance.
+    :return: A configured async_sessionmaker factory.
+    :rtype: async_sessionmaker[AsyncSession]
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    # Loaded objects are only read after the query, never refreshed lazily
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+def get_db_version(db_file: Path) -> int:
+    """
+    Return a version number for the database file that changes whenever the file is modified.
+
+    In WAL mode, commits are appended to the `-wal` file and only reach the database file at checkpoints,
+    so the modification time of the `-wal` file is taken into account as well.
+
+    :param Path db_file: Path to the SQLite database file.
+    :return: Latest modification time of the file and of its write-ahead log, in nanoseconds.
+    :rtype: int
+    """
+    db_file = Path(db_file)
+    version = db_file.stat().st_mtime_ns
+    wal_file = db_file.with_name(f"{db_file.name}-wal")
+    try:
+        return max(version, wal_file.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return version
+
+
 def init_db(engine: Engine) -> None:
     """
-    Create all tables in the database using the given engine.
+    Create all tables, migrate existing ones and create the title search index using the given engine.
+
+    Databases already stamped with the current schema version are left untouched without inspecting their schema,
+    the others are stamped once initialized.
 
     :param Engine engine: SQLAlchemy Engine instance.
     """
+    if is_schema_current(engine):
+        return
     Base.metadata.create_all(bind=engine)
+    migrate_db(engine)
+    ensure_search_index(engine)
+    with engine.begin() as connection:
+        stamp_schema_version(connection)
 
 
 def create_session_dependency(
@@ -83,7 +404,8 @@ def create_session_dependency(
     Create a FastAPI-compatible dependency function that yields a SQLAlchemy session.
 
     This function can be used with FastAPI's `Depends()` system
-    to inject a session into route handlers.
+    to inject a session into route handlers. The session is closed, and its connection
+    returned to the pool, once the request has been handled.
 
     :param sessionmaker session_factory: SQLAlchemy session factory.
     :return: Callable dependency function that yields a session.
@@ -96,3 +418,24 @@ def create_session_dependency(
             yield session
 
     return get_session
+
+
+def create_async_session_dependency(
+    session_factory: "async_sessionmaker[AsyncSession]",
+) -> Callable[[], AsyncGenerator["AsyncSession", None]]:
+    """
+    Create a FastAPI-compatible dependency function that yields a SQLAlchemy async session.
+
+    The session is closed, and its connection returned to the pool, once the request has been handled.
+
+    :param async_sessionmaker[AsyncSession] session_factory: SQLAlchemy async session factory.
+    :return: Callable dependency function that yields an async session.
+    :rtype: Callable[[], AsyncGenerator[AsyncSession, None]]
+    """
+
+    async def get_async_session() -> AsyncGenerator["AsyncSession", None]:
+        # Context-managed session with automatic cleanup
+        async with session_factory() as session:
+            yield session
+
+    return get_async_session
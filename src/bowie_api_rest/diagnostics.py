@@ -0,0 +1,142 @@
+"""
+API routes exposing runtime statistics of the application.
+
+This module defines the routes used to check the health of the serving infrastructure,
+such as the liveness of the API, the state of the database connection pool and of the response cache,
+the SQLite connection settings and the request metrics.
+They do not depend on the serving mode and are shared by the sync and async applications.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from bowie_api_rest.cache import ResponseCache
+from bowie_api_rest.database import PoolStats
+from bowie_api_rest.metrics import PROMETHEUS_MEDIA_TYPE, Metrics
+from bowie_api_rest.schemas import CacheStatsResponse, HealthResponse, PoolStatsResponse, SqliteSettingsResponse
+
+
+# Initialize the API router for handling diagnostics endpoints
+router = APIRouter(tags=["diagnostics"])
+
+# Placeholder for the pool statistics to be set dynamically
+_pool_stats: PoolStats | None = None
+
+# Placeholder for the response cache to be set dynamically
+_response_cache: ResponseCache | None = None
+
+# Placeholder for the SQLite connection settings to be set dynamically
+_sqlite_settings: dict[str, str | int | bool] | None = None
+
+# Placeholder for the request metrics to be set dynamically
+_metrics: Metrics | None = None
+
+
+def set_pool_stats(pool_stats: PoolStats) -> None:
+    """
+    Set the pool statistics exposed by the diagnostics routes.
+
+    :param PoolStats pool_stats: Pool statistics of the application engine.
+    """
+    global _pool_stats
+    _pool_stats = pool_stats
+
+
+def set_response_cache(response_cache: ResponseCache | None) -> None:
+    """
+    Set the response cache exposed by the diagnostics routes.
+
+    :param Optional[ResponseCache] response_cache: Response cache of the application, None when disabled.
+    """
+    global _response_cache
+    _response_cache = response_cache
+
+
+def set_sqlite_settings(sqlite_settings: dict[str, str | int | bool] | None) -> None:
+    """
+    Set the SQLite connection settings exposed by the diagnostics routes.
+
+    :param Optional[dict[str, str | int | bool]] sqlite_settings: Effective settings of the serving connections,
+        None when the application does not query the database.
+    """
+    global _sqlite_settings
+    _sqlite_settings = sqlite_settings
+
+
+def set_metrics(metrics: Metrics | None) -> None:
+    """
+    Set the request metrics exposed by the diagnostics routes.
+
+    :param Optional[Metrics] metrics: Request metrics of the application, None when disabled.
+    """
+    global _metrics
+    _metrics = metrics
+
+
+@router.get("/health", response_model=HealthResponse)
+def health_check() -> HealthResponse:
+    """
+    Health check endpoint to verify that the API is running.
+
+    :return: Health status response model with status 'ok'.
+    :rtype: HealthResponse
+    """
+    return HealthResponse(status="ok")
+
+
+@router.get("/stats/pool", response_model=PoolStatsResponse)
+def get_pool_stats() -> PoolStatsResponse:
+    """
+    Return the connection pool counters of the database engine.
+
+    `checkouts` and `checkins` grow together when connections are released after each request.
+
+    :raises HTTPException: If the pool statistics have not been set.
+    :return: Connection pool statistics.
+    :rtype: PoolStatsResponse
+    """
+    if _pool_stats is None:
+        raise HTTPException(status_code=404, detail="Pool statistics are not available")
+    return PoolStatsResponse(**_pool_stats.as_dict())
+
+
+@router.get("/stats/cache", response_model=CacheStatsResponse)
+def get_cache_stats() -> CacheStatsResponse:
+    """
+    Return the hit, miss and eviction counters of the response cache.
+
+    :raises HTTPException: If the response cache is disabled.
+    :return: Response cache statistics.
+    :rtype: CacheStatsResponse
+    """
+    if _response_cache is None:
+        raise HTTPException(status_code=404, detail="Response cache is disabled")
+    return CacheStatsResponse(**_response_cache.as_dict())
+
+
+@router.get("/stats/sqlite", response_model=SqliteSettingsResponse)
+def get_sqlite_settings() -> SqliteSettingsResponse:
+    """
+    Return the effective SQLite settings of the serving connections, as read at startup.
+
+    :raises HTTPException: If the SQLite settings have not been set.
+    :return: SQLite connection settings.
+    :rtype: SqliteSettingsResponse
+    """
+    if _sqlite_settings is None:
+        raise HTTPException(status_code=404, detail="SQLite settings are not available")
+    return SqliteSettingsResponse(**_sqlite_settings)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """
+    Return the request latency histograms and the SQL and serialization counters, by route.
+
+    :raises HTTPException: If the metrics are disabled.
+    :return: Metrics in the Prometheus text exposition format.
+    :rtype: PlainTextResponse
+    """
+    if _metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(_metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
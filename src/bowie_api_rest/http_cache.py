@@ -0,0 +1,195 @@
+"""
+HTTP caching headers and conditional requests for the read-only catalog endpoints.
+
+Every response of the catalog endpoints is labelled with validators derived from the catalog version
+(the modification time of the database file): an `ETag` and a `Last-Modified` date, with a `Cache-Control`
+header so that browsers and CDNs may keep it. Requests revalidating a response with `If-None-Match`
+or `If-Modified-Since` are answered with `304 Not Modified`, before reaching any route, so without any query,
+once their URL is known to be answered with a `200` for the current catalog version.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from bowie_api_rest.cache import CacheKey, make_cache_key
+
+
+VALIDATED_STATUS_CODES: frozenset[int] = frozenset({200})
+"""Status codes whose responses are labelled with validators and caching headers."""
+
+
+def make_etag(version: int) -> str:
+    """
+    Return the entity tag of the responses built from a catalog version.
+
+    The tag is weak: the same data may be sent with different encodings, which are equivalent but not identical.
+
+    :param int version: Catalog version, see :func:`bowie_api_rest.database.get_db_version`.
+    :return: Weak entity tag.
+    :rtype: str
+    """
+    return f'W/"{version:x}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Tell whether an `If-None-Match` header matches an entity tag, with the weak comparison of RFC 9110.
+
+    :param str if_none_match: Value of the `If-None-Match` request header.
+    :param str etag: Current entity tag.
+    :return: True if the header is `*` or lists the tag, ignoring weakness indicators.
+    :rtype: bool
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def not_modified_since(if_modified_since: str, last_modified: int) -> bool:
+    """
+    Tell whether a resource was not modified since the date of an `If-Modified-Since` header.
+
+    :param str if_modified_since: Value of the `If-Modified-Since` request header.
+    :param int last_modified: Modification time of the resource, in seconds since the epoch.
+    :return: True if the date is valid and not older than the modification time, False otherwise.
+    :rtype: bool
+    """
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and last_modified <= since.timestamp()
+
+
+class ConditionalRequestMiddleware:
+    """
+    ASGI middleware adding validators and caching headers to `GET` responses and answering conditional requests.
+
+    Only `200` responses are validated, so a conditional request is answered with `304 Not Modified` before reaching
+    the routes only if its URL was answered with a `200` since the catalog version changed. The other ones are
+    forwarded, and their response replaced with a `304` if it is a `200`, so that a URL answered with a `404`
+    or a `422` keeps its status. The `Vary` header of the `200` response is copied onto the `304`.
+
+    The version is read before the request is handled, so a response built while the database changes is labelled
+    with the previous version and revalidated again by the next conditional request, never the other way round.
+
+    :param ASGIApp app: Wrapped ASGI application.
+    :param Callable[[], int] version: Callable returning the current catalog version in nanoseconds since the epoch.
+    :param int max_age: Number of seconds clients and shared caches may reuse a response without revalidating it,
+        `0` to revalidate every time.
+    :param tuple[str, ...] path_prefixes: Prefixes of the paths whose responses only depend on the catalog.
+    :param int max_validated: Maximum number of URLs remembered as answered with a `200`, the least recently
+        revalidated one is forgotten beyond.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        version: Callable[[], int],
+        max_age: int = 60,
+        path_prefixes: tuple[str, ...] = ("/albums", "/tracks", "/search", "/autocomplete", "/export"),
+        max_validated: int = 4096,
+    ) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.version = version
+        self.cache_control = f"public, max-age={max_age}" if max_age > 0 else "public, no-cache"
+        self.path_prefixes = path_prefixes
+        self.max_validated = max_validated
+        # `Vary` header of the 200 responses of the URLs, for the catalog version they were answered for
+        self._validated: OrderedDict[CacheKey, bytes | None] = OrderedDict()
+        self._validated_version: int | None = None
+
+    def _validator_headers(self, version: int) -> list[tuple[bytes, bytes]]:
+        """
+        Return the validators and caching headers of the responses built from a catalog version.
+
+        :param int version: Catalog version, in nanoseconds since the epoch.
+        :return: Raw response headers.
+        :rtype: list[tuple[bytes, bytes]]
+        """
+        return [
+            (b"etag", make_etag(version).encode("latin-1")),
+            (b"last-modified", formatdate(version // 1_000_000_000, usegmt=True).encode("latin-1")),
+            (b"cache-control", self.cache_control.encode("latin-1")),
+        ]
+
+    def _remember(self, key: CacheKey, version: int, vary: bytes | None) -> None:
+        """
+        Remember that a URL was answered with a `200` for a catalog version.
+
+        :param CacheKey key: Normalized request key.
+        :param int version: Catalog version the response was built from.
+        :param Optional[bytes] vary: `Vary` header of the response, None if it had none.
+        """
+        if version != self._validated_version:
+            return
+        self._validated[key] = vary
+        self._validated.move_to_end(key)
+        while len(self._validated) > self.max_validated:
+            self._validated.popitem(last=False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer the request with `304 Not Modified` if the client copy is current, or forward it."""
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        version = self.version()
+        if version != self._validated_version:
+            self._validated.clear()
+            self._validated_version = version
+        validator_headers = self._validator_headers(version)
+
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110, section 13.2.2)
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, make_etag(version))
+        else:
+            not_modified = if_modified_since is not None and not_modified_since(
+                if_modified_since, version // 1_000_000_000
+            )
+
+        key = make_cache_key(scope)
+        if not_modified and key in self._validated:
+            self._validated.move_to_end(key)
+            await self._send_not_modified(send, validator_headers, self._validated[key])
+            return
+
+        replaced = False
+
+        async def send_with_validators(message: Message) -> None:
+            nonlocal replaced
+            if message["type"] == "http.response.start" and message["status"] in VALIDATED_STATUS_CODES:
+                vary = next((value for name, value in message.get("headers", ()) if name.lower() == b"vary"), None)
+                self._remember(key, version, vary)
+                if not_modified:
+                    # The body of the response is not sent, the client copy is current
+                    replaced = True
+                    await self._send_not_modified(send, validator_headers, vary)
+                    return
+                message = {**message, "headers": [*message.get("headers", ()), *validator_headers]}
+            if not replaced:
+                await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+    @staticmethod
+    async def _send_not_modified(send: Send, validator_headers: list[tuple[bytes, bytes]], vary: bytes | None) -> None:
+        """
+        Send an empty `304 Not Modified` response.
+
+        :param Send send: ASGI send callable.
+        :param list[tuple[bytes, bytes]] validator_headers: Validators and caching headers of the current version.
+        :param Optional[bytes] vary: `Vary` header of the `200` response, None if it had none.
+        """
+        headers = [*validator_headers, *([(b"vary", vary)] if vary is not None else [])]
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
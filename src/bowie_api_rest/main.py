@@ -3,47 +3,300 @@ Main application entry point for the David Bowie Albums API.
 
 This module creates and configures the FastAPI app, including
 database initialization, session dependency injection, and route registration.
+
+Importing it has no side effect: the default application served as `bowie_api_rest.main:app` is created on first
+access, and the in-memory stores are prepared by the lifespan of the application rather than by `create_app`.
 """
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import partial
+import logging
+from pathlib import Path
+from threading import Thread
+from typing import Any, get_args
+
 from fastapi import FastAPI
 from pydantic import FilePath
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from bowie_api_rest import autocomplete, diagnostics, routes
+from bowie_api_rest.autocomplete import AutocompleteStore
+from bowie_api_rest.cache import ResponseCache, ResponseCacheMiddleware
+from bowie_api_rest.columnar import ColumnarStore, columnar_path, create_columnar_dependency
+from bowie_api_rest.config import (
+    COMPRESSION_CODINGS,
+    COMPRESSION_MINIMUM_SIZE,
+    DEFAULT_DB_PATH,
+    FAST_SERIALIZATION,
+    HTTP_CACHE_MAX_AGE,
+    METRICS_ENABLED,
+    PROFILE_DIR,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_TOKEN,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+    SERVING_MODE,
+    SQLITE_PROFILE,
+    ServingMode,
+    SqliteProfile,
+)
+from bowie_api_rest.content_negotiation import ContentNegotiationMiddleware
+from bowie_api_rest.database import (
+    FileDatabaseConfig,
+    PoolStats,
+    SqliteConfig,
+    create_async_session_dependency,
+    create_session_dependency,
+    get_async_session_factory,
+    get_db_version,
+    get_session_factory,
+    read_sqlite_settings,
+)
+from bowie_api_rest.http_cache import ConditionalRequestMiddleware
+from bowie_api_rest.metrics import Metrics, MetricsMiddleware, instrument_engine
+from bowie_api_rest.snapshot import SnapshotStore, create_snapshot_dependency
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
+    """
+    Prepare the in-memory stores of the application when it starts.
+
+    The catalog snapshot (or columnar catalog), without which the in-memory modes cannot answer, is loaded before
+    the first request.
+    The title completions are built in a background thread so that the other routes are served meanwhile,
+    autocomplete requests received before the end of the build wait for it. In `columnar` mode, startup only maps
+    the file and the completions are built from it by the first request needing them.
+
+    :param FastAPI app_instance: Application being started.
+    """
+    snapshot_store: SnapshotStore | ColumnarStore | None = app_instance.state.snapshot_store
+    if snapshot_store is not None:
+        await run_in_threadpool(snapshot_store.get)
+    if app_instance.state.serving_mode != "columnar":
+        autocomplete_store: AutocompleteStore = app_instance.state.autocomplete_store
+        Thread(target=autocomplete_store.get, name="autocomplete-build", daemon=True).start()
+    yield
 
-from bowie_api_rest import routes
-from bowie_api_rest.config import DEFAULT_DB_PATH
-from bowie_api_rest.database import FileDatabaseConfig, create_session_dependency, get_session_factory, init_db
 
+def _prepare_database(db_config: FileDatabaseConfig, sqlite_profile: SqliteProfile) -> dict[str, str | int | bool]:
+    """
+    Initialize the schema of the database unless stamped as current, and read the effective SQLite settings.
 
-def create_app(db_path: FilePath | None = DEFAULT_DB_PATH) -> FastAPI:
+    :param FileDatabaseConfig db_config: Configuration of the served database file.
+    :param SqliteProfile sqlite_profile: Name of the SQLite settings profile of the serving connections.
+    :return: Effective connection settings, pragmas silently ignored by SQLite show up here.
+    :rtype: dict[str, str | int | bool]
+    """
+    # Create tables if they do not exist and migrate them, unless stamped as current
+    db_config.init_schema()
+
+    sqlite_config = db_config.sqlite_config
+    sqlite_settings = {"profile": sqlite_profile, **read_sqlite_settings(db_config.engine)}
+    sqlite_settings.update(read_only=sqlite_config.read_only, immutable=sqlite_config.immutable)
+    logger.info("SQLite connection settings: %s", sqlite_settings)
+    return sqlite_settings
+
+
+def create_app(
+    db_path: FilePath | None = DEFAULT_DB_PATH,
+    serving_mode: ServingMode = SERVING_MODE,
+    response_cache_size: int = RESPONSE_CACHE_SIZE,
+    response_cache_ttl: float = RESPONSE_CACHE_TTL,
+    fast_serialization: bool = FAST_SERIALIZATION,
+    sqlite_profile: SqliteProfile = SQLITE_PROFILE,
+    http_cache_max_age: int = HTTP_CACHE_MAX_AGE,
+    compression_codings: tuple[str, ...] = COMPRESSION_CODINGS,
+    compression_minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+    metrics_enabled: bool = METRICS_ENABLED,
+    profile_dir: Path | None = PROFILE_DIR,
+    profile_sample_rate: float = PROFILE_SAMPLE_RATE,
+    profile_token: str | None = PROFILE_TOKEN,
+) -> FastAPI:
     """
     Create and configure the FastAPI application instance.
 
     :param Optional[FilePath] db_path: Optional path to the SQLite database file. Defaults to DEFAULT_DB_PATH.
+    :param ServingMode serving_mode: How read requests are answered, `database`, `async`, `snapshot`
+        or `columnar`.
+        Defaults to SERVING_MODE.
+    :param int response_cache_size: Maximum number of cached responses, and of cached encoded variants,
+        `0` to disable the caches.
+        Defaults to RESPONSE_CACHE_SIZE.
+    :param float response_cache_ttl: Number of seconds a cached response stays valid, `0` for no expiry.
+        Defaults to RESPONSE_CACHE_TTL.
+    :param bool fast_serialization: Whether album responses are serialized straight to JSON bytes.
+        Defaults to FAST_SERIALIZATION.
+    :param SqliteProfile sqlite_profile: SQLite settings of the serving connections, `default`, `performance`
+        or `read-only`, overridden by the `SQLITE_*` variables. Defaults to SQLITE_PROFILE.
+    :param int http_cache_max_age: Number of seconds clients may reuse a catalog response without revalidating it.
+        Defaults to HTTP_CACHE_MAX_AGE.
+    :param tuple[str, ...] compression_codings: Content codings offered for the catalog responses, in order
+        of preference, empty to disable compression. Defaults to COMPRESSION_CODINGS.
+    :param int compression_minimum_size: Size in bytes below which responses are not compressed.
+        Defaults to COMPRESSION_MINIMUM_SIZE.
+    :param bool metrics_enabled: Whether requests are timed, in `Server-Timing` headers and at `/metrics`.
+        Defaults to METRICS_ENABLED.
+    :param Optional[Path] profile_dir: Directory receiving the collapsed stacks of the profiled requests,
+        None to disable profiling. Defaults to PROFILE_DIR.
+    :param float profile_sample_rate: Fraction of the requests profiled, besides those sent with the `X-Profile`
+        token. Defaults to PROFILE_SAMPLE_RATE.
+    :param Optional[str] profile_token: Value of the `X-Profile` header of the requests asking to be profiled,
+        None to only profile the sampled requests. Defaults to PROFILE_TOKEN.
+    :raises ValueError: If the serving mode or the SQLite profile is unknown.
     :return: Configured FastAPI application instance.
     :rtype: FastAPI
     """
-    app_instance = FastAPI(title="David Bowie Albums API")
+    if serving_mode not in get_args(ServingMode):
+        raise ValueError(f"Unknown serving mode: {serving_mode!r}")
+
+    app_instance = FastAPI(title="David Bowie Albums API", lifespan=lifespan)
+
+    # Choose how album responses are serialized, the response schemas stay the same
+    routes.set_fast_serialization(fast_serialization)
 
-    # Create the database engine from the given file path
-    engine = FileDatabaseConfig.from_db_file(db_path).engine
+    # Create the database engine from the given file path, with the SQLite settings of the profile
+    sqlite_config = SqliteConfig.from_env(sqlite_profile)
+    db_config = FileDatabaseConfig.from_db_file(db_path, sqlite_config=sqlite_config)
+    engine = db_config.engine
+    # Exposed, like the in-memory stores below, so that servers forking workers can prepare the application first
+    app_instance.state.engine = engine
+    app_instance.state.serving_mode = serving_mode
+    if metrics_enabled:
+        instrument_engine(engine)
 
-    # Initialize the database schema (create tables if they do not exist)
-    init_db(engine)
+    # The columnar catalog is answered from its own file, the database is not even opened
+    diagnostics.set_sqlite_settings(
+        _prepare_database(db_config, sqlite_profile) if serving_mode != "columnar" else None
+    )
 
-    # Create a SQLAlchemy session factory for managing database sessions
-    session_factory: sessionmaker = get_session_factory(engine)
+    # Build the title completions from the database, they are rebuilt whenever the database file changes
+    autocomplete_store = AutocompleteStore(engine, db_config.db_file)
 
-    # Create a FastAPI-compatible dependency for providing DB sessions
-    get_session = create_session_dependency(session_factory)
+    snapshot_store: SnapshotStore | ColumnarStore | None = None
+    # Responses are versioned by the file they are answered from
+    catalog_file = db_config.db_file
+    if serving_mode == "async":
+        # Only imported by the async serving mode, which requires the `async` optional dependencies
+        from bowie_api_rest import async_routes
 
-    # Inject the session dependency into the routes module
-    routes.set_get_session_dependency(get_session)
+        # Serve the catalog routes with async handlers on an async engine bound to the same file
+        async_engine = db_config.create_async_engine()
+        if metrics_enabled:
+            instrument_engine(async_engine.sync_engine)
+        diagnostics.set_pool_stats(PoolStats(async_engine.sync_engine))
 
-    # Include all API routes from the routes module
-    app_instance.include_router(routes.router)
+        # Create a FastAPI-compatible dependency for providing async DB sessions
+        get_async_session = create_async_session_dependency(get_async_session_factory(async_engine))
+        async_routes.set_get_async_session_dependency(get_async_session)
+        catalog_router = async_routes.router
+    else:
+        # Count connection pool events so that connection release can be checked
+        diagnostics.set_pool_stats(PoolStats(engine))
+
+        if serving_mode == "snapshot":
+            # Load the whole catalog at startup, it is reloaded whenever the database file changes
+            snapshot_store = SnapshotStore(engine, db_config.db_file)
+            get_session = create_snapshot_dependency(snapshot_store)
+        elif serving_mode == "columnar":
+            # Map the columnar catalog file at startup, it is mapped again whenever the file is rebuilt
+            catalog_file = columnar_path(db_config.db_file)
+            snapshot_store = ColumnarStore(catalog_file)
+            get_session = create_columnar_dependency(snapshot_store)
+            # Titles are completed from the mapped file too, on first use
+            autocomplete_store = AutocompleteStore(None, catalog_file, columnar_store=snapshot_store)
+        else:
+            # Create a SQLAlchemy session factory for managing database sessions
+            session_factory: sessionmaker = get_session_factory(engine)
+
+            # Create a FastAPI-compatible dependency for providing DB sessions
+            get_session = create_session_dependency(session_factory)
+
+        # Inject the session dependency into the routes module
+        routes.set_get_session_dependency(get_session)
+
+        catalog_router = routes.router
+
+    # Include all API routes of the serving mode
+    app_instance.include_router(catalog_router)
+
+    autocomplete.set_autocomplete_store(autocomplete_store)
+    app_instance.state.snapshot_store = snapshot_store
+    app_instance.state.autocomplete_store = autocomplete_store
+    app_instance.include_router(autocomplete.router)
+
+    # Health and statistics routes do not depend on the serving mode
+    app_instance.include_router(diagnostics.router)
+
+    # Cache serialized search responses until the file they are answered from changes
+    response_cache: ResponseCache | None = None
+    encoded_cache: ResponseCache | None = None
+    if response_cache_size > 0:
+        new_cache = partial(
+            ResponseCache,
+            max_entries=response_cache_size,
+            ttl=response_cache_ttl or None,
+            version=partial(get_db_version, catalog_file),
+        )
+        response_cache, encoded_cache = new_cache(), new_cache()
+        app_instance.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+    diagnostics.set_response_cache(response_cache)
+
+    # Compress and re-encode responses as negotiated, each variant is cached once per database version
+    # in a cache of its own, so that plain responses are not evicted by their encoded variants
+    app_instance.add_middleware(
+        ContentNegotiationMiddleware,
+        codings=compression_codings,
+        minimum_size=compression_minimum_size,
+        cache=encoded_cache,
+    )
+
+    # Label responses with the catalog version and answer revalidations before any cache lookup or query
+    app_instance.add_middleware(
+        ConditionalRequestMiddleware,
+        version=partial(get_db_version, catalog_file),
+        max_age=http_cache_max_age,
+    )
+
+    # Sample the call stacks of the selected requests, nothing is installed unless profiling is enabled
+    if profile_dir is not None:
+        from bowie_api_rest.profiling import ProfilingMiddleware
+
+        app_instance.add_middleware(
+            ProfilingMiddleware, directory=profile_dir, sample_rate=profile_sample_rate, token=profile_token
+        )
+
+    # Time every request, including those answered by the middlewares above, with the phases of the routes
+    metrics = None
+    if metrics_enabled:
+        metrics = Metrics()
+        timed_routes = [*catalog_router.routes, *autocomplete.router.routes, *diagnostics.router.routes]
+        app_instance.add_middleware(MetricsMiddleware, metrics=metrics, routes=timed_routes)
+    diagnostics.set_metrics(metrics)
 
     return app_instance
 
 
-# Instantiate the FastAPI app with the default database path
-app: FastAPI = create_app()
+# Default application, with the default database path, created by `__getattr__` on first access
+app: FastAPI
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Create the default application on first access to `app`, e.g. when uvicorn loads `bowie_api_rest.main:app`.
+
+    :param str name: Name of the missing module attribute.
+    :raises AttributeError: If the attribute is not `app`.
+    :return: Default application, created once.
+    :rtype: Any
+    """
+    global app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    app = create_app()
+    return app
@@ -0,0 +1,357 @@
+"""
+Request timing and SQL statement instrumentation.
+
+Every HTTP request is timed by :class:`MetricsMiddleware`, and split into phases recorded in a
+:class:`RequestTimings` object held by a context variable for the duration of the request:
+
+- `db`: the SQL statements executed through an engine instrumented with :func:`instrument_engine`,
+- `handler`: the rest of the route function, e.g. the ORM hydration and the construction of the response models,
+- `serialize`: the validation and encoding by FastAPI of the value returned by the route function.
+
+The phases are sent back in a `Server-Timing` response header and aggregated by route in :class:`Metrics`,
+exposed in the Prometheus text format. Recording a request costs a few clock reads and dictionary updates.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable, Coroutine, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+import inspect
+import time
+from typing import Any
+
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine, event
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+DURATION_BUCKETS: tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds in seconds of the request duration histogram buckets."""
+
+PROMETHEUS_MEDIA_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+"""Media type of the Prometheus text exposition format."""
+
+UNMATCHED_ROUTE: str = "unmatched"
+"""Route label of the requests matching no route, so that unknown paths do not create new series."""
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    """
+    Phases of the request being handled, filled in by the instrumentation hooks.
+
+    :param float start: Performance counter value when the request was received.
+    :param int statements: Number of SQL statements executed.
+    :param float db_seconds: Time spent executing SQL statements.
+    :param Optional[float] statement_start: Performance counter value when the current statement started.
+    :param Optional[float] endpoint_seconds: Time spent in the route function, SQL statements included.
+    :param Optional[float] endpoint_end: Performance counter value when the route function returned.
+    :param Optional[float] serialize_seconds: Time spent by FastAPI validating and encoding the returned value.
+    """
+
+    start: float
+    statements: int = 0
+    db_seconds: float = 0.0
+    statement_start: float | None = None
+    endpoint_seconds: float | None = None
+    endpoint_end: float | None = None
+    serialize_seconds: float | None = None
+
+    def server_timing(self, now: float) -> str:
+        """
+        Format the phases recorded so far as a `Server-Timing` header value, durations in milliseconds.
+
+        :param float now: Current performance counter value, ending the `total` phase.
+        :return: Header value.
+        :rtype: str
+        """
+        metrics = []
+        if self.statements:
+            metrics.append(f'db;dur={self.db_seconds * 1000:.3f};desc="{self.statements} statements"')
+        if self.endpoint_seconds is not None:
+            metrics.append(f"handler;dur={max(self.endpoint_seconds - self.db_seconds, 0) * 1000:.3f}")
+        if self.serialize_seconds is not None:
+            metrics.append(f"serialize;dur={self.serialize_seconds * 1000:.3f}")
+        metrics.append(f"total;dur={(now - self.start) * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+_request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+"""Timings of the request handled in the current context, None outside of any request."""
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values, in the Prometheus sense.
+
+    :param tuple[float, ...] buckets: Sorted upper bounds of the buckets, `+Inf` is implied.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        :param float value: Observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> list[tuple[str, int]]:
+        """
+        Return the number of values lower than or equal to every bucket bound.
+
+        :return: Formatted bound (`le` label) and cumulative count of every bucket, `+Inf` last.
+        :rtype: list[tuple[str, int]]
+        """
+        bounds = [*map(str, self.buckets), "+Inf"]
+        total = 0
+        cumulative = []
+        for bound, count in zip(bounds, self.counts, strict=True):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+def _labels(**labels: str) -> str:
+    """Format Prometheus labels, escaping their values."""
+    escaped = (value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n") for value in labels.values())
+    return ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped, strict=True))
+
+
+class Metrics:
+    """
+    Aggregate the timings of the handled requests by route, and render them in the Prometheus text format.
+
+    Requests are recorded by :class:`MetricsMiddleware` from the event loop thread, so no lock is needed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.durations: defaultdict[tuple[str, str, str], Histogram] = defaultdict(Histogram)
+        self.statements: defaultdict[str, int] = defaultdict(int)
+        self.db_seconds: defaultdict[str, float] = defaultdict(float)
+        self.serialize_seconds: defaultdict[str, float] = defaultdict(float)
+
+    def observe(self, method: str, route: str, status: int, timings: RequestTimings, duration: float) -> None:
+        """
+        Record a handled request.
+
+        :param str method: HTTP method of the request.
+        :param str route: Path template of the matched route.
+        :param int status: Status code of the response.
+        :param RequestTimings timings: Phases of the request.
+        :param float duration: Number of seconds between the request and the end of the response.
+        """
+        self.durations[method, route, str(status)].observe(duration)
+        if timings.statements:
+            self.statements[route] += timings.statements
+            self.db_seconds[route] += timings.db_seconds
+        if timings.serialize_seconds is not None:
+            self.serialize_seconds[route] += timings.serialize_seconds
+
+    def render(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        :return: Exposition text.
+        :rtype: str
+        """
+        lines = [
+            "# HELP bowie_http_request_duration_seconds Duration of the HTTP requests, until the end of the response.",
+            "# TYPE bowie_http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.durations.items()):
+            labels = _labels(method=method, route=route, status=status)
+            for bound, count in histogram.cumulative_counts():
+                lines.append(f'bowie_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"bowie_http_request_duration_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"bowie_http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        counters = [
+            ("bowie_db_statements_total", "Number of SQL statements executed by the requests.", self.statements),
+            ("bowie_db_duration_seconds_total", "Time spent executing SQL statements.", self.db_seconds),
+            (
+                "bowie_serialization_duration_seconds_total",
+                "Time spent validating and encoding the values returned by the routes.",
+                self.serialize_seconds,
+            ),
+        ]
+        for name, description, values in counters:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            lines += [f"{name}{{{_labels(route=route)}}} {value}" for route, value in sorted(values.items())]
+        return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(*_: Any) -> None:
+    """Start timing a SQL statement, used as a `before_cursor_execute` event listener."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.statement_start = time.perf_counter()
+
+
+def _after_cursor_execute(*_: Any) -> None:
+    """Record the SQL statement that just ran, used as an `after_cursor_execute` event listener."""
+    timings = _request_timings.get()
+    if timings is not None and timings.statement_start is not None:
+        timings.statements += 1
+        timings.db_seconds += time.perf_counter() - timings.statement_start
+        timings.statement_start = None
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count and time the SQL statements executed by an engine on behalf of the request being handled.
+
+    The statements of a request run one after the other, whether in the event loop or in a threadpool worker,
+    which inherits the context variables of the request. Statements run outside of any request are ignored.
+
+    :param Engine engine: Engine to instrument, the `sync_engine` of an async engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a route function so that its duration is recorded in the timings of the request.
+
+    :param Callable[..., Any] endpoint: Route function, synchronous or asynchronous.
+    :return: Wrapper with the same signature, which FastAPI inspects through `__wrapped__`.
+    :rtype: Callable[..., Any]
+    """
+    if inspect.iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def timed_async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _record_endpoint(start)
+
+        return timed_async_endpoint
+
+    @wraps(endpoint)
+    def timed_endpoint(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _record_endpoint(start)
+
+    return timed_endpoint
+
+
+def _record_endpoint(start: float) -> None:
+    """Record the end of the route function started at the given performance counter value."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.endpoint_end = time.perf_counter()
+        timings.endpoint_seconds = timings.endpoint_end - start
+
+
+class TimedRoute(APIRoute):
+    """
+    FastAPI route recording the duration of its function, and of the serialization of the returned value.
+
+    Used as the `route_class` of the routers whose requests are worth splitting into phases.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        """Create the route around the timed route function."""
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """
+        Return the request handler, recording the time between the end of the route function and the response.
+
+        :return: Request handler building the response.
+        :rtype: Callable[[Request], Coroutine[Any, Any, Response]]
+        """
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+            timings = _request_timings.get()
+            if timings is not None and timings.endpoint_end is not None:
+                timings.serialize_seconds = time.perf_counter() - timings.endpoint_end
+            return response
+
+        return timed_handler
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request, adding a `Server-Timing` header and recording it in the metrics.
+
+    Installed outermost, so that requests answered by the other middlewares (cached or not modified responses)
+    are timed too. The header reports the phases completed when the response starts, the metrics the whole
+    request, including streamed bodies.
+
+    :param ASGIApp app: Wrapped ASGI application.
+    :param Metrics metrics: Metrics receiving the timings of the requests.
+    :param Sequence[BaseRoute] routes: Routes of the application, matched by the requests answered before routing.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics, routes: Sequence[BaseRoute] = ()) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Time the request and record it once the response is complete."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(start=time.perf_counter())
+        token = _request_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                server_timing = timings.server_timing(time.perf_counter()).encode("latin-1")
+                message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", server_timing)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            duration = time.perf_counter() - timings.start
+            self.metrics.observe(scope["method"], route_template(scope, self.routes), status, timings, duration)
+
+
+def route_template(scope: Scope, routes: Sequence[BaseRoute]) -> str:
+    """
+    Return the path template of the route of a request, e.g. `/tracks/{track_title}/albums`.
+
+    Requests answered before routing, e.g. from the response cache, are matched against the routes again.
+
+    :param Scope scope: ASGI scope of the handled request.
+    :param Sequence[BaseRoute] routes: Routes to match when the request was not routed.
+    :return: Path template of the matching route, :data:`UNMATCHED_ROUTE` when none matches.
+    :rtype: str
+    """
+    route = scope.get("route")
+    if route is None:
+        route = next((r for r in routes if r.matches(scope)[0] == Match.FULL), None)
+    return getattr(route, "path", UNMATCHED_ROUTE)
@@ -0,0 +1,124 @@
+"""
+In-place migrations of existing discography databases.
+
+`create_all` only creates missing tables, so columns and indexes added to the models after a database file was
+built are added here. Every migration checks the current schema first, so running them again is harmless.
+
+Databases whose schema is complete are stamped with :data:`SCHEMA_VERSION` in `PRAGMA user_version`, so that
+opening them only reads the stamp instead of inspecting the schema.
+"""
+
+from collections.abc import Callable
+
+from sqlalchemy import Connection, Engine
+
+from bowie_api_rest.models import Album, Track, duration_to_seconds
+
+
+def _columns(connection: Connection, table: str) -> set[str]:
+    """
+    Return the column names of a table.
+
+    :param Connection connection: SQLAlchemy connection.
+    :param str table: Table name.
+    :return: Column names.
+    :rtype: set[str]
+    """
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _indexes(connection: Connection) -> set[str]:
+    """
+    Return the index names of the database.
+
+    Expression indexes are not reflected by SQLAlchemy, so they are read from the schema table.
+
+    :param Connection connection: SQLAlchemy connection.
+    :return: Index names.
+    :rtype: set[str]
+    """
+    return {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def add_track_duration_seconds(connection: Connection) -> None:
+    """
+    Add and fill the `track.duration_seconds` column if it is missing, its index is created by :func:`add_indexes`.
+
+    Durations are converted by :func:`~bowie_api_rest.models.duration_to_seconds`, like when the database is built,
+    so that h:mm:ss durations are migrated too.
+
+    :param Connection connection: SQLAlchemy connection, inside a transaction.
+    """
+    if "duration_seconds" not in _columns(connection, "track"):
+        connection.exec_driver_sql("ALTER TABLE track ADD COLUMN duration_seconds INTEGER")
+        tracks = connection.exec_driver_sql("SELECT id, duration FROM track").all()
+        if tracks:
+            connection.exec_driver_sql(
+                "UPDATE track SET duration_seconds = ? WHERE id = ?",
+                [(duration_to_seconds(duration), track_id) for track_id, duration in tracks],
+            )
+
+
+def add_indexes(connection: Connection) -> None:
+    """
+    Create the indexes of the album and track models that are missing, e.g. on `track.album_id` or lowercased titles.
+
+    :param Connection connection: SQLAlchemy connection, inside a transaction.
+    """
+    existing = _indexes(connection)
+    for table in (Album.__table__, Track.__table__):
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+
+
+MIGRATIONS: list[Callable[[Connection], None]] = [add_track_duration_seconds, add_indexes]
+"""Migrations applied by :func:`migrate_db`, in order."""
+
+SCHEMA_VERSION: int = 1
+"""Version of the complete schema (tables, indexes and search index), to increment whenever one of them changes."""
+
+
+def read_schema_version(connection: Connection) -> int:
+    """
+    Return the schema version stamped in a database.
+
+    :param Connection connection: SQLAlchemy connection.
+    :return: Value of `PRAGMA user_version`, `0` for databases never stamped.
+    :rtype: int
+    """
+    return connection.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def stamp_schema_version(connection: Connection) -> None:
+    """
+    Record in a database that its schema is complete, at :data:`SCHEMA_VERSION`.
+
+    :param Connection connection: SQLAlchemy connection, inside a transaction.
+    """
+    connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def is_schema_current(engine: Engine) -> bool:
+    """
+    Tell whether a database is stamped with the current schema version, reading nothing but the stamp.
+
+    Works on read-only connections.
+
+    :param Engine engine: SQLAlchemy Engine instance.
+    :return: True if the schema needs no initialization.
+    :rtype: bool
+    """
+    with engine.connect() as connection:
+        return read_schema_version(connection) >= SCHEMA_VERSION
+
+
+def migrate_db(engine: Engine) -> None:
+    """
+    Bring the schema of an existing database up to date with the models, in a single transaction.
+
+    :param Engine engine: SQLAlchemy Engine instance.
+    """
+    with engine.begin() as connection:
+        for migration in MIGRATIONS:
+            migration(connection)
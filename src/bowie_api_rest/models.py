@@ -7,7 +7,8 @@ It defines the `Album` and `Track` models, which are used for interacting with t
 
 from typing import Optional
 
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, func
+from sqlalchemy.engine.default import DefaultExecutionContext
 from sqlalchemy.orm import Mapped, declarative_base, relationship
 
 
@@ -15,6 +16,37 @@ from sqlalchemy.orm import Mapped, declarative_base, relationship
 Base = declarative_base()
 
 
+def duration_to_seconds(duration: str) -> int:
+    """
+    Convert a duration in mm:ss format (or h:mm:ss) to a number of seconds.
+
+    :param str duration: Duration such as `5:16`.
+    :return: Number of seconds.
+    :rtype: int
+    """
+    seconds = 0
+    for part in duration.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def format_duration(seconds: int) -> str:
+    """
+    Format a number of seconds as a duration in mm:ss format, minutes are not wrapped into hours.
+
+    :param int seconds: Number of seconds.
+    :return: Duration such as `5:16`.
+    :rtype: str
+    """
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def _default_duration_seconds(context: DefaultExecutionContext) -> int:
+    """Compute `Track.duration_seconds` from the `duration` parameter of an INSERT."""
+    return duration_to_seconds(context.get_current_parameters()["duration"])
+
+
 class Track(Base):
     """
     ORM model for a track.
@@ -22,6 +54,7 @@ class Track(Base):
     :param int id: Unique identifier for the track.
     :param str title: Title of the track.
     :param str duration: Duration of the track in mm:ss format.
+    :param Optional[int] duration_seconds: Duration of the track in seconds, computed from `duration` on insert.
     :param Optional[int] album_id: Foreign key to the associated album.
     :param Optional[Album] album: Reference to the associated Album object.
     """
@@ -31,10 +64,15 @@ class Track(Base):
     id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = Column(String, nullable=False)
     duration: Mapped[str] = Column(String, nullable=False)  # Format: mm:ss
+    # Numeric copy of `duration` for filtering, sorting and aggregating in SQL
+    duration_seconds: Mapped[int | None] = Column(Integer, nullable=True, index=True, default=_default_duration_seconds)
 
-    album_id: Mapped[int | None] = Column(Integer, ForeignKey("album.id"), nullable=True)
+    album_id: Mapped[int | None] = Column(Integer, ForeignKey("album.id"), nullable=True, index=True)
     album: Mapped[Optional["Album"]] = relationship("Album", back_populates="tracks")
 
+    # Case-folded titles, for exact and prefix searches
+    __table_args__ = (Index("ix_track_title_lower", func.lower(title)),)
+
 
 class Album(Base):
     """
@@ -53,3 +91,6 @@ class Album(Base):
     year: Mapped[int] = Column(Integer, nullable=False)
 
     tracks: Mapped[list[Track]] = relationship("Track", back_populates="album", cascade="all, delete-orphan")
+
+    # Case-folded titles, for exact and prefix searches
+    __table_args__ = (Index("ix_album_title_lower", func.lower(title)),)
@@ -0,0 +1,187 @@
+"""
+Opt-in sampling profiler of individual requests.
+
+A fraction of the requests, and those sent with the configured token in the :data:`PROFILE_HEADER` header, are
+profiled by sampling the call stacks of every thread of the process while they are handled, e.g. the threadpool worker running a synchronous
+route through `crud` and SQLAlchemy, then the serialization of its result. Threads waiting for work are left out.
+
+The samples of each profiled request are written to a file in the collapsed stack format (one
+`root;caller;callee count` line per distinct stack), read by `flamegraph.pl`, speedscope or inferno.
+Stacks of other requests handled at the same time are sampled too, so profiles are easier to read on a quiet worker.
+At most :data:`MAX_CONCURRENT_PROFILES` requests are profiled at the same time, the others are served unprofiled.
+
+Profiling is disabled unless a profile directory is configured, in which case no middleware is installed at all.
+"""
+
+from collections import Counter
+import hmac
+import os
+from pathlib import Path
+import random
+import re
+import sys
+import threading
+import time
+from types import FrameType
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+PROFILE_HEADER: str = "x-profile"
+"""Request header asking for the request to be profiled, the response header carries the profile file name."""
+
+MAX_CONCURRENT_PROFILES: int = 1
+"""Number of requests profiled at the same time in a process, each one running its own sampling thread."""
+
+SAMPLE_INTERVAL: float = 0.001
+"""Number of seconds between two samples of the thread stacks."""
+
+IDLE_MODULES: frozenset[str] = frozenset({"threading", "queue", "selectors"})
+"""Modules of the innermost frame of threads waiting for work, whose stacks are not recorded."""
+
+
+def collapse_stack(frame: FrameType) -> str:
+    """
+    Format the call stack ending at a frame as a line of the collapsed stack format, without the count.
+
+    :param FrameType frame: Innermost frame of the stack.
+    :return: Functions of the stack, outermost first, as `module.qualified_name` separated by semicolons.
+    :rtype: str
+    """
+    names = []
+    current: FrameType | None = frame
+    while current is not None:
+        module = current.f_globals.get("__name__", "?")
+        names.append(f"{module}.{current.f_code.co_qualname}".replace(";", ":").replace(" ", "_"))
+        current = current.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Sample the call stacks of the other threads of the process from a background thread.
+
+    :param float interval: Number of seconds between two samples.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        """Prepare the sampler, sampling starts with :meth:`start`."""
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        """Record the stacks of the busy threads until stopped."""
+        sampler_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != sampler_id and frame.f_globals.get("__name__") not in IDLE_MODULES:
+                    self.stacks[collapse_stack(frame)] += 1
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        """
+        Stop sampling.
+
+        :return: Number of samples of every collapsed stack.
+        :rtype: Counter[str]
+        """
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+
+def profile_file_name(method: str, path: str) -> str:
+    """
+    Return a unique name for the profile of a request.
+
+    :param str method: HTTP method of the request.
+    :param str path: Path of the request.
+    :return: File name made of the time, the process identifier, the method and the path.
+    :rtype: str
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", path).strip("_")[:80] or "root"
+    return f"{time.time_ns()}-{os.getpid()}-{method}-{slug}.collapsed"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling a fraction of the requests, and those asking for it, into collapsed stack files.
+
+    :param ASGIApp app: Wrapped ASGI application.
+    :param Path directory: Directory receiving one file per profiled request, created if missing.
+    :param float sample_rate: Fraction of the requests to profile, from `0` (only those asking for it) to `1`.
+    :param Optional[str] token: Value of the :data:`PROFILE_HEADER` header of the requests asking to be profiled,
+        None to only profile the sampled requests.
+    :param float interval: Number of seconds between two samples of the thread stacks.
+    :param int max_concurrent: Maximum number of requests profiled at the same time.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: Path,
+        sample_rate: float = 0.0,
+        token: str | None = None,
+        interval: float = SAMPLE_INTERVAL,
+        max_concurrent: int = MAX_CONCURRENT_PROFILES,
+    ) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.running = 0
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def _selected(self, scope: Scope) -> bool:
+        """Tell whether a request is profiled, unless as many requests are already being profiled."""
+        if self.running >= self.max_concurrent:
+            return False
+        if random.random() < self.sample_rate:
+            return True
+        value = Headers(scope=scope).get(PROFILE_HEADER)
+        return self.token is not None and value is not None and hmac.compare_digest(value, self.token)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Profile the request if selected, writing its stacks once the response is complete."""
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        file_name = profile_file_name(scope["method"], scope["path"])
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile_header = (PROFILE_HEADER.encode("latin-1"), file_name.encode("latin-1"))
+                message = {**message, "headers": [*message.get("headers", ()), profile_header]}
+            await send(message)
+
+        self.running += 1
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            # Joining the sampling thread and writing the file would block the event loop
+            await run_in_threadpool(self._write_profile, sampler, file_name)
+            self.running -= 1
+
+    def _write_profile(self, sampler: StackSampler, file_name: str) -> None:
+        """
+        Stop a sampler and write its stacks to a profile file.
+
+        :param StackSampler sampler: Sampler of the profiled request.
+        :param str file_name: Name of the profile file in the profile directory.
+        """
+        stacks = sampler.stop()
+        lines = (f"{stack} {count}\n" for stack, count in stacks.most_common())
+        (self.directory / file_name).write_text("".join(lines))
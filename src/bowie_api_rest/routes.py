@@ -5,22 +5,81 @@ This module defines the API routes for interacting with albums and tracks in the
 It includes routes to retrieve albums by track title, list all albums, and fetch albums by title.
 """
 
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Sequence
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from bowie_api_rest.autocomplete import get_title_completions
+from bowie_api_rest.config import MAX_PAGE_SIZE
+from bowie_api_rest.crud import (
+    InMemoryCatalog,
+    batch_get_albums_by_title,
+    batch_get_albums_with_matching_tracks,
+    get_album_runtimes,
+    get_albums_by_ids,
+    get_albums_by_title,
+    get_albums_with_matching_tracks,
+    get_albums_with_tracks,
+    get_all_albums,
+    get_tracks_by_duration,
+    stream_all_albums,
+)
+from bowie_api_rest.metrics import TimedRoute
+from bowie_api_rest.models import Album, Track
+from bowie_api_rest.schemas import (
+    AlbumRead,
+    AlbumRuntimeRead,
+    BatchLookupRequest,
+    BatchLookupResponse,
+    ScoredAlbumRead,
+    TrackDurationRead,
+    TrackRead,
+)
+from bowie_api_rest.search_index import TitleMatch
+from bowie_api_rest.serialization import NDJSON_MEDIA_TYPE, RawJSONResponse, dump_albums, iter_ndjson
+from bowie_api_rest.snapshot import AlbumRecord, TrackRecord
+
+
+# Initialize the API router for handling album and track endpoints, timing the phases of every request
+router = APIRouter(route_class=TimedRoute)
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+# Placeholder for the session dependency to be set dynamically
+_get_session_dependency: Callable[..., Generator[Session, None, None]] | None = None
 
-from bowie_api_rest.crud import get_albums_by_title, get_albums_containing_track
-from bowie_api_rest.models import Album
-from bowie_api_rest.schemas import AlbumRead, HealthResponse, TrackRead
+NEXT_CURSOR_HEADER: str = "X-Next-Cursor"
+"""Response header holding the cursor of the next page, absent on the last page."""
 
+LIMIT_DESCRIPTION: str = "Maximum number of albums per page, all albums when omitted"
+"""Description of the `limit` pagination query parameter."""
 
-# Initialize the API router for handling album and track endpoints
-router = APIRouter()
+CURSOR_DESCRIPTION: str = f"Cursor of the page to return, from the `{NEXT_CURSOR_HEADER}` header of the previous page"
+"""Description of the `cursor` pagination query parameter."""
 
-# Placeholder for the session dependency to be set dynamically
-_get_session_dependency: Callable[..., Generator[Session, None, None]] | None = None
+MATCH_DESCRIPTION: str = "Whether titles contain (default), start with (`prefix`) or equal (`exact`) the searched text"
+"""Description of the `match` title search query parameter."""
+
+DEFAULT_LONGEST_TRACKS: int = 10
+"""Number of tracks returned by `/tracks/longest/` when no `limit` is given."""
+
+DEFAULT_FUZZY_RESULTS: int = 10
+"""Number of results returned by the typo-tolerant searches when no `limit` is given."""
+
+EXPORT_RESPONSES: dict = {
+    200: {
+        "description": "One album with its tracks per line.",
+        "content": {NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/AlbumRead"}}},
+    }
+}
+"""OpenAPI description of the streaming export response, each line follows the `AlbumRead` schema."""
+
+# Query parameter singleton of the title searches, to avoid calling Query() in function defaults
+match_query = Query("contains", description=MATCH_DESCRIPTION)
+
+# Whether album responses skip the Pydantic validation of `response_model`, set dynamically
+_fast_serialization: bool = False
 
 
 def set_get_session_dependency(dep: Callable[..., Generator[Session, None, None]]) -> None:
@@ -35,7 +94,7 @@ def set_get_session_dependency(dep: Callable[..., Generator[Session, None, None]
 
 def get_session_placeholder() -> Generator[Session, None, None]:
     """
-    Retrieve a SQLAlchemy session from the injected dependency.
+    Retrieve a SQLAlchemy session (or catalog snapshot) from the injected dependency.
 
     :raises RuntimeError: If the session dependency has not been set.
     :return: SQLAlchemy session generator.
@@ -46,24 +105,163 @@ def get_session_placeholder() -> Generator[Session, None, None]:
     yield from _get_session_dependency()
 
 
-def _get_session() -> Session:
+def _get_session() -> Generator[Session, None, None]:
     """
     Dependency function to provide a SQLAlchemy session for FastAPI routes.
 
-    :return: A SQLAlchemy session instance.
-    :rtype: Session
+    The injected generator is resumed by FastAPI after the response, so the session is always closed.
+
+    :return: SQLAlchemy session generator.
+    :rtype: Generator[Session, None, None]
     """
-    return next(get_session_placeholder())
+    yield from get_session_placeholder()
 
 
 # Create a FastAPI dependency singleton to avoid calling Depends() in function defaults
 session_dependency = Depends(_get_session)
 
 
+def set_fast_serialization(enabled: bool) -> None:
+    """
+    Enable or disable the fast serialization of album responses.
+
+    When enabled, routes return the JSON bytes produced by :mod:`bowie_api_rest.serialization`
+    instead of objects validated and serialized by FastAPI through `response_model`.
+
+    :param bool enabled: Whether album responses are serialized straight to JSON bytes.
+    """
+    global _fast_serialization
+    _fast_serialization = enabled
+
+
+def fetch_limit(limit: int | None) -> int | None:
+    """
+    Return the number of albums to query for a page, one more than the page size to detect a next page.
+
+    :param Optional[int] limit: Requested page size, None for all albums.
+    :return: Number of albums to query, None for all albums.
+    :rtype: Optional[int]
+    """
+    return None if limit is None else limit + 1
+
+
+def split_page(
+    albums: Sequence[Album | AlbumRecord], limit: int | None
+) -> tuple[Sequence[Album | AlbumRecord], int | None]:
+    """
+    Split the albums queried with :func:`fetch_limit` into the page and the cursor of the next page.
+
+    :param Sequence[Album | AlbumRecord] albums: Albums ordered by identifier.
+    :param Optional[int] limit: Requested page size, None for all albums.
+    :return: Albums of the page and the cursor of the next page, None on the last page.
+    :rtype: tuple[Sequence[Album | AlbumRecord], Optional[int]]
+    """
+    if limit is None or len(albums) <= limit:
+        return albums, None
+    page = albums[:limit]
+    return page, page[-1].id
+
+
+def render_albums(
+    albums: Sequence[Album | AlbumRecord],
+    tracks: Sequence[Sequence[Track | TrackRecord]] | None = None,
+    response: Response | None = None,
+    next_cursor: int | None = None,
+) -> list[AlbumRead] | Sequence[Album | AlbumRecord] | Response:
+    """
+    Build the response of a route returning albums.
+
+    :param Sequence[Album | AlbumRecord] albums: Albums to return.
+    :param Optional[Sequence[Sequence[Track | TrackRecord]]] tracks: Tracks to return for each album,
+        all the album tracks when omitted.
+    :param Optional[Response] response: Response injected in the route, receiving the pagination header.
+    :param Optional[int] next_cursor: Cursor of the next page, None on the last page.
+    :return: Raw JSON response in fast serialization mode, otherwise objects serialized through `response_model`.
+    :rtype: list[AlbumRead] | Sequence[Album | AlbumRecord] | Response
+    """
+    headers = {NEXT_CURSOR_HEADER: str(next_cursor)} if next_cursor is not None else {}
+    if _fast_serialization:
+        return RawJSONResponse(dump_albums(albums, tracks), headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    if tracks is None:
+        return albums
+
+    return [
+        AlbumRead(
+            id=album.id,
+            title=album.title,
+            year=album.year,
+            tracks=[TrackRead(id=t.id, title=t.title, duration=t.duration) for t in album_tracks],
+        )
+        for album, album_tracks in zip(albums, tracks, strict=True)
+    ]
+
+
+def rank_albums(albums: Sequence[AlbumRecord], scores: dict[int, float]) -> list[ScoredAlbumRead]:
+    """
+    Build the response of a typo-tolerant search, best matches first.
+
+    :param Sequence[AlbumRecord] albums: Albums found by the search.
+    :param dict[int, float] scores: Score of every album, by album identifier.
+    :return: Albums with their score, by decreasing score then increasing identifier.
+    :rtype: list[ScoredAlbumRead]
+    """
+    ranked = sorted(albums, key=lambda album: (-scores[album.id], album.id))
+    return [
+        ScoredAlbumRead(
+            id=album.id,
+            title=album.title,
+            year=album.year,
+            tracks=[TrackRead(id=t.id, title=t.title, duration=t.duration) for t in album.tracks],
+            score=scores[album.id],
+        )
+        for album in ranked
+    ]
+
+
+def track_album_scores(albums: Sequence[AlbumRecord], track_scores: dict[int, float]) -> dict[int, float]:
+    """
+    Score every album with the best score of its matching tracks.
+
+    :param Sequence[AlbumRecord] albums: Albums with their matching tracks.
+    :param dict[int, float] track_scores: Score of every matching track, by track identifier.
+    :return: Score of every album, by album identifier.
+    :rtype: dict[int, float]
+    """
+    return {album.id: max(track_scores[track.id] for track in album.tracks) for album in albums}
+
+
+def batch_lookup_response(
+    track_titles: Sequence[str],
+    track_results: Sequence[Sequence[AlbumRecord]],
+    album_titles: Sequence[str],
+    album_results: Sequence[Sequence[AlbumRecord]],
+) -> dict[str, dict[str, Sequence[AlbumRecord]]]:
+    """
+    Build the response of a batch title lookup, keyed by searched title.
+
+    :param Sequence[str] track_titles: Searched track titles, without duplicates.
+    :param Sequence[Sequence[AlbumRecord]] track_results: Albums found for every track title, in the same order.
+    :param Sequence[str] album_titles: Searched album titles, without duplicates.
+    :param Sequence[Sequence[AlbumRecord]] album_results: Albums found for every album title, in the same order.
+    :return: Albums by searched title, serialized through the `BatchLookupResponse` response model.
+    :rtype: dict[str, dict[str, Sequence[AlbumRecord]]]
+    """
+    return {
+        "tracks": dict(zip(track_titles, track_results, strict=True)),
+        "albums": dict(zip(album_titles, album_results, strict=True)),
+    }
+
+
 @router.get("/tracks/{track_title}/albums", response_model=list[AlbumRead])
 def search_albums_containing_track(
     track_title: str,
-    session: Session = session_dependency,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    match: TitleMatch = match_query,
+    session: Session | InMemoryCatalog = session_dependency,
 ) -> list[AlbumRead]:
     """
     Retrieve all albums containing at least one track whose title partially matches the given string (case-insensitive).
@@ -71,74 +269,217 @@ def search_albums_containing_track(
     Only the matching tracks are included in each album's track list.
 
     :param str track_title: Partial track title to search for (case-insensitive).
-    :param Session session: SQLAlchemy session (injected dependency).
-    :raises HTTPException: When no albums or matching tracks are found.
+    :param Response response: Response receiving the pagination header.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param TitleMatch match: Whether track titles contain, start with or equal `track_title`.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :raises HTTPException: When no albums with matching tracks are found.
     :return: List of albums with filtered matching tracks.
     :rtype: list[AlbumRead]
     """
-    albums: list[Album] = get_albums_containing_track(session, track_title)
+    albums: list[AlbumRecord] = get_albums_with_matching_tracks(session, track_title, fetch_limit(limit), cursor, match)
 
     if not albums:
         raise HTTPException(status_code=404, detail="No albums found for this track")
 
-    lower_search = track_title.lower()
-    result: list[AlbumRead] = []
-
-    for album in albums:
-        filtered_tracks = [t for t in album.tracks if lower_search in t.title.lower()]
-        if filtered_tracks:
-            track_reads = [TrackRead(id=t.id, title=t.title, duration=t.duration) for t in filtered_tracks]
-            album_read = AlbumRead(id=album.id, title=album.title, year=album.year, tracks=track_reads)
-            result.append(album_read)
-
-    if not result:
-        raise HTTPException(status_code=404, detail="No tracks found matching the query")
-
-    return result
+    page, next_cursor = split_page(albums, limit)
+    return render_albums(page, response=response, next_cursor=next_cursor)
 
 
 @router.get("/albums/", response_model=list[AlbumRead])
-def list_albums(session: Session = session_dependency) -> list[AlbumRead]:
+def list_albums(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    session: Session | InMemoryCatalog = session_dependency,
+) -> list[AlbumRead]:
     """
     List all albums with their tracks.
 
-    :param Session session: SQLAlchemy session (injected dependency).
+    :param Response response: Response receiving the pagination header.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
     :return: List of all albums with tracks.
     :rtype: list[AlbumRead]
     """
-    stmt = select(Album).options(selectinload(Album.tracks))
-    albums = session.execute(stmt).scalars().all()
-    return albums
+    page, next_cursor = split_page(get_all_albums(session, fetch_limit(limit), cursor), limit)
+    return render_albums(page, response=response, next_cursor=next_cursor)
 
 
 @router.get("/albums/by-title/", response_model=list[AlbumRead])
 def search_albums_by_title(
+    response: Response,
     album_title: str = Query(..., description="Title of the album to search (case-insensitive)"),
-    session: Session = session_dependency,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    match: TitleMatch = match_query,
+    session: Session | InMemoryCatalog = session_dependency,
 ) -> list[AlbumRead]:
     """
     Get albums by partial album title and return all matching albums with their tracks.
 
+    :param Response response: Response receiving the pagination header.
     :param str album_title: Partial title of the album to search.
-    :param Session session: SQLAlchemy session (injected dependency).
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param TitleMatch match: Whether album titles contain, start with or equal `album_title`.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
     :raises HTTPException: If no album is found with the given title.
     :return: List of albums with tracks that match the partial title.
     :rtype: list[AlbumRead]
     """
-    albums: list[Album] = get_albums_by_title(session, album_title)
+    albums: list[Album] = get_albums_by_title(session, album_title, fetch_limit(limit), cursor, match)
 
     if not albums:
         raise HTTPException(status_code=404, detail="Album not found")
 
-    return albums
+    page, next_cursor = split_page(albums, limit)
+    return render_albums(page, response=response, next_cursor=next_cursor)
+
+
+@router.get("/search/albums", response_model=list[ScoredAlbumRead])
+def fuzzy_search_albums(
+    q: str = Query(..., min_length=1, description="Album title or part of it, typos are tolerated"),
+    limit: int = Query(DEFAULT_FUZZY_RESULTS, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of albums"),
+    session: Session | InMemoryCatalog = session_dependency,
+) -> list[ScoredAlbumRead]:
+    """
+    Search albums whose title contains the searched text with a few typos, best matches first.
+
+    :param str q: Album title or part of it, ignoring case and accents.
+    :param int limit: Maximum number of albums.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :return: Albums with all their tracks and their score, empty when nothing is close enough.
+    :rtype: list[ScoredAlbumRead]
+    """
+    scores = dict(get_title_completions().search_albums(q, limit))
+    return rank_albums(get_albums_by_ids(session, list(scores)), scores)
+
+
+@router.get("/search/tracks", response_model=list[ScoredAlbumRead])
+def fuzzy_search_tracks(
+    q: str = Query(..., min_length=1, description="Track title or part of it, typos are tolerated"),
+    limit: int = Query(DEFAULT_FUZZY_RESULTS, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of tracks"),
+    session: Session | InMemoryCatalog = session_dependency,
+) -> list[ScoredAlbumRead]:
+    """
+    Search tracks whose title contains the searched text with a few typos, grouped by album, best matches first.
+
+    :param str q: Track title or part of it, ignoring case and accents.
+    :param int limit: Maximum number of tracks.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :return: Albums with their matching tracks, scored by their best track, empty when nothing is close enough.
+    :rtype: list[ScoredAlbumRead]
+    """
+    track_scores = dict(get_title_completions().search_tracks(q, limit))
+    albums = get_albums_with_tracks(session, list(track_scores))
+    return rank_albums(albums, track_album_scores(albums, track_scores))
+
+
+@router.get("/tracks/by-duration/", response_model=list[TrackDurationRead])
+def search_tracks_by_duration(
+    min_seconds: int | None = Query(None, ge=0, description="Minimum track duration in seconds, inclusive"),
+    max_seconds: int | None = Query(None, ge=0, description="Maximum track duration in seconds, inclusive"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort by increasing or decreasing duration"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of tracks"),
+    session: Session | InMemoryCatalog = session_dependency,
+) -> list[TrackDurationRead]:
+    """
+    Get the tracks whose duration is within a range, sorted by duration.
+
+    :param Optional[int] min_seconds: Minimum track duration in seconds, inclusive.
+    :param Optional[int] max_seconds: Maximum track duration in seconds, inclusive.
+    :param Literal["asc", "desc"] order: Sort by increasing or decreasing duration.
+    :param Optional[int] limit: Maximum number of tracks, all matching tracks when omitted.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :raises HTTPException: If no track is found in the duration range.
+    :return: List of tracks with their numeric duration.
+    :rtype: list[TrackDurationRead]
+    """
+    tracks = get_tracks_by_duration(session, min_seconds, max_seconds, order == "desc", limit)
+
+    if not tracks:
+        raise HTTPException(status_code=404, detail="No tracks found in this duration range")
+
+    return tracks
+
+
+@router.get("/tracks/longest/", response_model=list[TrackDurationRead])
+def list_longest_tracks(
+    limit: int = Query(DEFAULT_LONGEST_TRACKS, ge=1, le=MAX_PAGE_SIZE, description="Number of tracks"),
+    session: Session | InMemoryCatalog = session_dependency,
+) -> list[TrackDurationRead]:
+    """
+    Get the longest tracks of the catalog.
+
+    :param int limit: Number of tracks to return.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :return: List of tracks sorted by decreasing duration.
+    :rtype: list[TrackDurationRead]
+    """
+    return get_tracks_by_duration(session, descending=True, limit=limit)
+
 
+@router.get("/albums/runtime/", response_model=list[AlbumRuntimeRead])
+def list_album_runtimes(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    cursor: int | None = Query(None, ge=0, description=CURSOR_DESCRIPTION),
+    session: Session | InMemoryCatalog = session_dependency,
+) -> list[AlbumRuntimeRead]:
+    """
+    List the number of tracks and the total runtime of every album.
+
+    :param Response response: Response receiving the pagination header.
+    :param Optional[int] limit: Maximum number of albums per page, all albums when omitted.
+    :param Optional[int] cursor: Cursor of the page to return, from the header of the previous page.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :return: List of album runtimes ordered by album identifier.
+    :rtype: list[AlbumRuntimeRead]
+    """
+    page, next_cursor = split_page(get_album_runtimes(session, fetch_limit(limit), cursor), limit)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return page
 
-@router.get("/health", response_model=HealthResponse)
-def health_check() -> HealthResponse:
+
+@router.post("/batch/lookup", response_model=BatchLookupResponse)
+def batch_lookup(
+    lookup: BatchLookupRequest, session: Session | InMemoryCatalog = session_dependency
+) -> BatchLookupResponse:
     """
-    Health check endpoint to verify that the API is running.
+    Look up several track and album titles at once, each answered like its single title endpoint.
+
+    All the track titles are searched by one statement, and all the album titles by another one, instead of one
+    request per title. Titles matching nothing get an empty list.
+
+    :param BatchLookupRequest lookup: Searched titles and search options.
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :return: Albums with their matching tracks by track title, and albums with all their tracks by album title.
+    :rtype: BatchLookupResponse
+    """
+    track_titles = list(dict.fromkeys(lookup.track_titles))
+    album_titles = list(dict.fromkeys(lookup.album_titles))
+    return batch_lookup_response(
+        track_titles,
+        batch_get_albums_with_matching_tracks(session, track_titles, lookup.limit, lookup.match),
+        album_titles,
+        batch_get_albums_by_title(session, album_titles, lookup.limit, lookup.match),
+    )
+
+
+@router.get("/export/albums", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+def export_albums(session: Session | InMemoryCatalog = session_dependency) -> StreamingResponse:
+    """
+    Stream the full catalog as newline-delimited JSON, one album with all its tracks per line.
+
+    Rows are read with a server-side cursor and sent as soon as they are serialized,
+    so memory use and time to first byte do not depend on the catalog size.
 
-    :return: Health status response model with status 'ok'.
-    :rtype: HealthResponse
+    :param Session | InMemoryCatalog session: SQLAlchemy session or in-memory catalog (injected dependency).
+    :return: Streaming response of albums ordered by identifier.
+    :rtype: StreamingResponse
     """
-    return HealthResponse(status="ok")
+    return StreamingResponse(iter_ndjson(stream_all_albums(session)), media_type=NDJSON_MEDIA_TYPE)
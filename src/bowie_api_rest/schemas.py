@@ -7,9 +7,12 @@ It includes models for reading track and album data, including the list of track
 
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 
+from bowie_api_rest.config import MAX_BATCH_QUERIES, MAX_PAGE_SIZE
+from bowie_api_rest.models import format_duration
 from bowie_api_rest.schemas_base import AlbumBase, TrackBase
+from bowie_api_rest.search_index import TitleMatch
 
 
 class HealthResponse(BaseModel):
@@ -56,3 +59,153 @@ class AlbumRead(AlbumBase):
 
     id: int
     tracks: list[TrackRead] = []
+
+
+class ScoredAlbumRead(AlbumRead):
+    """
+    Pydantic model for reading an album found by a typo-tolerant search.
+
+    :param float score: Similarity between the searched text and the best matching title, from 0 to 1.
+    """
+
+    score: float
+
+
+class TrackDurationRead(TrackRead):
+    """
+    Pydantic model for reading track data with its numeric duration.
+
+    :param int duration_seconds: Track duration in seconds.
+    :param int album_id: Identifier of the album of the track.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    duration_seconds: int
+    album_id: int
+
+
+class AlbumRuntimeRead(AlbumBase):
+    """
+    Pydantic model for reading the total runtime of an album.
+
+    :param int id: Album identifier.
+    :param int track_count: Number of tracks of the album.
+    :param int runtime_seconds: Total duration of the album tracks in seconds.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    track_count: int
+    runtime_seconds: int
+
+    @computed_field
+    @property
+    def runtime(self) -> str:
+        """Total duration of the album tracks in mm:ss format."""
+        return format_duration(self.runtime_seconds)
+
+
+class CompletionRead(BaseModel):
+    """
+    Pydantic model for reading an autocomplete suggestion.
+
+    :param str title: Completed title.
+    :param list[int] ids: Identifiers of the albums or tracks having this title, ignoring case and accents.
+    """
+
+    title: str
+    ids: list[int]
+
+
+class BatchLookupRequest(BaseModel):
+    """
+    Request model for looking up several album and track titles at once.
+
+    :param list[str] track_titles: Partial track titles, each answered like `/tracks/{track_title}/albums`.
+    :param list[str] album_titles: Partial album titles, each answered like `/albums/by-title/`.
+    :param TitleMatch match: Whether titles contain, start with or equal the searched texts.
+    :param Optional[int] limit: Maximum number of albums per searched title, all albums when omitted.
+    """
+
+    track_titles: list[str] = Field(default_factory=list, max_length=MAX_BATCH_QUERIES)
+    album_titles: list[str] = Field(default_factory=list, max_length=MAX_BATCH_QUERIES)
+    match: TitleMatch = "contains"
+    limit: int | None = Field(None, ge=1, le=MAX_PAGE_SIZE)
+
+
+class BatchLookupResponse(BaseModel):
+    """
+    Response model for the batch title lookup, keyed by searched title.
+
+    :param dict[str, list[AlbumRead]] tracks: Albums with their matching tracks, for every searched track title.
+    :param dict[str, list[AlbumRead]] albums: Albums with all their tracks, for every searched album title.
+    """
+
+    tracks: dict[str, list[AlbumRead]]
+    albums: dict[str, list[AlbumRead]]
+
+
+class PoolStatsResponse(BaseModel):
+    """
+    Response model for the connection pool statistics endpoint.
+
+    :param int connects: Number of SQLite connections opened since startup.
+    :param int checkouts: Number of connections taken from the pool since startup.
+    :param int checkins: Number of connections returned to the pool since startup.
+    :param int checked_out: Number of connections currently in use.
+    :param int pool_size: Configured number of pooled connections.
+    :param int overflow: Current overflow of the pool, negative while the pool is not full.
+    """
+
+    connects: int
+    checkouts: int
+    checkins: int
+    checked_out: int
+    pool_size: int
+    overflow: int
+
+
+class CacheStatsResponse(BaseModel):
+    """
+    Response model for the response cache statistics endpoint.
+
+    :param int hits: Number of requests answered from the cache.
+    :param int misses: Number of cacheable requests forwarded to the routes.
+    :param int evictions: Number of responses evicted to respect the size limit.
+    :param int invalidations: Number of times the cache was cleared after a database change.
+    :param int size: Number of responses currently cached.
+    :param int max_entries: Maximum number of cached responses.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+
+
+class SqliteSettingsResponse(BaseModel):
+    """
+    Response model for the SQLite connection settings endpoint.
+
+    :param str profile: Name of the selected settings profile.
+    :param str journal_mode: Journal mode of the database, `wal` or a rollback journal mode.
+    :param int mmap_size: Number of bytes of the file read through memory-mapped I/O.
+    :param int cache_size: Page cache size per connection, in pages, or in KiB when negative.
+    :param int temp_store: Storage of temporary tables, `0` default, `1` file, `2` memory.
+    :param bool query_only: Whether connections refuse any write.
+    :param bool read_only: Whether the file is opened read-only.
+    :param bool immutable: Whether the file is opened as immutable.
+    """
+
+    profile: str
+    journal_mode: str
+    mmap_size: int
+    cache_size: int
+    temp_store: int
+    query_only: bool
+    read_only: bool
+    immutable: bool
@@ -0,0 +1,375 @@
+"""
+Substring search indexes over album and track titles.
+
+This module provides four indexes answering title searches without scanning the whole catalog:
+
+- SQLite FTS5 tables using the `trigram` tokenizer, stored in the database file and kept in sync by triggers,
+  answering case-insensitive `contains` searches when the API queries the database.
+- An in-memory trigram inverted index, answering the same searches from the catalog snapshot.
+- An in-memory sorted array of folded titles, answering the autocomplete prefix searches.
+- An in-memory trigram index of folded titles with bounded edit distance, answering typo-tolerant searches.
+
+Exact and prefix searches are answered by the expression indexes on the lowercased titles declared on the models.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from heapq import merge
+import string
+from typing import Literal
+import unicodedata
+
+from sqlalchemy import Column, Connection, Engine, Integer, MetaData, String, Table
+
+
+TRIGRAM_SIZE: int = 3
+"""Length of the character n-grams used by the trigram indexes."""
+
+TitleMatch = Literal["contains", "prefix", "exact"]
+"""How a searched title is compared with the indexed titles, always case-insensitively."""
+
+MAX_FUZZY_EDITS: int = 3
+"""Maximum number of edits (insertions, deletions, substitutions) tolerated by fuzzy searches."""
+
+_ASCII_LOWERCASE: dict[int, int] = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+"""Translation table lowercasing the ASCII letters only."""
+
+_LEADING_CHARACTERS: str = string.punctuation + string.whitespace
+"""Characters ignored at the start of folded titles, so that `her` completes `"Heroes"`."""
+
+# FTS5 tables are created with raw SQL, these descriptions only allow querying them with SQLAlchemy Core
+fts_metadata = MetaData()
+
+album_title_fts = Table("album_title_fts", fts_metadata, Column("rowid", Integer), Column("title", String))
+"""FTS5 trigram index over `album.title`, its rowid is the album identifier."""
+
+track_title_fts = Table("track_title_fts", fts_metadata, Column("rowid", Integer), Column("title", String))
+"""FTS5 trigram index over `track.title`, its rowid is the track identifier."""
+
+_FTS_SQL: dict[str, list[str]] = {
+    table: [
+        f"CREATE VIRTUAL TABLE {table}_title_fts USING fts5("
+        f"title, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {table}_title_fts_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {table}_title_fts(rowid, title) VALUES (new.id, new.title); END",
+        f"CREATE TRIGGER {table}_title_fts_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {table}_title_fts({table}_title_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+        f"CREATE TRIGGER {table}_title_fts_update AFTER UPDATE OF title ON {table} BEGIN "
+        f"INSERT INTO {table}_title_fts({table}_title_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+        f"INSERT INTO {table}_title_fts(rowid, title) VALUES (new.id, new.title); END",
+        f"INSERT INTO {table}_title_fts({table}_title_fts) VALUES ('rebuild')",
+    ]
+    for table in ("album", "track")
+}
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create the FTS5 trigram tables and their synchronization triggers if they do not exist yet.
+
+    Newly created tables are populated from the current content of the `album` and `track` tables.
+
+    :param Connection connection: SQLAlchemy connection, inside a transaction.
+    """
+    for table, statements in _FTS_SQL.items():
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_title_fts",)
+        ).first()
+        if exists is None:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Create the FTS5 trigram tables of the database if they are missing.
+
+    :param Engine engine: SQLAlchemy Engine instance.
+    """
+    with engine.begin() as connection:
+        create_search_index(connection)
+
+
+def lower_ascii(text: str) -> str:
+    """
+    Lowercase the ASCII letters of a text only, like SQLite `lower()` and `LIKE`.
+
+    The in-memory title indexes compare titles this way, so that every serving mode answers the same searches,
+    e.g. `NEUKÖLN` does not match `Neuköln` in any of them.
+
+    :param str text: Text to lowercase.
+    :return: Text whose ASCII letters are lowercased, other characters being kept as is.
+    :rtype: str
+    """
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWERCASE)
+
+
+def _trigrams(text: str) -> set[str]:
+    """
+    Return the distinct trigrams of an already lowercased text.
+
+    :param str text: Lowercased text.
+    :return: Set of trigrams, empty if the text is shorter than a trigram.
+    :rtype: set[str]
+    """
+    return {text[i : i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """
+    In-memory trigram inverted index answering case-insensitive substring searches, ignoring the case of ASCII letters.
+
+    Each trigram maps to the sorted positions of the texts containing it. A search only verifies the texts
+    listed under the rarest trigram of the query, so its cost follows the number of candidates,
+    not the number of indexed texts. Queries shorter than a trigram fall back to a scan.
+
+    :param Sequence[str] texts: Texts to index, identified by their position.
+    """
+
+    def __init__(self, texts: Sequence[str]) -> None:
+        """Build the posting lists of every trigram."""
+        self.texts: tuple[str, ...] = tuple(lower_ascii(text) for text in texts)
+
+        postings: defaultdict[str, array] = defaultdict(lambda: array("I"))
+        for position, text in enumerate(self.texts):
+            for trigram in _trigrams(text):
+                postings[trigram].append(position)
+        self.postings: dict[str, array] = dict(postings)
+
+    def search(self, part: str, match: TitleMatch = "contains") -> list[int]:
+        """
+        Return the positions of the texts containing, starting with or equal to the given text (case-insensitive).
+
+        :param str part: Text to search for.
+        :param TitleMatch match: How the texts are compared with `part`.
+        :return: Sorted positions of the matching texts.
+        :rtype: list[int]
+        """
+        needle = lower_ascii(part)
+
+        def matches(text: str) -> bool:
+            if match == "exact":
+                return text == needle
+            if match == "prefix":
+                return text.startswith(needle)
+            return needle in text
+
+        trigrams = _trigrams(needle)
+        if not trigrams:
+            return [position for position, text in enumerate(self.texts) if matches(text)]
+
+        candidates = min((self.postings.get(trigram, ()) for trigram in trigrams), key=len)
+        return [position for position in candidates if matches(self.texts[position])]
+
+
+def fold_title(title: str) -> str:
+    """
+    Fold a title for accent and case-insensitive prefix comparisons.
+
+    Accents are removed through the NFKD decomposition, case is folded and leading punctuation is dropped.
+
+    :param str title: Title to fold.
+    :return: Folded title, e.g. `ete` for `Été`.
+    :rtype: str
+    """
+    if not title.isascii():
+        title = "".join(char for char in unicodedata.normalize("NFKD", title) if not unicodedata.combining(char))
+    return title.casefold().lstrip(_LEADING_CHARACTERS)
+
+
+class PrefixIndex:
+    """
+    In-memory sorted array of folded titles answering prefix searches.
+
+    Titles folding to the same key are merged into one entry holding all their identifiers, in increasing order,
+    and shown with the title of the smallest identifier.
+    A search is a binary search for the first key starting with the folded prefix followed by a walk over
+    the next keys, so its cost follows the number of returned completions, not the number of indexed titles.
+    Identifiers are kept in flat arrays to stay compact on large catalogs.
+
+    :param Iterable[tuple[int, str]] entries: Identifiers and titles to index.
+    """
+
+    def __init__(self, entries: Iterable[tuple[int, str]]) -> None:
+        """Sort the entries by folded title and group the identifiers of every folded title."""
+        self.keys: list[str] = []
+        # First title of every key and identifiers of every key, stored at `offsets[i]:offsets[i + 1]`
+        self.titles: list[str] = []
+        self.ids: array = array("I")
+        self.offsets: array = array("I")
+
+        for key, identifier, title in sorted((fold_title(title), identifier, title) for identifier, title in entries):
+            if not self.keys or key != self.keys[-1]:
+                self.keys.append(key)
+                self.titles.append(title)
+                self.offsets.append(len(self.ids))
+            self.ids.append(identifier)
+        self.offsets.append(len(self.ids))
+
+    def __len__(self) -> int:
+        """Return the number of distinct folded titles."""
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int) -> list[tuple[str, list[int]]]:
+        """
+        Return the titles starting with a prefix, ignoring case and accents, in folded alphabetical order.
+
+        :param str prefix: Beginning of the title.
+        :param int limit: Maximum number of completions.
+        :return: Title and identifiers of every completion.
+        :rtype: list[tuple[str, list[int]]]
+        """
+        needle = fold_title(prefix)
+        completions = []
+        position = bisect_left(self.keys, needle)
+        while position < len(self.keys) and len(completions) < limit and self.keys[position].startswith(needle):
+            completions.append((self.titles[position], self.ids_at(position)))
+            position += 1
+        return completions
+
+    def ids_at(self, position: int) -> list[int]:
+        """
+        Return the identifiers of the titles folding to the key at a position.
+
+        :param int position: Position of the key in :attr:`keys`.
+        :return: Identifiers in increasing order.
+        :rtype: list[int]
+        """
+        return self.ids[self.offsets[position] : self.offsets[position + 1]].tolist()
+
+
+def substring_distance(pattern: str, text: str) -> int:
+    """
+    Return the smallest edit distance between a pattern and any substring of a text.
+
+    Myers' bit-parallel algorithm keeps one column of the dynamic programming matrix in the bits of two integers,
+    so the cost is one handful of integer operations per character of the text.
+
+    :param str pattern: Searched text.
+    :param str text: Text searched in.
+    :return: Minimum number of insertions, deletions and substitutions turning `pattern` into a substring of `text`.
+    :rtype: int
+    """
+    if not pattern:
+        return 0
+    masks: dict[str, int] = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << position
+
+    all_bits = (1 << len(pattern)) - 1
+    last_bit = 1 << (len(pattern) - 1)
+    positive, negative = all_bits, 0
+    distance = best = len(pattern)
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last_bit:
+            distance += 1
+        elif horizontal_negative & last_bit:
+            distance -= 1
+        # A match may start anywhere in the text, so nothing is shifted into the first row
+        horizontal_positive <<= 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & all_bits
+        negative = horizontal_positive & vertical & all_bits
+        if distance < best:
+            best = distance
+    return best
+
+
+def max_fuzzy_edits(query: str) -> int:
+    """
+    Return the number of edits tolerated for a folded query, one per five characters.
+
+    The count is bounded so that at least one trigram of the query always survives the edits,
+    which is what allows candidates to be found through the trigram index.
+
+    :param str query: Folded query.
+    :return: Number of tolerated edits, `0` for queries shorter than six characters.
+    :rtype: int
+    """
+    trigram_count = len(_trigrams(query))
+    return max(0, min(MAX_FUZZY_EDITS, max(1, len(query) // 5), (trigram_count - 1) // 3))
+
+
+class FuzzyIndex:
+    """
+    In-memory trigram index of folded titles answering typo-tolerant substring searches.
+
+    A title contains a substring within `k` edits of the query only if it contains at least one of any `3k + 1`
+    distinct trigrams of the query, since one edit changes at most three trigrams, and shares at least
+    `n - 3k` of the `n` distinct trigrams of the query. Candidates are therefore read from the posting lists
+    of the `3k + 1` rarest trigrams of the query and filtered by the number of trigrams they share with it,
+    before being verified with :func:`substring_distance`.
+
+    Titles are ranked once by increasing length when the index is built and the posting lists hold these ranks,
+    so merging them yields the candidates shortest title first without sorting them. Searches try `k = 0, 1, 2...`
+    edits in turn and stop as soon as the best `limit` titles are known, however many titles would match.
+    Queries shorter than a trigram have no candidates, they are answered by prefix searches instead.
+
+    :param Sequence[str] keys: Folded titles to index, identified by their position.
+    """
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        """Rank the titles by length and build the posting lists of every trigram."""
+        self.keys = keys
+        # Position of the title of every rank, shortest titles first
+        self.order: array = array("I", sorted(range(len(keys)), key=lambda position: (len(keys[position]), position)))
+
+        postings: defaultdict[str, array] = defaultdict(lambda: array("I"))
+        for rank, position in enumerate(self.order):
+            for trigram in _trigrams(keys[position]):
+                postings[trigram].append(rank)
+        self.postings: dict[str, array] = dict(postings)
+
+    def _candidates(self, trigrams: set[str], edits: int) -> Iterator[int]:
+        """
+        Return the positions of the titles that may contain the query within a number of edits.
+
+        :param set[str] trigrams: Distinct trigrams of the query, at least one.
+        :param int edits: Number of tolerated edits.
+        :return: Candidate positions, shortest titles first.
+        :rtype: Iterator[int]
+        """
+        rarest = sorted(trigrams, key=lambda trigram: len(self.postings.get(trigram, ())))[: 3 * edits + 1]
+        min_shared = len(trigrams) - 3 * edits
+        previous = None
+        for rank in merge(*(self.postings.get(trigram, ()) for trigram in rarest)):
+            if rank == previous:
+                continue
+            previous = rank
+            position = self.order[rank]
+            if min_shared <= 1 or sum(trigram in self.keys[position] for trigram in trigrams) >= min_shared:
+                yield position
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """
+        Return the titles containing the query within the tolerated number of edits, best matches first.
+
+        The score is `1 - edits / len(query)`. Ties are ranked by increasing title length, then position.
+
+        :param str query: Text to search for, folded like the indexed titles.
+        :param int limit: Maximum number of titles.
+        :return: Position and score of the best matching titles, empty if the query is shorter than a trigram.
+        :rtype: list[tuple[int, float]]
+        """
+        trigrams = _trigrams(query)
+        if not trigrams:
+            return []
+        matches: list[tuple[int, float]] = []
+        found: set[int] = set()
+        for edits in range(max_fuzzy_edits(query) + 1):
+            # Titles closer to the query were all found by the previous steps
+            for position in self._candidates(trigrams, edits):
+                if position in found or substring_distance(query, self.keys[position]) > edits:
+                    continue
+                matches.append((position, 1 - edits / len(query)))
+                found.add(position)
+                if len(matches) == limit:
+                    return matches
+        return matches
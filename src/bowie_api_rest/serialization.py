@@ -0,0 +1,116 @@
+"""
+Fast JSON serialization of albums and tracks.
+
+This module turns query results straight into JSON bytes with the pydantic-core serializer,
+without building `AlbumRead`/`TrackRead` instances nor letting FastAPI validate them again through `response_model`.
+The produced documents have exactly the shape of :class:`bowie_api_rest.schemas.AlbumRead`.
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import Response
+
+from bowie_api_rest.models import Album, Track
+from bowie_api_rest.snapshot import AlbumRecord, TrackRecord
+
+
+NDJSON_MEDIA_TYPE: str = "application/x-ndjson"
+"""Media type of newline-delimited JSON streams, one `AlbumRead` document per line."""
+
+NDJSON_CHUNK_SIZE: int = 64 * 1024
+"""Number of bytes gathered before a chunk of a newline-delimited JSON stream is sent."""
+
+
+class RawJSONResponse(Response):
+    """Response whose content is already serialized JSON bytes."""
+
+    media_type = "application/json"
+
+
+def track_to_dict(track: Track | TrackRecord) -> dict[str, Any]:
+    """
+    Convert a track to a plain dictionary with the fields of `TrackRead`, in the same order.
+
+    :param Track | TrackRecord track: ORM track or snapshot track.
+    :return: Dictionary ready to be serialized.
+    :rtype: dict[str, Any]
+    """
+    return {"title": track.title, "duration": track.duration, "id": track.id}
+
+
+def album_to_dict(album: Album | AlbumRecord, tracks: Iterable[Track | TrackRecord] | None = None) -> dict[str, Any]:
+    """
+    Convert an album to a plain dictionary with the fields of `AlbumRead`, in the same order.
+
+    :param Album | AlbumRecord album: ORM album or snapshot album.
+    :param Optional[Iterable[Track | TrackRecord]] tracks: Tracks to include instead of all the album tracks.
+    :return: Dictionary ready to be serialized.
+    :rtype: dict[str, Any]
+    """
+    return {
+        "title": album.title,
+        "year": album.year,
+        "id": album.id,
+        "tracks": [track_to_dict(track) for track in (album.tracks if tracks is None else tracks)],
+    }
+
+
+def dump_albums(
+    albums: Sequence[Album | AlbumRecord], tracks: Sequence[Iterable[Track | TrackRecord]] | None = None
+) -> bytes:
+    """
+    Serialize albums with their tracks to JSON bytes.
+
+    :param Sequence[Album | AlbumRecord] albums: Albums to serialize.
+    :param Optional[Sequence[Iterable[Track | TrackRecord]]] tracks: Tracks to include for each album,
+        all the album tracks when omitted.
+    :return: JSON array of albums.
+    :rtype: bytes
+    """
+    if tracks is None:
+        return to_json([album_to_dict(album) for album in albums])
+    return to_json([album_to_dict(album, album_tracks) for album, album_tracks in zip(albums, tracks, strict=True)])
+
+
+def iter_ndjson(albums: Iterable[Album | AlbumRecord], chunk_size: int = NDJSON_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serialize albums as newline-delimited JSON, one album per line, in chunks of about `chunk_size` bytes.
+
+    :param Iterable[Album | AlbumRecord] albums: Albums to serialize.
+    :param int chunk_size: Number of bytes gathered before a chunk is yielded.
+    :return: Iterator over chunks of complete lines.
+    :rtype: Iterator[bytes]
+    """
+    chunk = bytearray()
+    for album in albums:
+        chunk += to_json(album_to_dict(album))
+        chunk += b"\n"
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def aiter_ndjson(
+    albums: AsyncIterable[Album | AlbumRecord], chunk_size: int = NDJSON_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Serialize albums from an async iterable as newline-delimited JSON, like :func:`iter_ndjson`.
+
+    :param AsyncIterable[Album | AlbumRecord] albums: Albums to serialize.
+    :param int chunk_size: Number of bytes gathered before a chunk is yielded.
+    :return: Async iterator over chunks of complete lines.
+    :rtype: AsyncIterator[bytes]
+    """
+    chunk = bytearray()
+    async for album in albums:
+        chunk += to_json(album_to_dict(album))
+        chunk += b"\n"
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
@@ -0,0 +1,213 @@
+"""
+Production server running several uvicorn worker processes forked from a preloaded application.
+
+The application is created once in the supervisor process with :func:`bowie_api_rest.main.create_app`, so the
+catalog snapshot, the title indexes and the imported modules are built once and shared copy-on-write by every
+worker instead of being loaded by each of them. Workers accept connections from the same listening socket.
+
+When the database file changes, or on `SIGHUP`, the supervisor builds a new application from the new catalog,
+forks a new generation of workers, then asks the previous workers to finish their in-flight requests and exit,
+so the catalog is swapped without refusing any connection. Workers that die are replaced.
+`SIGTERM` and `SIGINT` stop the workers gracefully, then the supervisor.
+
+Requires `os.fork`, so it runs on Linux and macOS only.
+"""
+
+import argparse
+import gc
+import logging
+import os
+from pathlib import Path
+import signal
+import socket
+import time
+
+from fastapi import FastAPI
+import uvicorn
+
+from bowie_api_rest.columnar import columnar_path
+from bowie_api_rest.config import CATALOG_CHECK_INTERVAL, DEFAULT_DB_PATH, SERVER_WORKERS, SERVING_MODE
+from bowie_api_rest.database import get_db_version
+
+
+logger = logging.getLogger(__name__)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """
+    Open the listening socket shared by the workers.
+
+    :param str host: Interface to listen on.
+    :param int port: TCP port to listen on.
+    :param int backlog: Maximum number of pending connections.
+    :return: Bound and listening socket, inherited by the forked workers.
+    :rtype: socket.socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload_app() -> FastAPI:
+    """
+    Create the application in the supervisor process, ready to be shared by forked workers.
+
+    The in-memory indexes otherwise built at startup are built now, so that workers share them instead of each
+    building its own copy. The pooled database connections opened while loading the catalog are closed, as SQLite
+    connections must not be shared across processes, and the objects created so far are moved out of reach of the
+    garbage collector, whose bookkeeping would otherwise write to, and thus duplicate, the shared memory pages.
+
+    :return: Preloaded application.
+    :rtype: FastAPI
+    """
+    from bowie_api_rest import main
+
+    gc.unfreeze()
+    app = main.create_app()
+    # Served as the default application of the module, the previous generation is released before freezing
+    main.app = app
+    gc.collect()
+
+    stores = [app.state.snapshot_store]
+    # In columnar mode, the supervisor only maps the file, workers build the title completions on first use
+    if app.state.serving_mode != "columnar":
+        stores.append(app.state.autocomplete_store)
+    for store in stores:
+        if store is not None:
+            store.get().warm_up()
+    app.state.engine.dispose()
+    gc.freeze()
+    return app
+
+
+class Supervisor:
+    """
+    Fork, watch and replace the worker processes serving a preloaded application.
+
+    :param socket.socket sock: Listening socket shared by the workers.
+    :param int workers: Number of worker processes.
+    :param Path db_file: Database file, or columnar catalog file, watched for catalog changes.
+    :param float check_interval: Number of seconds between two checks of the database file, `0` to disable them.
+    :param str log_level: Log level of the uvicorn workers.
+    """
+
+    def __init__(
+        self, sock: socket.socket, workers: int, db_file: Path, check_interval: float, log_level: str = "info"
+    ) -> None:
+        """Prepare the supervisor, workers are started by :meth:`run`."""
+        self.sock = sock
+        self.workers = workers
+        self.db_file = db_file
+        self.check_interval = check_interval
+        self.log_level = log_level
+        self.pids: set[int] = set()
+        self.app: FastAPI | None = None
+        self._reload = False
+        self._stop = False
+
+    def spawn(self) -> int:
+        """
+        Fork one worker serving the current application.
+
+        :return: Process identifier of the worker.
+        :rtype: int
+        """
+        pid = os.fork()
+        if pid:
+            return pid
+
+        # Worker process: uvicorn installs its own handlers for a graceful shutdown on SIGTERM and SIGINT
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        config = uvicorn.Config(self.app, log_level=self.log_level)
+        try:
+            uvicorn.Server(config).run(sockets=[self.sock])
+        finally:
+            os._exit(0)
+
+    def reload(self) -> None:
+        """Start a generation of workers serving a newly built application, then stop the previous one."""
+        previous = self.pids
+        try:
+            self.app = preload_app()
+        except Exception:
+            if not previous:
+                raise
+            logger.exception("Could not load the new catalog, the current workers keep serving")
+            return
+        self.pids = {self.spawn() for _ in range(self.workers)}
+        for pid in previous:
+            os.kill(pid, signal.SIGTERM)
+        logger.info("Serving with workers %s", sorted(self.pids))
+
+    def reap(self) -> None:
+        """Collect the exited workers and replace those of the current generation."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.pids:
+                self.pids.discard(pid)
+                if not self._stop:
+                    logger.warning("Worker %s exited with status %s, starting a new one", pid, status)
+                    self.pids.add(self.spawn())
+
+    def run(self) -> None:
+        """Serve until `SIGTERM` or `SIGINT`, reloading the application when the catalog changes."""
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        version = get_db_version(self.db_file)
+        self.reload()
+        next_check = time.monotonic() + self.check_interval
+        while not self._stop:
+            time.sleep(0.2)
+            self.reap()
+            if self.check_interval and time.monotonic() >= next_check:
+                next_check = time.monotonic() + self.check_interval
+                current = get_db_version(self.db_file)
+                self._reload |= current != version
+                version = current
+            if self._reload:
+                self._reload = False
+                logger.info("Catalog changed, reloading the workers")
+                self.reload()
+
+        for pid in self.pids:
+            os.kill(pid, signal.SIGTERM)
+        while self.pids:
+            pid, _ = os.wait()
+            self.pids.discard(pid)
+
+
+def main() -> None:
+    """Parse the command line arguments and serve the API."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="TCP port to listen on")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Number of worker processes")
+    parser.add_argument(
+        "--check-interval", type=float, default=CATALOG_CHECK_INTERVAL, help="Seconds between catalog checks"
+    )
+    parser.add_argument("--log-level", default="info", help="Log level of the supervisor and workers")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    # The columnar mode serves the catalog file built next to the database, the other modes the database itself
+    catalog_file = columnar_path(DEFAULT_DB_PATH) if SERVING_MODE == "columnar" else DEFAULT_DB_PATH
+    supervisor = Supervisor(
+        bind_socket(args.host, args.port), args.workers, catalog_file, args.check_interval, args.log_level
+    )
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
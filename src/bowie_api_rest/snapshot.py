@@ -0,0 +1,530 @@
+"""
+In-memory snapshot of the discography for read-only serving.
+
+This module loads the whole album/track graph from the database once into compact immutable structures,
+so that read requests can be answered without opening a SQLAlchemy session or a SQLite connection.
+The snapshot is transparently reloaded when the database file is modified.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import AsyncIterator, Callable, Generator, Iterable, Iterator
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Self
+
+from sqlalchemy import Connection, Engine, Row, Select, select
+
+from bowie_api_rest.database import get_db_version
+from bowie_api_rest.models import Album, Track, duration_to_seconds
+from bowie_api_rest.search_index import TitleMatch, TrigramIndex
+
+
+if TYPE_CHECKING:
+    # Only imported by the async serving mode, which requires the `async` optional dependencies
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@dataclass(frozen=True, slots=True)
+class TrackRecord:
+    """
+    Immutable, read-only representation of a track.
+
+    :param int id: Unique identifier for the track.
+    :param str title: Title of the track.
+    :param str duration: Duration of the track in mm:ss format.
+    """
+
+    id: int
+    title: str
+    duration: str
+
+
+@dataclass(frozen=True, slots=True)
+class AlbumRecord:
+    """
+    Immutable, read-only representation of an album with its tracks.
+
+    :param int id: Unique identifier for the album.
+    :param str title: Title of the album.
+    :param int year: Release year of the album.
+    :param tuple[TrackRecord, ...] tracks: Tracks of the album, ordered by identifier.
+    """
+
+    id: int
+    title: str
+    year: int
+    tracks: tuple[TrackRecord, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class TrackDurationRecord:
+    """
+    Immutable, read-only representation of a track with its numeric duration.
+
+    :param int id: Unique identifier for the track.
+    :param str title: Title of the track.
+    :param str duration: Duration of the track in mm:ss format.
+    :param int duration_seconds: Duration of the track in seconds.
+    :param int album_id: Identifier of the album of the track.
+    """
+
+    id: int
+    title: str
+    duration: str
+    duration_seconds: int
+    album_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class AlbumRuntimeRecord:
+    """
+    Immutable, read-only representation of the total runtime of an album.
+
+    :param int id: Unique identifier for the album.
+    :param str title: Title of the album.
+    :param int year: Release year of the album.
+    :param int track_count: Number of tracks of the album.
+    :param int runtime_seconds: Total duration of the album tracks in seconds.
+    """
+
+    id: int
+    title: str
+    year: int
+    track_count: int
+    runtime_seconds: int
+
+
+def album_track_rows_stmt() -> Select:
+    """
+    Build the SELECT statement returning one row per track (or per album without tracks), sorted by album.
+
+    :return: SELECT statement on albums joined with their tracks.
+    :rtype: Select
+    """
+    return (
+        select(Album.id, Album.title, Album.year, Track.id, Track.title, Track.duration)
+        .outerjoin(Track, Track.album_id == Album.id)
+        .order_by(Album.id, Track.id)
+    )
+
+
+class _AlbumRowGrouper:
+    """Accumulate rows of :func:`album_track_rows_stmt` into album records."""
+
+    def __init__(self) -> None:
+        """Start without any pending album."""
+        self.current: tuple[int, str, int] | None = None
+        self.tracks: list[TrackRecord] = []
+
+    def push(self, row: Row) -> AlbumRecord | None:
+        """
+        Add a row, returning the previous album once all its rows have been seen.
+
+        :param Row row: Album and track columns.
+        :return: Completed album, or None while the current album continues.
+        :rtype: Optional[AlbumRecord]
+        """
+        album_id, album_title, album_year, track_id, track_title, track_duration = row
+        completed = None
+        # Rows are sorted by album, so an album is complete as soon as the identifier changes
+        if self.current is not None and self.current[0] != album_id:
+            completed = self.flush()
+        self.current = (album_id, album_title, album_year)
+        if track_id is not None:
+            self.tracks.append(TrackRecord(id=track_id, title=track_title, duration=track_duration))
+        return completed
+
+    def flush(self) -> AlbumRecord | None:
+        """
+        Return the pending album, if any.
+
+        :return: Pending album, or None if no row was pushed since the last flush.
+        :rtype: Optional[AlbumRecord]
+        """
+        if self.current is None:
+            return None
+        album = AlbumRecord(*self.current, tracks=tuple(self.tracks))
+        self.current, self.tracks = None, []
+        return album
+
+
+def group_album_rows(rows: Iterable[Row]) -> Iterator[AlbumRecord]:
+    """
+    Group rows of album and track columns sorted by album into album records.
+
+    :param Iterable[Row] rows: Rows shaped like those of :func:`album_track_rows_stmt`, sorted by album.
+    :return: Iterator over album records.
+    :rtype: Iterator[AlbumRecord]
+    """
+    grouper = _AlbumRowGrouper()
+    for row in rows:
+        if (album := grouper.push(row)) is not None:
+            yield album
+    if (album := grouper.flush()) is not None:
+        yield album
+
+
+def iter_album_records(connection: Connection, batch_size: int = 1000) -> Iterator[AlbumRecord]:
+    """
+    Stream all albums with their tracks, ordered by identifier, with a server-side cursor.
+
+    Rows are fetched `batch_size` at a time, so memory use does not depend on the catalog size.
+
+    :param Connection connection: SQLAlchemy connection to the discography database.
+    :param int batch_size: Number of rows fetched at a time.
+    :return: Iterator over album records.
+    :rtype: Iterator[AlbumRecord]
+    """
+    yield from group_album_rows(connection.execute(album_track_rows_stmt().execution_options(yield_per=batch_size)))
+
+
+async def aiter_album_records(connection: "AsyncConnection", batch_size: int = 1000) -> AsyncIterator[AlbumRecord]:
+    """
+    Stream all albums with their tracks, ordered by identifier, from an async connection.
+
+    :param AsyncConnection connection: SQLAlchemy async connection to the discography database.
+    :param int batch_size: Number of rows fetched at a time.
+    :return: Async iterator over album records.
+    :rtype: AsyncIterator[AlbumRecord]
+    """
+    grouper = _AlbumRowGrouper()
+    result = await connection.stream(album_track_rows_stmt().execution_options(yield_per=batch_size))
+    async for row in result:
+        if (album := grouper.push(row)) is not None:
+            yield album
+    if (album := grouper.flush()) is not None:
+        yield album
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable snapshot of every album and track of the catalog.
+
+    The query methods mirror the functions of :mod:`bowie_api_rest.crud` and return albums in the same order.
+    Title searches go through trigram indexes built on first use.
+
+    :param tuple[AlbumRecord, ...] albums: All albums of the catalog, ordered by identifier.
+    :param int version: Version of the database file the snapshot was loaded from.
+    """
+
+    albums: tuple[AlbumRecord, ...]
+    version: int
+
+    @classmethod
+    def load(cls, engine: Engine, version: int = 0) -> Self:
+        """
+        Load the whole catalog from the database in a single streamed query.
+
+        :param Engine engine: SQLAlchemy engine bound to the discography database.
+        :param int version: Version of the database file being loaded.
+        :return: Snapshot of the catalog.
+        :rtype: Self
+        """
+        with engine.connect() as connection:
+            albums = tuple(iter_album_records(connection))
+        return cls(albums=albums, version=version)
+
+    def warm_up(self) -> None:
+        """Build the indexes and lookup arrays built on first use now, e.g. before forking processes that share them."""
+        for name, attribute in vars(type(self)).items():
+            if isinstance(attribute, cached_property):
+                getattr(self, name)
+
+    @cached_property
+    def album_title_index(self) -> TrigramIndex:
+        """Trigram index over album titles, positions are album positions in :attr:`albums`."""
+        return TrigramIndex([album.title for album in self.albums])
+
+    @cached_property
+    def track_title_index(self) -> TrigramIndex:
+        """Trigram index over track titles, positions are track positions in :attr:`track_album_positions`."""
+        return TrigramIndex([track.title for album in self.albums for track in album.tracks])
+
+    @cached_property
+    def track_album_positions(self) -> array:
+        """Position in :attr:`albums` of the album of every track, in the order of :attr:`track_title_index`."""
+        return array("I", (position for position, album in enumerate(self.albums) for _ in album.tracks))
+
+    @cached_property
+    def track_records(self) -> tuple[TrackRecord, ...]:
+        """Every track of the catalog, in the order of :attr:`track_title_index`."""
+        return tuple(track for album in self.albums for track in album.tracks)
+
+    @cached_property
+    def track_durations(self) -> array:
+        """Duration in seconds of every track, in the order of :attr:`track_records`."""
+        return array("I", (duration_to_seconds(track.duration) for track in self.track_records))
+
+    @cached_property
+    def track_duration_order(self) -> array:
+        """Positions in :attr:`track_records` sorted by duration, then identifier."""
+        records, durations = self.track_records, self.track_durations
+        return array("I", sorted(range(len(records)), key=lambda position: (durations[position], records[position].id)))
+
+    @cached_property
+    def sorted_track_durations(self) -> array:
+        """Durations in seconds of the tracks, in the order of :attr:`track_duration_order`."""
+        return array("I", (self.track_durations[position] for position in self.track_duration_order))
+
+    @cached_property
+    def track_positions(self) -> dict[int, int]:
+        """Position in :attr:`track_records` of every track identifier."""
+        return {track.id: position for position, track in enumerate(self.track_records)}
+
+    @cached_property
+    def album_ids(self) -> array:
+        """Sorted identifiers of the albums, in the order of :attr:`albums`."""
+        return array("I", (album.id for album in self.albums))
+
+    def _page(self, positions: list[int], limit: int | None, after_id: int | None) -> list[AlbumRecord]:
+        """
+        Return the albums at the given sorted positions, restricted to one keyset page.
+
+        :param list[int] positions: Sorted album positions in :attr:`albums`.
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :return: Albums of the page.
+        :rtype: list[AlbumRecord]
+        """
+        if after_id is not None:
+            start = bisect_right(self.album_ids, after_id)
+            positions = positions[bisect_left(positions, start) :]
+        return [self.albums[position] for position in positions[:limit]]
+
+    def list_albums(self, limit: int | None = None, after_id: int | None = None) -> list[AlbumRecord]:
+        """
+        List all albums with their tracks.
+
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :return: List of all albums.
+        :rtype: list[AlbumRecord]
+        """
+        start = 0 if after_id is None else bisect_right(self.album_ids, after_id)
+        stop = None if limit is None else start + limit
+        return list(self.albums[start:stop])
+
+    def get_albums_by_title(
+        self,
+        album_title_part: str,
+        limit: int | None = None,
+        after_id: int | None = None,
+        match: TitleMatch = "contains",
+    ) -> list[AlbumRecord]:
+        """
+        Retrieve all albums that match a partial album title (case-insensitive).
+
+        :param str album_title_part: Partial album title to search for (case-insensitive).
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+        :return: List of albums matching the search criteria, with their tracks.
+        :rtype: list[AlbumRecord]
+        """
+        return self._page(self.album_title_index.search(album_title_part, match), limit, after_id)
+
+    def get_albums_containing_track(
+        self,
+        track_title_part: str,
+        limit: int | None = None,
+        after_id: int | None = None,
+        match: TitleMatch = "contains",
+    ) -> list[AlbumRecord]:
+        """
+        Retrieve all albums that contain at least one track whose title contains the given substring.
+
+        :param str track_title_part: Substring to search for in track titles (case-insensitive).
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+        :return: List of albums matching the search criteria, with all their tracks.
+        :rtype: list[AlbumRecord]
+        """
+        track_positions = self.track_title_index.search(track_title_part, match)
+        album_positions = sorted({self.track_album_positions[position] for position in track_positions})
+        return self._page(album_positions, limit, after_id)
+
+    def get_albums_with_matching_tracks(
+        self,
+        track_title_part: str,
+        limit: int | None = None,
+        after_id: int | None = None,
+        match: TitleMatch = "contains",
+    ) -> list[AlbumRecord]:
+        """
+        Retrieve the albums containing tracks whose title contains the given substring, with only those tracks.
+
+        :param str track_title_part: Substring to search for in track titles (case-insensitive).
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :param TitleMatch match: Whether titles contain, start with or equal the searched text.
+        :return: List of albums matching the search criteria, with their matching tracks only.
+        :rtype: list[AlbumRecord]
+        """
+        start = 0 if after_id is None else bisect_right(self.album_ids, after_id)
+        matching: dict[int, list[TrackRecord]] = {}
+        # Track positions are sorted, so are the positions of their albums
+        for track_position in self.track_title_index.search(track_title_part, match):
+            album_position = self.track_album_positions[track_position]
+            if album_position < start:
+                continue
+            if album_position not in matching and limit is not None and len(matching) == limit:
+                break
+            matching.setdefault(album_position, []).append(self.track_records[track_position])
+
+        return [
+            AlbumRecord(album.id, album.title, album.year, tracks=tuple(tracks))
+            for album, tracks in ((self.albums[position], tracks) for position, tracks in matching.items())
+        ]
+
+    def get_albums_by_ids(self, album_ids: Iterable[int]) -> list[AlbumRecord]:
+        """
+        Retrieve albums with all their tracks from their identifiers.
+
+        :param Iterable[int] album_ids: Album identifiers, unknown identifiers are ignored.
+        :return: Albums ordered by identifier.
+        :rtype: list[AlbumRecord]
+        """
+        positions = ((bisect_left(self.album_ids, album_id), album_id) for album_id in set(album_ids))
+        return [
+            self.albums[position]
+            for position, album_id in sorted(positions)
+            if position < len(self.albums) and self.album_ids[position] == album_id
+        ]
+
+    def get_albums_with_tracks(self, track_ids: Iterable[int]) -> list[AlbumRecord]:
+        """
+        Retrieve the albums of tracks, with only those tracks, from the track identifiers.
+
+        :param Iterable[int] track_ids: Track identifiers, unknown identifiers are ignored.
+        :return: Albums ordered by identifier, with their given tracks ordered by identifier.
+        :rtype: list[AlbumRecord]
+        """
+        track_positions = sorted(
+            self.track_positions[track_id] for track_id in set(track_ids) if track_id in self.track_positions
+        )
+        # Track positions are sorted, so are the positions of their albums
+        matching: dict[int, list[TrackRecord]] = {}
+        for track_position in track_positions:
+            matching.setdefault(self.track_album_positions[track_position], []).append(
+                self.track_records[track_position]
+            )
+
+        return [
+            AlbumRecord(album.id, album.title, album.year, tracks=tuple(tracks))
+            for album, tracks in ((self.albums[position], tracks) for position, tracks in matching.items())
+        ]
+
+    def get_tracks_by_duration(
+        self,
+        min_seconds: int | None = None,
+        max_seconds: int | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> list[TrackDurationRecord]:
+        """
+        Retrieve the tracks whose duration is within a range, sorted by duration.
+
+        :param Optional[int] min_seconds: Minimum duration in seconds, inclusive.
+        :param Optional[int] max_seconds: Maximum duration in seconds, inclusive.
+        :param bool descending: Whether the longest tracks come first.
+        :param Optional[int] limit: Maximum number of tracks to return.
+        :return: Tracks sorted by duration, then identifier (both reversed when descending).
+        :rtype: list[TrackDurationRecord]
+        """
+        order, durations, sorted_durations = (
+            self.track_duration_order,
+            self.track_durations,
+            self.sorted_track_durations,
+        )
+        start = 0 if min_seconds is None else bisect_left(sorted_durations, min_seconds)
+        stop = len(order) if max_seconds is None else bisect_right(sorted_durations, max_seconds)
+        positions = order[start:stop]
+        if descending:
+            positions = positions[::-1]
+
+        return [
+            TrackDurationRecord(
+                id=(track := self.track_records[position]).id,
+                title=track.title,
+                duration=track.duration,
+                duration_seconds=durations[position],
+                album_id=self.albums[self.track_album_positions[position]].id,
+            )
+            for position in positions[:limit]
+        ]
+
+    def get_album_runtimes(self, limit: int | None = None, after_id: int | None = None) -> list[AlbumRuntimeRecord]:
+        """
+        Compute the number of tracks and the total runtime of albums, ordered by identifier.
+
+        :param Optional[int] limit: Maximum number of albums to return.
+        :param Optional[int] after_id: Only return albums whose identifier is greater than this one.
+        :return: Runtime of every album of the page.
+        :rtype: list[AlbumRuntimeRecord]
+        """
+        return [
+            AlbumRuntimeRecord(
+                id=album.id,
+                title=album.title,
+                year=album.year,
+                track_count=len(album.tracks),
+                runtime_seconds=sum(duration_to_seconds(track.duration) for track in album.tracks),
+            )
+            for album in self.list_albums(limit, after_id)
+        ]
+
+
+class SnapshotStore:
+    """
+    Hold the current catalog snapshot and reload it when the database file changes.
+
+    :param Engine engine: SQLAlchemy engine bound to the discography database.
+    :param Path db_file: Path to the SQLite database file whose modification time is watched.
+    """
+
+    def __init__(self, engine: Engine, db_file: Path) -> None:
+        """Initialize the store, the snapshot itself is loaded on first access."""
+        self.engine = engine
+        self.db_file = db_file
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = Lock()
+
+    def get(self) -> CatalogSnapshot:
+        """
+        Return the snapshot matching the current database file, reloading it if needed.
+
+        :return: Up-to-date catalog snapshot.
+        :rtype: CatalogSnapshot
+        """
+        version = get_db_version(self.db_file)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        # Only one thread reloads, the others wait and reuse its result
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = CatalogSnapshot.load(self.engine, version)
+            return self._snapshot
+
+
+def create_snapshot_dependency(store: SnapshotStore) -> Callable[[], Generator[CatalogSnapshot, None, None]]:
+    """
+    Create a FastAPI-compatible dependency function that yields the current catalog snapshot.
+
+    The snapshot takes the place of the SQLAlchemy session in route handlers.
+
+    :param SnapshotStore store: Store holding the catalog snapshot.
+    :return: Callable dependency function that yields a snapshot.
+    :rtype: Callable[[], Generator[CatalogSnapshot, None, None]]
+    """
+
+    def get_snapshot() -> Generator[CatalogSnapshot, None, None]:
+        yield store.get()
+
+    return get_snapshot
@@ -0,0 +1,39 @@
+"""
+Shared fixtures for the test suite.
+
+Provide isolated copies of the discography database and a factory for alternative application setups.
+"""
+
+from collections.abc import Callable, Generator
+from pathlib import Path
+import shutil
+
+from fastapi import FastAPI
+import pytest
+
+from bowie_api_rest.config import DEFAULT_DB_PATH
+from bowie_api_rest.main import create_app
+
+
+@pytest.fixture
+def db_copy(tmp_path: Path) -> Path:
+    """
+    Copy the default discography database into a temporary directory.
+
+    Tests that modify the database work on this copy so that the shipped file is never touched.
+    """
+    db_file = tmp_path / DEFAULT_DB_PATH.name
+    shutil.copyfile(DEFAULT_DB_PATH, db_file)
+    return db_file
+
+
+@pytest.fixture
+def app_factory() -> Generator[Callable[..., FastAPI], None, None]:
+    """
+    Provide `create_app` and restore the default application wiring afterwards.
+
+    The routes module holds the injected dependencies globally, so building an alternative
+    application rewires every application until the default one is created again.
+    """
+    yield create_app
+    create_app()
@@ -0,0 +1,48 @@
+"""
+Test suite for the async serving mode.
+
+Check that the async routes answer exactly like the synchronous ones.
+"""
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.main import app
+
+
+pytest.importorskip("aiosqlite")
+
+
+def test_async_mode_matches_database_mode(app_factory, db_copy: Path):
+    """
+    Test that every read endpoint returns the same payload in async and database modes.
+
+    Check the full listing, title searches, not found results and the health route.
+    """
+    urls = [
+        "/albums/",
+        "/albums/by-title/?album_title=star",
+        "/albums/by-title/?album_title=NonExistentAlbum",
+        "/tracks/Fa/albums",
+        "/tracks/NonExistentTrack/albums",
+        "/health",
+    ]
+    with TestClient(app) as client:
+        expected = [(r.status_code, r.json()) for r in map(client.get, urls)]
+
+    with TestClient(app_factory(db_copy, serving_mode="async")) as client:
+        actual = [(r.status_code, r.json()) for r in map(client.get, urls)]
+
+    assert actual == expected
+
+
+def test_unknown_serving_mode_is_rejected(app_factory):
+    """
+    Test that creating the application with an unknown serving mode fails.
+
+    Check that a ValueError is raised before any route is registered.
+    """
+    with pytest.raises(ValueError, match="Unknown serving mode"):
+        app_factory(serving_mode="threads")
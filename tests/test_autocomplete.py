@@ -0,0 +1,64 @@
+"""
+Test suite for the title autocomplete endpoints.
+
+Check the folding of titles, the prefix index and that completions follow the changes of the database file.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from bowie_api_rest.autocomplete import AutocompleteStore
+from bowie_api_rest.database import FileDatabaseConfig
+from bowie_api_rest.main import app
+from bowie_api_rest.search_index import PrefixIndex, fold_title
+
+
+def test_fold_title():
+    """Test that folding ignores case, accents and leading punctuation."""
+    assert fold_title("Été Indien") == "ete indien"
+    assert fold_title('"Heroes"') == 'heroes"'
+    assert fold_title("ÆON Flux") == "æon flux"
+    assert fold_title("STRASSE") == fold_title("Straße")
+
+
+def test_prefix_index_completions():
+    """Test that completions are sorted, limited and merge the titles folding to the same key."""
+    index = PrefixIndex([(1, "Fame"), (2, "Fashion"), (3, "fame"), (4, "Fantastic Voyage"), (5, "Café Society")])
+
+    assert len(index) == 4
+    assert index.complete("FA", limit=10) == [("Fame", [1, 3]), ("Fantastic Voyage", [4]), ("Fashion", [2])]
+    assert index.complete("fa", limit=1) == [("Fame", [1, 3])]
+    assert index.complete("cafe s", limit=10) == [("Café Society", [5])]
+    assert index.complete("zz", limit=10) == []
+
+
+def test_autocomplete_endpoints():
+    """Test the album and track completions of the default database."""
+    with TestClient(app) as client:
+        albums = client.get("/autocomplete/albums", params={"q": "hunky"})
+        assert albums.status_code == 200
+        assert [completion["title"] for completion in albums.json()] == ["Hunky Dory"]
+
+        tracks = client.get("/autocomplete/tracks", params={"q": "SPACE", "limit": 1}).json()
+        assert len(tracks) == 1
+        assert tracks[0]["title"].lower().startswith("space")
+
+        assert client.get("/autocomplete/tracks", params={"q": "zzz"}).json() == []
+        assert client.get("/autocomplete/tracks", params={"q": ""}).status_code == 422
+
+
+def test_completions_follow_database_changes(db_copy: Path):
+    """Test that the completions are rebuilt after the database file is modified."""
+    store = AutocompleteStore(FileDatabaseConfig.from_db_file(db_copy).engine, db_copy)
+    before = store.get()
+    assert store.get() is before  # Unchanged file, same indexes
+    assert before.albums.complete("Élan", limit=10) == []
+
+    with sqlite3.connect(db_copy) as connection:
+        connection.execute("INSERT INTO album (title, year) VALUES ('Élan Vital', 2025)")
+
+    after = store.get()
+    assert after is not before
+    assert [title for title, _ in after.albums.complete("elan", limit=10)] == ["Élan Vital"]
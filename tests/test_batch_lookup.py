@@ -0,0 +1,87 @@
+"""
+Test suite for the batch title lookup endpoint.
+
+Contains tests comparing the batch results with the single title endpoints in every serving mode, and a check
+of the query plan of the batch statement.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from bowie_api_rest.crud import _batch_albums_by_title_stmt, _batch_albums_with_matching_tracks_stmt
+
+
+TRACK_TITLES = ["fame", "Heroes", "no such track", "space", "fame"]
+ALBUM_TITLES = ["the", "hunky", "no such album"]
+
+
+def _single(client: TestClient, url: str, params: dict) -> list:
+    """Return the albums of a single title endpoint, an empty list when it finds none."""
+    response = client.get(url, params=params)
+    return response.json() if response.status_code == 200 else []
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "snapshot", "async"])
+@pytest.mark.parametrize("match", ["contains", "prefix", "exact"])
+def test_batch_matches_single_lookups(app_factory, db_copy: Path, serving_mode: str, match: str):
+    """
+    Test that every batch result equals the response of the single title endpoint, keyed by searched title.
+
+    Check that duplicated titles are answered once and that titles matching nothing get an empty list.
+    """
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode)) as client:
+        body = {"track_titles": TRACK_TITLES, "album_titles": ALBUM_TITLES, "match": match}
+        response = client.post("/batch/lookup", json=body)
+        assert response.status_code == 200
+        batch = response.json()
+
+        assert list(batch["tracks"]) == list(dict.fromkeys(TRACK_TITLES))
+        assert list(batch["albums"]) == ALBUM_TITLES
+        for title, albums in batch["tracks"].items():
+            assert albums == _single(client, f"/tracks/{title}/albums", {"match": match})
+        for title, albums in batch["albums"].items():
+            assert albums == _single(client, "/albums/by-title/", {"album_title": title, "match": match})
+        assert batch["tracks"]["no such track"] == []
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "snapshot"])
+def test_batch_limit(app_factory, db_copy: Path, serving_mode: str):
+    """Test that `limit` keeps the first albums of every searched title, and that invalid requests are refused."""
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode)) as client:
+        body = {"track_titles": ["the", "fame"], "album_titles": ["the"], "limit": 2}
+        batch = client.post("/batch/lookup", json=body).json()
+        assert batch["tracks"]["the"] == client.get("/tracks/the/albums", params={"limit": 2}).json()
+        assert batch["tracks"]["fame"] == client.get("/tracks/fame/albums", params={"limit": 2}).json()
+        assert (
+            batch["albums"]["the"] == client.get("/albums/by-title/", params={"album_title": "the", "limit": 2}).json()
+        )
+
+        assert client.post("/batch/lookup", json={}).json() == {"tracks": {}, "albums": {}}
+        assert client.post("/batch/lookup", json={"track_titles": ["fame"], "limit": 0}).status_code == 422
+        assert client.post("/batch/lookup", json={"album_titles": ["x"], "match": "regex"}).status_code == 422
+
+
+def test_batch_statement_searches_trigram_index_per_title(db_copy: Path):
+    """
+    Test that the batch statement looks every searched title up in the trigram index.
+
+    A full scan of the index would show a `VIRTUAL TABLE INDEX 0:` step without any constraint.
+    """
+    dialect = sqlite.dialect()
+    statements = [
+        _batch_albums_with_matching_tracks_stmt(TRACK_TITLES).compile(dialect=dialect),
+        _batch_albums_by_title_stmt(ALBUM_TITLES, limit=2).compile(dialect=dialect),
+    ]
+    with sqlite3.connect(db_copy) as connection:
+        for statement in statements:
+            parameters = [statement.params[name] for name in statement.positiontup]
+            plan = [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            fts_steps = [detail for detail in plan if "VIRTUAL TABLE" in detail]
+            assert fts_steps and all(":L" in detail for detail in fts_steps)
+            assert not [detail for detail in plan if detail in ("SCAN album", "SCAN track")]
@@ -0,0 +1,158 @@
+"""
+Test suite for the bulk database builder of `scripts/build_db.py`.
+
+Check that the incremental JSON parser and the bulk loader produce the same catalog as the shipped database.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.config import DEFAULT_DB_PATH
+from bowie_api_rest.migrations import SCHEMA_VERSION
+
+
+BUILD_DB_PATH = Path(__file__).resolve().parent.parent / "scripts" / "build_db.py"
+JSON_PATH = DEFAULT_DB_PATH.with_suffix(".json")
+
+# The script is not part of the package, load it from its file
+_spec = importlib.util.spec_from_file_location("build_db", BUILD_DB_PATH)
+build_db = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(build_db)
+
+
+def catalog_rows(db_file: Path) -> tuple[list, list]:
+    """Return every album and track row of a database, ordered by identifier."""
+    with sqlite3.connect(db_file) as connection:
+        albums = connection.execute("SELECT id, title, year FROM album ORDER BY id").fetchall()
+        tracks = connection.execute("SELECT id, title, duration, album_id FROM track ORDER BY id").fetchall()
+    return albums, tracks
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096])
+def test_incremental_parser_matches_whole_file_parsing(chunk_size: int):
+    """
+    Test that parsing the JSON file album by album gives the albums of a whole-file parse.
+
+    Check with chunks smaller than a single album.
+    """
+    expected = json.loads(JSON_PATH.read_text(encoding="utf-8"))["albums_data"]
+    albums = build_db.iter_album_inputs(JSON_PATH, chunk_size=chunk_size)
+
+    assert [album.model_dump() for album in albums] == expected
+
+
+def test_incremental_parser_rejects_truncated_file(tmp_path: Path):
+    """Test that a truncated albums array raises a ValueError instead of silently dropping albums."""
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text(JSON_PATH.read_text(encoding="utf-8")[:5000], encoding="utf-8")
+
+    with pytest.raises(ValueError, match="truncated"):
+        list(build_db.iter_album_inputs(truncated, chunk_size=512))
+
+
+def test_bulk_build_matches_shipped_database(tmp_path: Path):
+    """
+    Test that the bulk builder produces the rows of the shipped database and a working search index.
+
+    Check the title search index and the integrity of the new file.
+    """
+    db_file = tmp_path / "bulk.db"
+    album_count, track_count = build_db.bulk_seed_database(
+        build_db.iter_album_inputs(JSON_PATH), build_db.create_build_engine(db_file), batch_size=4
+    )
+
+    albums, tracks = catalog_rows(db_file)
+    assert (albums, tracks) == catalog_rows(DEFAULT_DB_PATH)
+    assert (album_count, track_count) == (len(albums), len(tracks))
+
+    with sqlite3.connect(db_file) as connection:
+        assert connection.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        assert connection.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+        matches = connection.execute("SELECT rowid FROM track_title_fts WHERE title LIKE '%fame%'").fetchall()
+    assert matches and all("fame" in tracks[rowid - 1][1].lower() for (rowid,) in matches)
+
+
+def catalog_content(db_file: Path) -> set[tuple]:
+    """Return the (album title, year, track title, duration) rows of a database, without identifiers."""
+    with sqlite3.connect(db_file) as connection:
+        return set(
+            connection.execute(
+                "SELECT album.title, album.year, track.title, track.duration "
+                "FROM album LEFT JOIN track ON track.album_id = album.id"
+            )
+        )
+
+
+def test_sync_applies_only_the_differences(app_factory, db_copy: Path, tmp_path: Path):
+    """
+    Test that a full sync turns the database into the catalog of the JSON file, touching only changed rows.
+
+    Check the change counts, that unchanged rows keep their identifiers,
+    and that a running snapshot application serves the new catalog without restart.
+    """
+    catalog = json.loads(JSON_PATH.read_text(encoding="utf-8"))
+    albums = catalog["albums_data"]
+    removed = albums.pop(0)
+    albums[0]["tracks"][0][1] = "9:99"
+    albums[1]["tracks"].append(["Bonus Track", "1:23"])
+    albums.append({"title": "The Lost Tapes", "year": 2030, "tracks": [["Lost Song", "3:00"]]})
+    new_json = tmp_path / "catalog.json"
+    new_json.write_text(json.dumps(catalog), encoding="utf-8")
+
+    _, tracks_before = catalog_rows(db_copy)
+    client = TestClient(app_factory(db_copy, serving_mode="snapshot", response_cache_size=0))
+    assert client.get("/tracks/Lost Song/albums").status_code == 404
+
+    counts = build_db.sync_database(
+        build_db.create_engine(f"sqlite:///{db_copy}"), build_db.iter_album_inputs(new_json)
+    )
+
+    assert counts == {
+        "albums_inserted": 1,
+        "albums_deleted": 1,
+        "tracks_inserted": 2,
+        "tracks_updated": 1,
+        "tracks_deleted": len(removed["tracks"]),
+    }
+    expected_db = tmp_path / "expected.db"
+    build_db.bulk_seed_database(build_db.iter_album_inputs(new_json), build_db.create_build_engine(expected_db))
+    assert catalog_content(db_copy) == catalog_content(expected_db)
+
+    with sqlite3.connect(db_copy) as connection:
+        durations = connection.execute("SELECT duration, duration_seconds FROM track").fetchall()
+    assert all(seconds == build_db.duration_to_seconds(duration) for duration, seconds in durations)
+
+    _, tracks_after = catalog_rows(db_copy)
+    assert tracks_after[-3] == tracks_before[-1]  # Untouched tracks keep their identifier
+    assert [album["title"] for album in client.get("/tracks/Lost Song/albums").json()] == ["The Lost Tapes"]
+
+
+def test_changeset_and_noop_sync(db_copy: Path):
+    """
+    Test that a changeset only touches the listed albums and that syncing an unchanged catalog writes nothing.
+
+    Check that the database file is not modified by a no-op sync, so caches are not invalidated.
+    """
+    engine = build_db.create_engine(f"sqlite:///{db_copy}")
+    mtime = db_copy.stat().st_mtime_ns
+    counts = build_db.sync_database(engine, build_db.iter_album_inputs(JSON_PATH))
+    assert not any(counts.values())
+    assert db_copy.stat().st_mtime_ns == mtime
+
+    changeset = build_db.ChangesetConfig.model_validate(
+        {
+            "upsert": [{"title": "Blackstar", "year": 2016, "tracks": [["Blackstar", "9:57"]]}],
+            "delete": [{"title": "Hunky Dory", "year": 1971}, {"title": "Unknown", "year": 2000}],
+        }
+    )
+    counts = build_db.sync_database(engine, changeset.upsert, changeset.delete, full=False)
+
+    albums, _ = catalog_rows(db_copy)
+    assert "Hunky Dory" not in {title for _, title, _ in albums}
+    assert {row[2:] for row in catalog_content(db_copy) if row[0] == "Blackstar"} == {("Blackstar", "9:57")}
+    assert counts["albums_deleted"] == 1 and counts["albums_inserted"] == 0
@@ -0,0 +1,92 @@
+"""
+Test suite for the response cache.
+
+Contains tests for the LRU/TTL eviction policy and for the caching middleware in front of the search endpoints.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from bowie_api_rest.cache import ResponseCache
+
+
+def test_cache_evicts_least_recently_used_entries():
+    """
+    Test that the cache keeps at most `max_entries` responses and evicts the least recently used one.
+
+    Check that reading an entry protects it from the next eviction.
+    """
+    cache = ResponseCache(max_entries=2)
+    cache.put(("/a", ()), 200, (), b"a")
+    cache.put(("/b", ()), 200, (), b"b")
+    assert cache.get(("/a", ())) is not None  # "/b" becomes the least recently used entry
+    cache.put(("/c", ()), 200, (), b"c")
+
+    assert cache.get(("/b", ())) is None
+    assert cache.get(("/a", ())).body == b"a"
+    assert cache.as_dict() == {
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+        "invalidations": 0,
+        "size": 2,
+        "max_entries": 2,
+    }
+
+
+def test_cache_expires_entries_and_follows_version():
+    """
+    Test that entries expire after the TTL and that a version change clears the cache.
+
+    Check both invalidation paths independently.
+    """
+    cache = ResponseCache(ttl=-1)  # Every entry is already stale
+    cache.put(("/a", ()), 200, (), b"a")
+    assert cache.get(("/a", ())) is None
+
+    version = 1
+    cache = ResponseCache(version=lambda: version)
+    cache.put(("/a", ()), 200, (), b"a")
+    assert cache.get(("/a", ())) is not None
+    version = 2
+    assert cache.get(("/a", ())) is None
+    assert cache.as_dict()["invalidations"] == 1
+
+
+def test_search_responses_are_served_from_cache(app_factory, db_copy: Path):
+    """
+    Test that repeated searches, including not found ones, are answered from the cache.
+
+    Check that the order of the query parameters does not matter and that a database change invalidates the cache.
+    """
+    # Uncompressed responses, encoded variants are cached separately
+    with TestClient(app_factory(db_copy), headers={"Accept-Encoding": "identity"}) as client:
+        first = client.get("/albums/by-title/?album_title=low&match=exact")
+        second = client.get("/albums/by-title/?match=exact&album_title=low")
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert client.get("/tracks/NonExistentTrack/albums").status_code == 404
+        assert client.get("/tracks/NonExistentTrack/albums").json() == {"detail": "No albums found for this track"}
+        stats = client.get("/stats/cache").json()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 2)
+
+        with sqlite3.connect(db_copy) as connection:
+            connection.execute("INSERT INTO track (title, duration, album_id) VALUES ('NonExistentTrack', '1:00', 1)")
+        assert client.get("/tracks/NonExistentTrack/albums").status_code == 200
+        assert client.get("/stats/cache").json()["invalidations"] == 1
+
+
+def test_rejected_requests_are_not_served_from_cache(app_factory, db_copy: Path):
+    """
+    Test that requests differing from a cached one only by case get their own response.
+
+    Check that an invalid `match` value is rejected even after the valid one has been cached.
+    """
+    with TestClient(app_factory(db_copy), headers={"Accept-Encoding": "identity"}) as client:
+        assert client.get("/albums/by-title/?album_title=low&match=exact").status_code == 200
+        for _ in range(2):
+            assert client.get("/albums/by-title/?album_title=low&match=EXACT").status_code == 422
+        stats = client.get("/stats/cache").json()
+        assert (stats["hits"], stats["size"]) == (0, 1)
@@ -0,0 +1,133 @@
+"""
+Test suite for the memory-mapped columnar catalog.
+
+Contains tests comparing every query of the columnar catalog with the catalog snapshot, and the `columnar` serving mode
+with the `database` one.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import Engine, event
+
+from bowie_api_rest.columnar import ColumnarCatalog, ColumnarStore, columnar_path, write_columnar_catalog
+from bowie_api_rest.database import FileDatabaseConfig
+from bowie_api_rest.snapshot import CatalogSnapshot
+
+
+QUERIES = ["the", "FAME", "space oddity", "ch-ch", "st", "a", "x", "été", "ÉTÉ À", "no such title"]
+"""Searched titles, shorter than a trigram, absent, or with non-ASCII characters."""
+
+
+def _add_accented_album(db_file: Path) -> None:
+    """Add an album whose titles are not ASCII to a database."""
+    with sqlite3.connect(db_file) as connection:
+        album_id = connection.execute("INSERT INTO album (title, year) VALUES ('Été à Berlin', 1977)").lastrowid
+        connection.executemany(
+            "INSERT INTO track (title, duration, duration_seconds, album_id) VALUES (?, ?, ?, ?)",
+            [("Ça ira", "3:05", 185, album_id), ("Über Alles", "12:00", 720, album_id)],
+        )
+
+
+@pytest.fixture
+def catalogs(db_copy: Path) -> tuple[ColumnarCatalog, CatalogSnapshot]:
+    """Write the columnar catalog of a database copy and load its snapshot."""
+    _add_accented_album(db_copy)
+    engine = FileDatabaseConfig.from_db_file(db_copy).engine
+    write_columnar_catalog(engine, columnar_path(db_copy))
+    return ColumnarCatalog.open(columnar_path(db_copy)), CatalogSnapshot.load(engine)
+
+
+@pytest.mark.parametrize("match", ["contains", "prefix", "exact"])
+def test_title_searches_match_snapshot(catalogs: tuple[ColumnarCatalog, CatalogSnapshot], match: str):
+    """Test that the title searches of the columnar catalog return the albums of the snapshot, page after page."""
+    columnar, snapshot = catalogs
+    for query in QUERIES:
+        for limit, after_id in [(None, None), (2, None), (3, 4)]:
+            for method in ("get_albums_by_title", "get_albums_containing_track", "get_albums_with_matching_tracks"):
+                expected = getattr(snapshot, method)(query, limit, after_id, match)
+                assert getattr(columnar, method)(query, limit, after_id, match) == expected, (method, query)
+
+
+def test_other_queries_match_snapshot(catalogs: tuple[ColumnarCatalog, CatalogSnapshot]):
+    """Test the listing, identifier, duration and runtime queries of the columnar catalog against the snapshot."""
+    columnar, snapshot = catalogs
+    assert list(columnar.albums) == list(snapshot.albums)
+    assert columnar.list_albums(3, 5) == snapshot.list_albums(3, 5)
+    assert columnar.get_albums_by_ids([3, 1, 999, 3]) == snapshot.get_albums_by_ids([3, 1, 999, 3])
+    assert columnar.get_albums_with_tracks([50, 1, 7, 99_999]) == snapshot.get_albums_with_tracks([50, 1, 7, 99_999])
+    for arguments in [(None, None, False, None), (200, 300, True, 5), (600, None, False, 3)]:
+        assert columnar.get_tracks_by_duration(*arguments) == snapshot.get_tracks_by_duration(*arguments)
+    assert columnar.get_album_runtimes() == snapshot.get_album_runtimes()
+    assert columnar.get_album_runtimes(2, 4) == snapshot.get_album_runtimes(2, 4)
+
+
+def test_columnar_serving_mode(app_factory, db_copy: Path):
+    """Test that the `columnar` serving mode answers the catalog endpoints like the `database` mode."""
+    write_columnar_catalog(FileDatabaseConfig.from_db_file(db_copy).engine, columnar_path(db_copy))
+    urls = [
+        "/albums/?limit=3&cursor=2",
+        "/albums/by-title/?album_title=hunky&match=prefix",
+        "/tracks/fame/albums",
+        "/tracks/by-duration/?min_seconds=300&max_seconds=360",
+        "/albums/runtime/?limit=3",
+        "/export/albums",
+    ]
+    with TestClient(app_factory(db_copy, response_cache_size=0)) as client:
+        expected = [client.get(url).content for url in urls]
+        batch = client.post("/batch/lookup", json={"track_titles": ["fame", "heroes"]}).json()
+    with TestClient(app_factory(db_copy, serving_mode="columnar", response_cache_size=0)) as client:
+        assert [client.get(url).content for url in urls] == expected
+        assert client.post("/batch/lookup", json={"track_titles": ["fame", "heroes"]}).json() == batch
+
+
+def test_columnar_startup_only_maps_file(app_factory, db_copy: Path):
+    """
+    Test that the `columnar` serving mode starts without querying the database.
+
+    Check that the titles are completed from the mapped file on first use, and that no SQLite settings are reported.
+    """
+    write_columnar_catalog(FileDatabaseConfig.from_db_file(db_copy).engine, columnar_path(db_copy))
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        app = app_factory(db_copy, serving_mode="columnar")
+        with TestClient(app) as client:
+            assert app.state.autocomplete_store._completions is None
+            assert client.get("/autocomplete/tracks", params={"q": "fam"}).json()[0]["title"] == "Fame"
+            assert client.get("/search/tracks", params={"q": "heroez"}).json()[0]["title"] == '"Heroes"'
+            assert client.get("/stats/sqlite").status_code == 404
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert statements == []
+
+
+def test_rewritten_file_is_mapped_again(db_copy: Path):
+    """Test that the store maps the file once, and again after it is rewritten from a modified database."""
+    engine = FileDatabaseConfig.from_db_file(db_copy).engine
+    path = columnar_path(db_copy)
+    write_columnar_catalog(engine, path)
+    store = ColumnarStore(path)
+    before = store.get()
+    assert store.get() is before
+
+    _add_accented_album(db_copy)
+    write_columnar_catalog(engine, path)
+    after = store.get()
+    assert after is not before
+    assert len(after.albums) == len(before.albums) + 1
+    assert after.get_albums_by_title("Été")[0].title == "Été à Berlin"
+
+
+def test_invalid_file_is_rejected(tmp_path: Path):
+    """Test that a file which is not a columnar catalog is rejected when mapped."""
+    path = tmp_path / "catalog.columnar"
+    path.write_bytes(b"SQLite format 3\x00" + bytes(64))
+    with pytest.raises(ValueError, match="Not a columnar catalog"):
+        ColumnarCatalog.open(path)
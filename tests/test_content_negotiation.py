@@ -0,0 +1,101 @@
+"""
+Test suite for the negotiated compression and MessagePack encoding of the responses.
+
+Contains tests for the negotiation of the content codings and media types, and for the encoded responses.
+"""
+
+import gzip
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.content_negotiation import negotiate_coding, negotiate_media_type
+
+
+def test_negotiation():
+    """
+    Test that the accepted coding of highest quality is chosen, ties being broken by the server preference.
+
+    Check that MessagePack is only chosen when the client prefers it to JSON.
+    """
+    codings = ("br", "zstd", "gzip")
+    assert negotiate_coding("gzip, deflate, br", codings) == "br"
+    assert negotiate_coding("br;q=0.5, gzip", codings) == "gzip"
+    assert negotiate_coding("*", codings) == "br"
+    assert negotiate_coding("identity, gzip;q=0", codings) is None
+    assert negotiate_coding("", codings) is None
+
+    pytest.importorskip("msgpack")
+    assert negotiate_media_type("application/msgpack") == "application/msgpack"
+    assert negotiate_media_type("application/x-msgpack, application/json;q=0.5") == "application/msgpack"
+    assert negotiate_media_type("application/json, application/msgpack;q=0.5") == "application/json"
+    assert negotiate_media_type("*/*") == "application/json"
+
+
+def test_compressed_responses_are_cached(app_factory, db_copy: Path):
+    """
+    Test that large responses are compressed, and that each variant is compressed once.
+
+    Check that small responses are sent as is and that every response varies on the negotiated headers.
+    """
+    with TestClient(app_factory(db_copy)) as client:
+        expected = client.get("/albums/", headers={"Accept-Encoding": "identity"}).content
+
+        for _ in range(2):
+            response = client.get("/albums/", headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["vary"] == "Accept, Accept-Encoding"
+            assert int(response.headers["content-length"]) < len(expected) / 2
+            assert response.content == expected  # Decoded by the client
+        # The first gzip response compresses the cached JSON body, the second one is the gzip body cached apart
+        stats = client.get("/stats/cache").json()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+        small = client.get("/tracks/Heroes/albums", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+        assert small.headers["vary"] == "Accept, Accept-Encoding"
+
+        with client.stream("GET", "/export/albums", headers={"Accept-Encoding": "gzip"}) as stream:
+            assert stream.headers["content-encoding"] == "gzip"
+            assert gzip.decompress(b"".join(stream.iter_raw())).count(b"\n") == len(client.get("/albums/").json())
+
+
+@pytest.mark.parametrize("coding", ["br", "zstd"])
+def test_optional_codings(app_factory, db_copy: Path, coding: str):
+    """
+    Test the Brotli and Zstandard codings, skipped when their package is not installed.
+
+    Check that the body decompresses to the JSON response.
+    """
+    module = pytest.importorskip({"br": "brotli", "zstd": "zstandard"}[coding])
+    with TestClient(app_factory(db_copy)) as client:
+        expected = client.get("/albums/", headers={"Accept-Encoding": "identity"}).content
+        with client.stream("GET", "/albums/", headers={"Accept-Encoding": coding}) as response:
+            assert response.headers["content-encoding"] == coding
+            body = b"".join(response.iter_raw())
+
+    if coding == "br":
+        assert module.decompress(body) == expected
+    else:
+        assert module.ZstdDecompressor().decompressobj().decompress(body) == expected
+
+
+def test_msgpack_responses(app_factory, db_copy: Path):
+    """
+    Test that clients preferring MessagePack get the JSON data encoded as MessagePack.
+
+    Check that compression applies to MessagePack bodies as well.
+    """
+    msgpack = pytest.importorskip("msgpack")
+    with TestClient(app_factory(db_copy)) as client:
+        expected = client.get("/albums/").json()
+        response = client.get("/albums/", headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == expected
+        assert len(response.content) < len(client.get("/albums/", headers={"Accept-Encoding": "identity"}).content)
+
+        headers = {"Accept": "application/msgpack", "Accept-Encoding": "gzip"}
+        with client.stream("GET", "/albums/", headers=headers) as compressed:
+            assert compressed.headers["content-encoding"] == "gzip"
+            assert msgpack.unpackb(gzip.decompress(b"".join(compressed.iter_raw()))) == expected
@@ -0,0 +1,47 @@
+"""
+Test suite for the database engine and session lifecycle.
+
+Contains tests for the connection pool configuration and the release of connections after each request.
+"""
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from bowie_api_rest.database import FileDatabaseConfig, PoolConfig
+
+
+def test_pool_config_is_applied(db_copy: Path):
+    """
+    Test that the connection pool settings are passed to the engine.
+
+    Check the pool size, overflow, pre-ping and recycle settings.
+    """
+    engine = FileDatabaseConfig.from_db_file(
+        db_copy, PoolConfig(pool_size=2, max_overflow=1, pool_pre_ping=True, pool_recycle=60)
+    ).engine
+
+    assert engine.pool.size() == 2
+    assert engine.pool._max_overflow == 1
+    assert engine.pool._pre_ping is True
+    assert engine.pool._recycle == 60
+
+
+def test_connections_are_released_after_each_request(app_factory, db_copy: Path):
+    """
+    Test that every connection taken from the pool during a request is returned to it.
+
+    Check the pool statistics endpoint after a series of successful and not found requests,
+    with the response cache disabled so that every request reaches the database.
+    """
+    with TestClient(app_factory(db_copy, response_cache_size=0)) as client:
+        for _ in range(20):
+            client.get("/albums/")
+            client.get("/tracks/Heroes/albums")
+            client.get("/albums/by-title/?album_title=NonExistentAlbum")
+
+        stats = client.get("/stats/pool").json()
+
+    assert stats["checkouts"] >= 60
+    assert stats["checkins"] == stats["checkouts"]
+    assert stats["checked_out"] == 0
@@ -0,0 +1,89 @@
+"""
+Test suite for the numeric track durations and the duration endpoints.
+
+Check the migration of existing databases and that every serving mode computes the same durations and runtimes.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.database import FileDatabaseConfig, init_db
+from bowie_api_rest.models import duration_to_seconds
+
+
+URLS = [
+    "/tracks/by-duration/?min_seconds=300&max_seconds=360",
+    "/tracks/by-duration/?max_seconds=150&order=desc&limit=5",
+    "/tracks/by-duration/?min_seconds=100000",
+    "/tracks/longest/",
+    "/albums/runtime/",
+    "/albums/runtime/?limit=3&cursor=5",
+]
+
+
+def test_migration_fills_duration_seconds(db_copy: Path):
+    """
+    Test that opening a database built before `duration_seconds` existed adds, fills and indexes the column.
+
+    Check every track against the Python conversion of its duration, including an h:mm:ss one.
+    """
+    with sqlite3.connect(db_copy) as connection:
+        connection.execute("INSERT INTO track (title, duration, album_id) VALUES ('Long Mix', '1:02:03', 1)")
+        connection.execute("DROP INDEX ix_track_duration_seconds")
+        connection.execute("ALTER TABLE track DROP COLUMN duration_seconds")
+        connection.execute("PRAGMA user_version = 0")
+
+    init_db(FileDatabaseConfig.from_db_file(db_copy).engine)
+
+    with sqlite3.connect(db_copy) as connection:
+        rows = connection.execute("SELECT duration, duration_seconds FROM track").fetchall()
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM track WHERE duration_seconds BETWEEN 60 AND 120"
+        ).fetchall()
+    assert rows and all(seconds == duration_to_seconds(duration) for duration, seconds in rows)
+    assert ("1:02:03", 3723) in rows
+    assert any("ix_track_duration_seconds" in step[-1] for step in plan)
+
+
+def test_duration_endpoints(app_factory, db_copy: Path):
+    """
+    Test the duration range, longest tracks and album runtime endpoints against values computed in Python.
+
+    Check the bounds, the order and the totals.
+    """
+    with sqlite3.connect(db_copy) as connection:
+        tracks = connection.execute("SELECT id, duration, album_id FROM track").fetchall()
+    seconds = {track_id: duration_to_seconds(duration) for track_id, duration, _ in tracks}
+
+    with TestClient(app_factory(db_copy)) as client:
+        in_range = client.get(URLS[0]).json()
+        longest = client.get("/tracks/longest/?limit=3").json()
+        runtimes = client.get("/albums/runtime/").json()
+        assert client.get(URLS[2]).status_code == 404
+
+    assert [t["id"] for t in in_range] == sorted(
+        (i for i, s in seconds.items() if 300 <= s <= 360), key=lambda i: (seconds[i], i)
+    )
+    assert [t["duration_seconds"] for t in longest] == sorted(seconds.values(), reverse=True)[:3]
+    assert longest[0]["duration"] and longest[0]["album_id"]
+    album_totals = {album["id"]: album["runtime_seconds"] for album in runtimes}
+    assert album_totals[1] == sum(seconds[i] for i, _, album_id in tracks if album_id == 1)
+    assert runtimes[0]["runtime"] == f"{album_totals[1] // 60}:{album_totals[1] % 60:02d}"
+
+
+@pytest.mark.parametrize("serving_mode", ["snapshot", "async"])
+def test_duration_endpoints_match_database_mode(app_factory, db_copy: Path, serving_mode: str):
+    """Test that the duration endpoints return the same payloads and pagination headers in every serving mode."""
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+
+    def fetch(client: TestClient) -> list:
+        return [(r.status_code, r.headers.get("x-next-cursor"), r.json()) for r in map(client.get, URLS)]
+
+    with TestClient(app_factory(db_copy)) as client:
+        expected = fetch(client)
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode)) as client:
+        assert fetch(client) == expected
@@ -0,0 +1,49 @@
+"""
+Test suite for the streaming NDJSON export of the catalog.
+
+Check that the export contains every album of the listing, one per line, in every serving mode.
+"""
+
+import json
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.serialization import NDJSON_MEDIA_TYPE, iter_ndjson
+from bowie_api_rest.snapshot import AlbumRecord, TrackRecord
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "snapshot", "async"])
+def test_export_matches_album_listing(app_factory, db_copy: Path, serving_mode: str):
+    """
+    Test that each line of the export is one album of the `/albums/` listing, in the same order.
+
+    Check the media type of the streaming response.
+    """
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode)) as client:
+        expected = client.get("/albums/").json()
+        with client.stream("GET", "/export/albums") as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+            lines = list(response.iter_lines())
+
+    assert [json.loads(line) for line in lines] == expected
+
+
+def test_ndjson_chunks_only_contain_complete_lines():
+    """
+    Test that every chunk of the stream ends with a complete line.
+
+    Check with a chunk size smaller than a single album.
+    """
+    albums = [
+        AlbumRecord(id=i, title=f"Album {i}", year=1970, tracks=(TrackRecord(i, "Song", "1:00"),)) for i in range(5)
+    ]
+    chunks = list(iter_ndjson(albums, chunk_size=10))
+
+    assert len(chunks) == 5
+    assert all(chunk.endswith(b"\n") and chunk.count(b"\n") == 1 for chunk in chunks)
@@ -0,0 +1,96 @@
+"""
+Test suite for the typo-tolerant title searches.
+
+Check the bounded edit distance, the fuzzy index and that every serving mode ranks the same results.
+"""
+
+from collections.abc import Callable
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.search_index import FuzzyIndex, max_fuzzy_edits, substring_distance
+
+
+def _reference_distance(pattern: str, text: str) -> int:
+    """Compute the smallest edit distance between a pattern and any substring of a text with the full matrix."""
+    previous = list(range(len(pattern) + 1))
+    best = previous[-1]
+    for char in text:
+        current = [0]
+        for i, pattern_char in enumerate(pattern, start=1):
+            current.append(min(previous[i] + 1, current[i - 1] + 1, previous[i - 1] + (pattern_char != char)))
+        previous = current
+        best = min(best, current[-1])
+    return best
+
+
+@pytest.mark.parametrize(
+    ("pattern", "text"),
+    [
+        ("ziggy stardst", "the rise and fall of ziggy stardust"),
+        ("rebel rebl", "rebel rebel"),
+        ("heroes", "heroes"),
+        ("abc", ""),
+        ("kooks", "hunky dory"),
+        ("aaab", "abaaba"),
+    ],
+)
+def test_substring_distance(pattern: str, text: str):
+    """Test the bit-parallel distance against the dynamic programming matrix."""
+    assert substring_distance(pattern, text) == _reference_distance(pattern, text)
+
+
+def test_fuzzy_index_ranking():
+    """Test that the closest titles come first and that titles beyond the tolerated edits are left out."""
+    keys = ["rebel rebel", "rebel never gets old", "revel", "ziggy stardust", "starman"]
+    index = FuzzyIndex(keys)
+
+    assert max_fuzzy_edits("rebel rebl") == 2
+    assert [keys[position] for position, _ in index.search("rebel rebl", 10)] == ["rebel rebel"]
+    assert [keys[position] for position, _ in index.search("rebl neber", 10)] == ["rebel never gets old"]
+    assert index.search("ziggy stardst", 10) == [(3, 1 - 1 / 13)]
+    assert index.search("stardust", 10)[0] == (3, 1.0)
+    assert index.search("rebel", 1) == [(0, 1.0)]
+    assert index.search("qwertyuiop", 10) == []
+    # Too short to tolerate typos, only exact substrings match
+    assert max_fuzzy_edits("revl") == 0
+    assert index.search("revl", 10) == []
+    # Shorter than a trigram, left to the prefix index
+    assert index.search("re", 10) == []
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "snapshot", "async"])
+def test_fuzzy_search_endpoints(db_copy: Path, app_factory: Callable[..., FastAPI], serving_mode: str):
+    """Test that misspelled titles are found, ranked and scored the same way in every serving mode."""
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+    client = TestClient(app_factory(db_copy, serving_mode=serving_mode))
+
+    tracks = client.get("/search/tracks", params={"q": "Rebel Rebl"})
+    assert tracks.status_code == 200
+    best = tracks.json()[0]
+    assert best["score"] == 0.9
+    assert [track["title"] for track in best["tracks"]] == ["Rebel Rebel"]
+
+    albums = client.get("/search/albums", params={"q": "Ziggy Stardst", "limit": 1}).json()
+    assert [album["title"] for album in albums] == ["The Rise and Fall of Ziggy Stardust and the Spiders from Mars"]
+    assert albums[0]["tracks"]
+
+    assert client.get("/search/tracks", params={"q": "qwertyuiop"}).json() == []
+
+
+def test_short_queries_match_title_prefixes(db_copy: Path, app_factory: Callable[..., FastAPI]):
+    """Test that queries shorter than a trigram return the titles starting with them, as exact matches."""
+    client = TestClient(app_factory(db_copy))
+
+    albums = client.get("/search/albums", params={"q": "lo"}).json()
+    assert albums
+    assert all(album["title"].lower().startswith("lo") and album["score"] == 1.0 for album in albums)
+    tracks = client.get("/search/tracks", params={"q": "S", "limit": 3}).json()
+    titles = [track["title"] for album in tracks for track in album["tracks"]]
+    assert len(titles) == 3
+    assert all(title.lower().startswith("s") for title in titles)
+    assert client.get("/search/albums", params={"q": "!"}).json() == []
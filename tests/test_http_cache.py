@@ -0,0 +1,103 @@
+"""
+Test suite for the HTTP caching headers and conditional requests.
+
+Contains tests for the validators of the catalog responses and for `304 Not Modified` answers.
+"""
+
+import os
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import Engine, event
+
+from bowie_api_rest.http_cache import etag_matches, not_modified_since
+
+
+def test_validators_comparison():
+    """
+    Test the weak comparison of entity tags and the comparison of `If-Modified-Since` dates.
+
+    Check lists of tags, the `*` wildcard and invalid dates.
+    """
+    assert etag_matches('"a", W/"b"', 'W/"b"')
+    assert etag_matches('"b"', 'W/"b"')
+    assert etag_matches("*", 'W/"b"')
+    assert not etag_matches('W/"a"', 'W/"b"')
+
+    assert not_modified_since("Sun, 06 Nov 1994 08:49:37 GMT", 784111777)
+    assert not not_modified_since("Sun, 06 Nov 1994 08:49:37 GMT", 784111778)
+    assert not not_modified_since("yesterday", 0)
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "async", "snapshot"])
+def test_conditional_requests_skip_queries(app_factory, db_copy: Path, serving_mode: str):
+    """
+    Test that revalidations of a current response are answered with 304 without any query.
+
+    Check the validators of the responses, in every serving mode and with the response cache disabled.
+    """
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode, response_cache_size=0)) as client:
+        response = client.get("/albums/?limit=5")
+        etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+        assert etag.startswith('W/"')
+        assert response.headers["cache-control"] == "public, max-age=60"
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            for headers in ({"If-None-Match": etag}, {"If-Modified-Since": last_modified}):
+                not_modified = client.get("/albums/?limit=5", headers=headers)
+                assert not_modified.status_code == 304
+                assert not_modified.content == b""
+                assert not_modified.headers["etag"] == etag
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        assert statements == []
+
+        assert client.get("/albums/?limit=5", headers={"If-None-Match": 'W/"0"'}).status_code == 200
+        assert "etag" not in client.get("/health").headers
+
+
+def test_database_change_invalidates_validators(app_factory, db_copy: Path):
+    """
+    Test that a database change yields a new entity tag, so that previous copies are sent again.
+
+    Check that a 404 response carries no validator and that `max_age=0` asks for revalidation.
+    """
+    with TestClient(app_factory(db_copy, http_cache_max_age=0)) as client:
+        etag = client.get("/tracks/Heroes/albums").headers["etag"]
+        assert client.get("/tracks/NonExistentTrack/albums").headers.get("etag") is None
+
+        with sqlite3.connect(db_copy) as connection:
+            connection.execute("UPDATE album SET year = year + 1")
+        stat = db_copy.stat()
+        os.utime(db_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        response = client.get("/tracks/Heroes/albums", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.headers["cache-control"] == "public, no-cache"
+
+
+def test_only_successful_responses_are_not_modified(app_factory, db_copy: Path):
+    """
+    Test that conditional requests keep the status of URLs not answered with a 200, and that 304s vary like them.
+
+    Check that a URL not requested before is answered with a 304 once its 200 response is built.
+    """
+    with TestClient(app_factory(db_copy)) as client:
+        matching = {"If-None-Match": "*"}
+        assert client.get("/tracks/NonExistentTrack/albums", headers=matching).status_code == 404
+        assert client.get("/albums/?limit=0", headers=matching).status_code == 422
+
+        for _ in range(2):
+            response = client.get("/tracks/Heroes/albums", headers=matching)
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["vary"] == "Accept, Accept-Encoding"
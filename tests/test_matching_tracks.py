@@ -0,0 +1,66 @@
+"""
+Test suite for the single-query search of albums by track title.
+
+Check that only the matching tracks are fetched, in one statement, with the former response semantics.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from bowie_api_rest.crud import get_albums_containing_track, get_albums_with_matching_tracks
+from bowie_api_rest.database import FileDatabaseConfig, get_session_factory
+from bowie_api_rest.snapshot import CatalogSnapshot
+
+
+SEARCHES = ["Fa", "love", "STAR", "the", "a", "Heroes", "NonExistentTrack"]
+
+
+def filtered_albums(session: Session, track_title_part: str) -> list[tuple[int, list[int]]]:
+    """Return album and track identifiers the way the routes used to filter whole albums in Python."""
+    albums = get_albums_containing_track(session, track_title_part)
+    lower_search = track_title_part.lower()
+    return [
+        (album.id, ids) for album in albums if (ids := [t.id for t in album.tracks if lower_search in t.title.lower()])
+    ]
+
+
+@pytest.mark.parametrize("limit, after_id", [(None, None), (2, None), (3, 20)])
+def test_matching_tracks_match_python_filtering(db_copy: Path, limit: int | None, after_id: int | None):
+    """
+    Test that the database and snapshot paths return the albums and tracks formerly kept by the routes.
+
+    Check the results with and without keyset pagination.
+    """
+    engine = FileDatabaseConfig.from_db_file(db_copy).engine
+    snapshot = CatalogSnapshot.load(engine)
+
+    with get_session_factory(engine)() as session:
+        for search in SEARCHES:
+            expected = [
+                (album_id, ids)
+                for album_id, ids in filtered_albums(session, search)
+                if after_id is None or album_id > after_id
+            ][:limit]
+            for source in (session, snapshot):
+                albums = get_albums_with_matching_tracks(source, search, limit, after_id)
+                assert [(a.id, [t.id for t in a.tracks]) for a in albums] == expected
+
+
+def test_matching_tracks_use_a_single_statement(db_copy: Path):
+    """
+    Test that searching albums by track title executes exactly one SQL statement.
+
+    Check with and without pagination.
+    """
+    engine = FileDatabaseConfig.from_db_file(db_copy).engine
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with get_session_factory(engine)() as session:
+        get_albums_with_matching_tracks(session, "love")
+        get_albums_with_matching_tracks(session, "love", limit=2, after_id=3)
+
+    assert len(statements) == 2
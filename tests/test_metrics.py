@@ -0,0 +1,62 @@
+"""
+Test suite for the request timing and SQL statement instrumentation.
+
+Contains tests for the `Server-Timing` response header and the Prometheus metrics exposed at `/metrics`.
+"""
+
+from pathlib import Path
+import re
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+def _phases(server_timing: str) -> dict[str, str]:
+    """Return the `Server-Timing` metrics by name, with their parameters."""
+    return dict(metric.strip().partition(";")[::2] for metric in server_timing.split(","))
+
+
+def _sample(metrics: str, name: str, labels: str) -> float:
+    """Return the value of a sample of the Prometheus exposition text."""
+    match = re.search(rf"^{name}\{{{re.escape(labels)}\}} (\S+)$", metrics, re.MULTILINE)
+    assert match, f"{name}{{{labels}}} not found"
+    return float(match.group(1))
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "async"])
+def test_server_timing_and_metrics(app_factory, db_copy: Path, serving_mode: str):
+    """
+    Test that the phases of a request are sent in the `Server-Timing` header and aggregated by route template.
+
+    Check that the SQL statements are counted in both the sync and async modes, and that a cached response is
+    timed without any phase but the total.
+    """
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode)) as client:
+        phases = _phases(client.get("/tracks/fame/albums").headers["server-timing"])
+        assert set(phases) == {"db", "handler", "serialize", "total"}
+        statements = int(re.search(r'desc="(\d+) statements"', phases["db"]).group(1))
+        assert statements >= 1
+
+        cached = _phases(client.get("/tracks/fame/albums").headers["server-timing"])
+        assert set(cached) == {"total"}
+        assert client.get("/no/such/path").status_code == 404
+
+        metrics = client.get("/metrics")
+        assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+        route = 'route="/tracks/{track_title}/albums"'
+        labels = f'method="GET",{route},status="200"'
+        assert _sample(metrics.text, "bowie_http_request_duration_seconds_count", labels) == 2
+        assert _sample(metrics.text, "bowie_http_request_duration_seconds_bucket", f'{labels},le="+Inf"') == 2
+        assert _sample(metrics.text, "bowie_db_statements_total", route) == statements
+        assert _sample(metrics.text, "bowie_serialization_duration_seconds_total", route) > 0
+        unmatched = 'method="GET",route="unmatched",status="404"'
+        assert _sample(metrics.text, "bowie_http_request_duration_seconds_count", unmatched) == 1
+
+
+def test_metrics_disabled(app_factory, db_copy: Path):
+    """Test that no header is added and no metrics are exposed when the instrumentation is disabled."""
+    with TestClient(app_factory(db_copy, metrics_enabled=False)) as client:
+        assert "server-timing" not in client.get("/tracks/fame/albums").headers
+        assert client.get("/metrics").status_code == 404
@@ -0,0 +1,75 @@
+"""
+Test suite for the keyset pagination of album endpoints.
+
+Check that following the next-page cursors returns every album exactly once, in every serving mode.
+"""
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.config import MAX_PAGE_SIZE
+from bowie_api_rest.main import app
+from bowie_api_rest.routes import NEXT_CURSOR_HEADER
+
+
+def walk_pages(client: TestClient, url: str, query: dict, limit: int) -> list[dict]:
+    """
+    Request every page of an endpoint by following the next-page cursors.
+
+    :param TestClient client: Test client of the application.
+    :param str url: Endpoint URL.
+    :param dict query: Query parameters of the search.
+    :param int limit: Page size.
+    :return: Albums of all the pages.
+    :rtype: list[dict]
+    """
+    albums: list[dict] = []
+    cursor: str | None = None
+    while True:
+        params = query | {"limit": limit} | ({"cursor": cursor} if cursor is not None else {})
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        albums.extend(page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return albums
+
+
+@pytest.mark.parametrize(
+    ("serving_mode", "fast_serialization"),
+    [("database", False), ("database", True), ("snapshot", False), ("async", False)],
+)
+def test_pages_cover_all_results(app_factory, db_copy: Path, serving_mode: str, fast_serialization: bool):
+    """
+    Test that the concatenated pages are equal to the unpaginated response.
+
+    Check the album listing and both title searches.
+    """
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+
+    app = app_factory(db_copy, serving_mode=serving_mode, fast_serialization=fast_serialization)
+    with TestClient(app) as client:
+        for url, query, limit in [
+            ("/albums/", {}, 7),
+            ("/albums/by-title/", {"album_title": "the"}, 2),
+            ("/tracks/a/albums", {}, 4),
+        ]:
+            full = client.get(url, params=query)
+            assert NEXT_CURSOR_HEADER not in full.headers
+            assert walk_pages(client, url, query, limit) == full.json()
+
+
+def test_page_size_is_bounded():
+    """
+    Test that a page size above the configured maximum, or below one, is rejected.
+
+    Check that a validation error is returned.
+    """
+    with TestClient(app) as client:
+        assert client.get("/albums/", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+        assert client.get("/albums/", params={"limit": 0}).status_code == 422
@@ -0,0 +1,89 @@
+"""
+Test suite for the opt-in sampling profiler of requests.
+
+Contains tests for the collapsed stack format, the selection of the profiled requests and the cap on concurrent profiles.
+"""
+
+import asyncio
+from pathlib import Path
+import re
+import sys
+
+from fastapi.testclient import TestClient
+
+from bowie_api_rest.profiling import ProfilingMiddleware, collapse_stack
+
+
+def test_collapse_stack():
+    """Test that stacks are collapsed outermost first, with the module and qualified name of every function."""
+
+    def inner() -> str:
+        return collapse_stack(sys._getframe())
+
+    stack = inner().split(";")
+    assert stack[-1] == f"{__name__}.test_collapse_stack.<locals>.inner"
+    assert stack[-2] == f"{__name__}.test_collapse_stack"
+    assert all(" " not in name for name in stack)
+
+
+def test_requests_are_profiled_on_demand(app_factory, db_copy: Path, tmp_path: Path):
+    """
+    Test that only the requests sent with the `X-Profile` token are profiled when no fraction is sampled.
+
+    Check that the response names the profile file, made of collapsed stacks through the route function.
+    """
+    profile_dir = tmp_path / "profiles"
+    app = app_factory(db_copy, profile_dir=profile_dir, profile_token="secret", response_cache_size=0)
+    with TestClient(app) as client:
+        assert "x-profile" not in client.get("/tracks/the/albums").headers
+        assert "x-profile" not in client.get("/tracks/the/albums", headers={"X-Profile": "guess"}).headers
+        assert list(profile_dir.iterdir()) == []
+
+        names = [
+            client.get(f"/tracks/the/albums?limit={n}", headers={"X-Profile": "secret"}).headers["x-profile"]
+            for n in range(1, 11)
+        ]
+        assert sorted(path.name for path in profile_dir.iterdir()) == sorted(names)
+
+    lines = [line for name in names for line in (profile_dir / name).read_text().splitlines()]
+    assert all(re.fullmatch(r"\S+ \d+", line) for line in lines)
+    assert any("bowie_api_rest.routes.search_albums_containing_track" in line for line in lines)
+
+
+def test_sampled_requests(app_factory, db_copy: Path, tmp_path: Path):
+    """Test that every request is profiled with a sample rate of 1."""
+    with TestClient(app_factory(db_copy, profile_dir=tmp_path, profile_sample_rate=1.0)) as client:
+        for _ in range(3):
+            assert "x-profile" in client.get("/albums/?limit=2").headers
+    assert len(list(tmp_path.glob("*-GET-albums.collapsed"))) == 3
+
+
+def test_profiling_requires_token_and_is_capped(app_factory, db_copy: Path, tmp_path: Path):
+    """
+    Test that the `X-Profile` header is ignored without a configured token, and that concurrent profiles are capped.
+
+    Check that a request selected while another one is profiled is served unprofiled.
+    """
+    profile_dir = tmp_path / "profiles"
+    with TestClient(app_factory(db_copy, profile_dir=profile_dir)) as client:
+        assert "x-profile" not in client.get("/albums/?limit=2", headers={"X-Profile": "1"}).headers
+    assert list(profile_dir.iterdir()) == []
+
+    async def app(scope, receive, send):
+        # The outer request handles an inner one while it is profiled
+        if scope["path"] == "/outer":
+            await middleware({**scope, "path": "/inner"}, receive, collect)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = ProfilingMiddleware(app, profile_dir, sample_rate=1.0)
+    starts = []
+
+    async def collect(message):
+        if message["type"] == "http.response.start":
+            starts.append([name for name, _ in message["headers"]])
+
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/outer", "headers": []}, None, collect))
+    assert starts == [[], [b"x-profile"]]
+    assert middleware.running == 0
+    assert len(list(profile_dir.iterdir())) == 1
@@ -0,0 +1,124 @@
+"""
+Test suite for the indexes of the album and track tables.
+
+Check with EXPLAIN QUERY PLAN that no endpoint query scans a whole table, the migration of existing databases
+and the exact and prefix title searches answered by the lowercased title indexes.
+"""
+
+from collections.abc import Callable
+from pathlib import Path
+import sqlite3
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import Engine, event
+
+from bowie_api_rest.database import FileDatabaseConfig, init_db
+
+
+URLS = [
+    "/albums/?limit=3&cursor=2",
+    "/albums/by-title/?album_title=the",
+    "/albums/by-title/?album_title=hunky&match=prefix",
+    "/albums/by-title/?album_title=hunky dory&match=exact&limit=1",
+    "/tracks/fame/albums",
+    "/tracks/fame/albums?limit=2&cursor=3",
+    "/tracks/space/albums?match=prefix",
+    "/tracks/fame/albums?match=exact&limit=1",
+    "/tracks/by-duration/?min_seconds=300&max_seconds=360",
+    "/tracks/longest/",
+    "/albums/runtime/?limit=3&cursor=5",
+    "/search/albums?q=hunky dori",
+    "/search/tracks?q=ziggy stardst",
+]
+
+FULL_CATALOG_URLS = ["/albums/", "/albums/runtime/", "/export/albums"]
+"""Endpoints returning every album, allowed to walk the album table (never the track table) in identifier order."""
+
+
+def _full_scans(db_file: Path, client: TestClient, url: str) -> set[str]:
+    """
+    Request an endpoint and return the tables scanned without any index by the queries it executed.
+
+    :param Path db_file: Database file served by the client.
+    :param TestClient client: Client of the application.
+    :param str url: Endpoint to request.
+    :return: Names of the fully scanned tables.
+    :rtype: set[str]
+    """
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        assert client.get(url).status_code in (200, 404)
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    assert statements
+
+    scanned = set()
+    with sqlite3.connect(db_file) as connection:
+        for statement, parameters in statements:
+            for *_, detail in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                # Virtual tables are the trigram indexes, "SCAN t USING INDEX i" walks an index in order
+                if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+                    scanned.add(detail.split()[1])
+    return scanned
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_endpoint_queries_use_indexes(db_copy: Path, app_factory: Callable[..., FastAPI], url: str):
+    """Test that the queries of a search or page endpoint never scan the album or track table."""
+    app = app_factory(db_copy, response_cache_size=0)
+    # The title completions of the fuzzy searches are built once at startup, outside of the requests
+    app.state.autocomplete_store.get()
+    assert _full_scans(db_copy, TestClient(app), url) == set()
+
+
+@pytest.mark.parametrize("url", FULL_CATALOG_URLS)
+def test_full_catalog_queries_do_not_scan_tracks(db_copy: Path, app_factory: Callable[..., FastAPI], url: str):
+    """Test that listing every album reaches the tracks of each album through the `track.album_id` index."""
+    client = TestClient(app_factory(db_copy, response_cache_size=0))
+    assert _full_scans(db_copy, client, url) <= {"album"}
+
+
+def test_migration_creates_indexes(db_copy: Path):
+    """Test that opening a database built without the lookup indexes creates them."""
+    indexes = {"ix_track_album_id", "ix_track_title_lower", "ix_album_title_lower"}
+    with sqlite3.connect(db_copy) as connection:
+        for index in indexes:
+            connection.execute(f"DROP INDEX {index}")
+        connection.execute("PRAGMA user_version = 0")
+
+    init_db(FileDatabaseConfig.from_db_file(db_copy).engine)
+
+    with sqlite3.connect(db_copy) as connection:
+        names = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert indexes <= names
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "snapshot", "async"])
+def test_exact_and_prefix_matches(db_copy: Path, app_factory: Callable[..., FastAPI], serving_mode: str):
+    """Test the `match` parameter of the title searches in every serving mode."""
+    if serving_mode == "async":
+        pytest.importorskip("aiosqlite")
+    client = TestClient(app_factory(db_copy, serving_mode=serving_mode))
+
+    exact = client.get("/albums/by-title/", params={"album_title": "HUNKY DORY", "match": "exact"})
+    assert [album["title"] for album in exact.json()] == ["Hunky Dory"]
+    assert client.get("/albums/by-title/", params={"album_title": "hunky", "match": "exact"}).status_code == 404
+    assert client.get("/albums/by-title/", params={"album_title": "dory", "match": "prefix"}).status_code == 404
+
+    prefix = client.get("/tracks/space/albums", params={"match": "prefix"}).json()
+    titles = [track["title"] for album in prefix for track in album["tracks"]]
+    assert titles and all(title.lower().startswith("space") for title in titles)
+
+    contains = client.get("/tracks/fame/albums").json()
+    exact_tracks = client.get("/tracks/fame/albums", params={"match": "exact"}).json()
+    assert [track["title"] for album in exact_tracks for track in album["tracks"]] == ["Fame"]
+    assert len(exact_tracks) <= len(contains)
+
+    assert client.get("/tracks/fame/albums", params={"match": "regex"}).status_code == 422
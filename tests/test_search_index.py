@@ -0,0 +1,46 @@
+"""
+Test suite for the title substring search indexes.
+
+Contains tests for the in-memory trigram index and the SQLite FTS5 trigram tables.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from bowie_api_rest.search_index import TrigramIndex
+
+
+def test_trigram_index_matches_plain_substring_search():
+    """
+    Test that the trigram index returns the same positions as a naive case-insensitive substring scan.
+
+    Check queries shorter than, equal to and longer than a trigram, and a query without any match.
+    """
+    titles = ["Space Oddity", "Life on Mars?", "Starman", "Lady Stardust", "Ziggy Stardust", "Heroes"]
+    index = TrigramIndex(titles)
+
+    for query in ["a", "St", "sta", "STARDUST", "on Mars", "ziggy stardust", "blackstar"]:
+        expected = [position for position, title in enumerate(titles) if query.lower() in title.lower()]
+        assert index.search(query) == expected
+
+
+def test_fts_index_follows_track_changes(app_factory, db_copy: Path):
+    """
+    Test that the FTS5 trigram table is kept in sync with the track table by triggers.
+
+    Check that inserted tracks can be found and that renamed tracks are no longer found under their old title.
+    """
+    with TestClient(app_factory(db_copy)) as client:
+        assert client.get("/tracks/Warszawa Reprise/albums").status_code == 404
+
+        with sqlite3.connect(db_copy) as connection:
+            connection.execute("INSERT INTO track (title, duration, album_id) VALUES ('Warszawa Reprise', '1:00', 11)")
+        response = client.get("/tracks/warszawa reprise/albums")
+        assert response.status_code == 200
+        assert [album["id"] for album in response.json()] == [11]
+
+        with sqlite3.connect(db_copy) as connection:
+            connection.execute("UPDATE track SET title = 'Renamed' WHERE title = 'Warszawa Reprise'")
+        assert client.get("/tracks/Warszawa Reprise/albums").status_code == 404
@@ -0,0 +1,35 @@
+"""
+Test suite for the fast serialization mode.
+
+Check that album responses serialized straight to JSON bytes are identical to the validated ones.
+"""
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.main import app
+
+
+URLS = ["/albums/", "/albums/by-title/?album_title=star", "/tracks/Fa/albums", "/tracks/NonExistentTrack/albums"]
+
+
+@pytest.mark.parametrize("serving_mode", ["database", "snapshot"])
+def test_fast_serialization_matches_default_path(app_factory, db_copy: Path, serving_mode: str):
+    """
+    Test that the fast serialization mode returns the same payloads as the default path.
+
+    Check the response bodies of every album endpoint and that the OpenAPI schema is unchanged.
+    """
+    with TestClient(app) as client:
+        expected = [(r.status_code, r.json()) for r in map(client.get, URLS)]
+        expected_openapi = client.get("/openapi.json").json()
+
+    fast_app = app_factory(db_copy, serving_mode=serving_mode, fast_serialization=True, response_cache_size=0)
+    with TestClient(fast_app) as client:
+        actual = [(r.status_code, r.json()) for r in map(client.get, URLS)]
+        assert client.get("/albums/").headers["content-type"] == "application/json"
+        assert client.get("/openapi.json").json() == expected_openapi
+
+    assert actual == expected
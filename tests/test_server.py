@@ -0,0 +1,69 @@
+"""
+Test suite for the multi-worker production server.
+
+Contains an end-to-end test of the supervisor: serving, replacing the workers on a catalog change and stopping.
+"""
+
+import os
+from pathlib import Path
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from bowie_api_rest.server import bind_socket
+
+
+pytestmark = pytest.mark.skipif(not Path("/proc/self/task").exists(), reason="Reads the workers from /proc")
+
+
+def _workers(pid: int) -> set[int]:
+    """Return the worker processes of the supervisor."""
+    return {int(child) for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()}
+
+
+def _wait_for(condition, timeout: float = 60) -> None:
+    """Wait until a condition is met."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+
+
+def test_workers_are_replaced_on_catalog_change(db_copy: Path):
+    """
+    Test that the supervisor serves with the requested number of workers and replaces them when the catalog changes.
+
+    Check that the new workers serve the new catalog and that `SIGTERM` stops every process.
+    """
+    with bind_socket("127.0.0.1", 0) as sock:
+        port = sock.getsockname()[1]
+    command = [sys.executable, "-m", "bowie_api_rest.server", "--port", str(port), "--workers", "2"]
+    env = {**os.environ, "DB_PATH": str(db_copy), "SERVING_MODE": "snapshot"}
+    server = subprocess.Popen([*command, "--check-interval", "0.2", "--log-level", "warning"], env=env)
+    try:
+        client = httpx.Client(base_url=f"http://127.0.0.1:{port}")
+
+        def serving() -> bool:
+            try:
+                return client.get("/health").status_code == 200
+            except httpx.TransportError:
+                return False
+
+        _wait_for(serving)
+        first_generation = _workers(server.pid)
+        assert len(first_generation) == 2
+
+        with sqlite3.connect(db_copy) as connection:
+            connection.execute("INSERT INTO album (title, year) VALUES ('Toy', 2001)")
+        _wait_for(lambda: _workers(server.pid).isdisjoint(first_generation) and len(_workers(server.pid)) == 2)
+        assert [album["title"] for album in client.get("/albums/by-title/?album_title=toy").json()] == ["Toy"]
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+    finally:
+        server.kill()
@@ -0,0 +1,73 @@
+"""
+Test suite for the in-memory snapshot serving mode.
+
+Check that the snapshot answers like the database and follows changes of the database file.
+"""
+
+from pathlib import Path
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+
+from bowie_api_rest.columnar import columnar_path, write_columnar_catalog
+from bowie_api_rest.database import FileDatabaseConfig
+from bowie_api_rest.main import app
+from bowie_api_rest.snapshot import SnapshotStore
+
+
+def test_snapshot_mode_matches_database_mode(app_factory, db_copy: Path):
+    """
+    Test that every read endpoint returns the same payload in snapshot and database modes.
+
+    Check the full listing, an album title search and a track title search.
+    """
+    urls = ["/albums/", "/albums/by-title/?album_title=star", "/tracks/Fa/albums", "/tracks/NonExistentTrack/albums"]
+    with TestClient(app) as client:
+        expected = [(r.status_code, r.json()) for r in map(client.get, urls)]
+
+    with TestClient(app_factory(db_copy, serving_mode="snapshot")) as client:
+        actual = [(r.status_code, r.json()) for r in map(client.get, urls)]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize("serving_mode", ["snapshot", "columnar"])
+def test_non_ascii_titles_match_database_mode(app_factory, db_copy: Path, serving_mode: str):
+    """
+    Test that the in-memory catalogs ignore the case of ASCII letters only, like SQLite.
+
+    Check every title match with the differently cased non-ASCII letters of `Neuköln`, found by the database only
+    when they are cased like in the title.
+    """
+    write_columnar_catalog(FileDatabaseConfig.from_db_file(db_copy).engine, columnar_path(db_copy))
+    urls = [
+        f"{path}&match={match}"
+        for title in ("NEUKÖLN", "neuköln", "NEUKöLN", "ÖLN")
+        for path in (f"/tracks/{title}/albums?", f"/albums/by-title/?album_title={title}")
+        for match in ("contains", "prefix", "exact")
+    ]
+    with TestClient(app_factory(db_copy, response_cache_size=0)) as client:
+        expected = [(r.status_code, r.json()) for r in map(client.get, urls)]
+    assert {status for status, _ in expected} == {200, 404}
+
+    with TestClient(app_factory(db_copy, serving_mode=serving_mode, response_cache_size=0)) as client:
+        assert [(r.status_code, r.json()) for r in map(client.get, urls)] == expected
+
+
+def test_snapshot_reloads_when_db_file_changes(db_copy: Path):
+    """
+    Test that the snapshot store reloads the catalog after the database file is modified.
+
+    Check that an album inserted directly in SQLite becomes visible without rebuilding the store.
+    """
+    store = SnapshotStore(FileDatabaseConfig.from_db_file(db_copy).engine, db_copy)
+    before = store.get()
+    assert store.get() is before  # Unchanged file, same snapshot
+
+    with sqlite3.connect(db_copy) as connection:
+        connection.execute("INSERT INTO album (title, year) VALUES ('The Lost Tapes', 2025)")
+
+    after = store.get()
+    assert after is not before
+    assert [album.title for album in after.get_albums_by_title("lost tapes")] == ["The Lost Tapes"]
@@ -0,0 +1,67 @@
+"""
+Test suite for the SQLite tuning profiles of the serving engine.
+
+Check the pragmas applied to the serving connections, the read-only profile and the change detection in WAL mode.
+"""
+
+from collections.abc import Callable
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from bowie_api_rest.database import FileDatabaseConfig, SqliteConfig, get_db_version
+
+
+def test_performance_profile_settings(db_copy: Path, app_factory: Callable[..., FastAPI]):
+    """Test that the performance profile switches to WAL with memory-mapped I/O and reports it."""
+    client = TestClient(app_factory(db_path=db_copy, sqlite_profile="performance"))
+
+    response = client.get("/stats/sqlite")
+    assert response.status_code == 200
+    settings = response.json()
+    assert settings["profile"] == "performance"
+    assert settings["journal_mode"] == "wal"
+    assert settings["mmap_size"] == 256 * 1024 * 1024
+    assert settings["cache_size"] == -65536
+    assert settings["temp_store"] == 2
+    assert settings["read_only"] is False
+    assert client.get("/albums/").status_code == 200
+
+
+def test_read_only_profile_refuses_writes(db_copy: Path, app_factory: Callable[..., FastAPI]):
+    """Test that the read-only profile serves the catalog from connections that cannot write."""
+    client = TestClient(app_factory(db_path=db_copy, sqlite_profile="read-only"))
+
+    assert client.get("/albums/").status_code == 200
+    settings = client.get("/stats/sqlite").json()
+    assert settings["query_only"] == 1
+    assert settings["read_only"] is True
+    assert settings["immutable"] is True
+
+    engine = FileDatabaseConfig.from_db_file(db_copy, sqlite_config=SqliteConfig.from_profile("read-only")).engine
+    with pytest.raises(OperationalError), engine.begin() as connection:
+        connection.execute(text("DELETE FROM track"))
+    engine.dispose()
+
+
+def test_db_version_follows_wal_writes(db_copy: Path):
+    """Test that a write kept in the WAL file, not yet checkpointed into the database file, changes the version."""
+    engine = FileDatabaseConfig.from_db_file(db_copy, sqlite_config=SqliteConfig.from_profile("performance")).engine
+    with engine.connect() as connection:
+        # Keep a reader open so that the write is not checkpointed when the writer closes
+        connection.execute(text("SELECT 1 FROM album")).all()
+        before = get_db_version(db_copy)
+        with engine.begin() as writer:
+            writer.execute(text("UPDATE album SET year = year + 1 WHERE id = 1"))
+        assert get_db_version(db_copy) != before
+    engine.dispose()
+
+
+def test_unknown_profile():
+    """Test that an unknown profile name is rejected."""
+    with pytest.raises(ValueError, match="Unknown SQLite profile"):
+        SqliteConfig.from_profile("fastest")
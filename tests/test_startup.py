@@ -0,0 +1,73 @@
+"""
+Test suite for the startup of the application.
+
+Contains tests for the side-effect free import of the main module, the schema version stamp and the lifespan.
+"""
+
+import os
+from pathlib import Path
+import sqlite3
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from bowie_api_rest.database import FileDatabaseConfig, init_db
+from bowie_api_rest.migrations import SCHEMA_VERSION
+
+
+def test_import_creates_no_application():
+    """
+    Test that importing the main module neither creates the default application nor imports unused features.
+
+    Check that the default application, served from the database, imports neither the async serving mode
+    nor the profiler.
+    """
+    code = (
+        "import sys\n"
+        "from bowie_api_rest import main\n"
+        "assert 'app' not in vars(main)\n"
+        "assert main.app is main.app\n"
+        "for module in ('bowie_api_rest.async_routes', 'bowie_api_rest.profiling', 'sqlalchemy.ext.asyncio'):\n"
+        "    assert module not in sys.modules, module\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "SERVING_MODE": "database"})
+
+
+def test_stamped_schema_is_not_inspected(db_copy: Path):
+    """
+    Test that a database stamped with the current schema version is left as is, and an unstamped one initialized.
+
+    Check that the missing index is only created once the stamp is removed, and that the database is stamped then.
+    """
+    with sqlite3.connect(db_copy) as connection:
+        assert connection.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+        connection.execute("DROP INDEX ix_album_title_lower")
+
+    def index_exists() -> bool:
+        with sqlite3.connect(db_copy) as connection:
+            query = "SELECT 1 FROM sqlite_master WHERE name = 'ix_album_title_lower'"
+            return connection.execute(query).fetchone() is not None
+
+    engine = FileDatabaseConfig.from_db_file(db_copy).engine
+    init_db(engine)
+    assert not index_exists()
+
+    with sqlite3.connect(db_copy) as connection:
+        connection.execute("PRAGMA user_version = 0")
+    init_db(engine)
+    assert index_exists()
+    with sqlite3.connect(db_copy) as connection:
+        assert connection.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+
+
+def test_lifespan_prepares_stores(app_factory, db_copy: Path):
+    """Test that the snapshot is loaded before serving and the title completions are built in the background."""
+    app = app_factory(db_copy, serving_mode="snapshot")
+    assert app.state.snapshot_store._snapshot is None
+    assert app.state.autocomplete_store._completions is None
+
+    with TestClient(app) as client:
+        assert app.state.snapshot_store._snapshot is not None
+        assert client.get("/autocomplete/tracks", params={"q": "fam"}).status_code == 200
+        assert app.state.autocomplete_store._completions is not None